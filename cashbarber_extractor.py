@@ -11,17 +11,32 @@ Campos extraídos:
 - Plano (tipo de assinatura)
 - Status (Em dia, Pagamento recusado, etc)
 - Data de criação
+
+O HTML do relatório (obtido via HTTP) pode ser interpretado com lxml
+(padrão), BeautifulSoup ou selectolax (opcional); ver CASHBARBER_HTML_PARSER.
 """
 
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
+from lxml import etree
+import lxml.html
+import heapq
 import logging
+import os
+import sys
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax é opcional (apenas para o parser 'selectolax')
+    LexborHTMLParser = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,14 +44,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Lê no navegador só as células da tabela do relatório (sem serializar a
+# página inteira). Espelha as buscas do BeautifulSoup: primeira tabela
+# .table-striped, primeiro tbody, todas as <tr>/<td> descendentes.
+TABLE_SCRIPT = """
+const table = document.querySelector('table.table-striped');
+if (!table) { return null; }
+const tbody = table.querySelector('tbody');
+if (!tbody) { return null; }
+const rows = Array.from(tbody.querySelectorAll('tr'), tr => {
+    const tds = tr.querySelectorAll('td');
+    return [
+        tds.length ? tds[0].getAttribute('colspan') : null,
+        Array.from(tds, td => td.textContent)
+    ];
+});
+let total = null;
+const last = tbody.querySelectorAll('tr');
+if (last.length) {
+    const tds = last[last.length - 1].querySelectorAll('td');
+    const b = tds.length ? tds[tds.length - 1].querySelector('b') : null;
+    total = b ? b.textContent : null;
+}
+return {rows: rows, total: total};
+"""
 
-@dataclass
+# Variante paginada de TABLE_SCRIPT para a extração sob demanda: cada
+# chamada devolve as linhas [inicio, inicio + quantidade); a lista de <tr>
+# é obtida na primeira chamada e guardada na página até a última.
+TABLE_ROWS_SCRIPT = """
+const inicio = arguments[0], quantidade = arguments[1];
+if (inicio === 0) {
+    const table = document.querySelector('table.table-striped');
+    const tbody = table ? table.querySelector('tbody') : null;
+    window.__cashbarberLinhas = tbody ? tbody.querySelectorAll('tr') : null;
+}
+const trs = window.__cashbarberLinhas;
+if (!trs) { return null; }
+const fim = Math.min(inicio + quantidade, trs.length);
+const rows = [];
+for (let i = inicio; i < fim; i++) {
+    const tds = trs[i].querySelectorAll('td');
+    rows.push([
+        tds.length ? tds[0].getAttribute('colspan') : null,
+        Array.from(tds, td => td.textContent)
+    ]);
+}
+let total = null;
+if (fim === trs.length) {
+    window.__cashbarberLinhas = null;
+    const tds = trs.length ? trs[trs.length - 1].querySelectorAll('td') : [];
+    const b = tds.length ? tds[tds.length - 1].querySelector('b') : null;
+    total = b ? b.textContent : null;
+}
+return {rows: rows, total: total, fim: fim === trs.length};
+"""
+
+# Linhas por chamada de TABLE_ROWS_SCRIPT
+STREAM_DRIVER_BATCH = 2000
+
+PARSER_BS4 = 'bs4'
+PARSER_LXML = 'lxml'
+PARSER_SELECTOLAX = 'selectolax'
+PARSERS = (PARSER_LXML, PARSER_BS4, PARSER_SELECTOLAX)
+
+# Status do relatório → status normalizado; a ordem das chaves define os
+# códigos de status de `AssinantesColunar`
+STATUS_MAP = {
+    'Em dia': 'ativo',
+    'Pagamento recusado': 'inadimplente',
+    'Cancelado': 'cancelado',
+    'Pendente': 'pendente'
+}
+
+# Classe "table-striped" entre as classes do elemento (equivale ao class_ do BeautifulSoup)
+TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' table-striped ')]"
+
+
+@dataclass(slots=True)
 class Assinante:
     """Representa um assinante com suas informações."""
     nome: str
     plano: str
     status: str
     data_criacao: str
+    # Ordinal da data de criação, interpretada no primeiro acesso a `data`
+    # (-1 = ainda não interpretada, 0 = fora do formato)
+    ordinal: int = field(default=-1, repr=False, compare=False)
+    
+    @property
+    def data(self) -> Optional[date]:
+        """Data de criação interpretada (None se fora do formato dd/mm/aaaa)."""
+        if self.ordinal < 0:
+            data = parse_data(self.data_criacao)
+            self.ordinal = data.toordinal() if data is not None else 0
+        return date.fromordinal(self.ordinal) if self.ordinal else None
     
     def to_dict(self) -> Dict:
         """Converte para dicionário para facilitar integração."""
@@ -48,18 +150,376 @@ class Assinante:
         }
 
 
+def parse_data(texto: str) -> Optional[date]:
+    """
+    Interpreta uma data do relatório (dd/mm/aaaa).
+    
+    Returns:
+        A data, ou None se o texto não estiver exatamente nesse formato
+    """
+    try:
+        dia, mes, ano = texto.split('/')
+        data = date(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None
+    
+    # Só aceita o formato canônico, para que a data possa ser reescrita igual
+    if f"{data.day:02d}/{data.month:02d}/{data.year:04d}" != texto:
+        return None
+    return data
+
+
+PERIODO_DIA = 'dia'
+PERIODO_MES = 'mes'
+PERIODO_ANO = 'ano'
+PERIODOS = (PERIODO_DIA, PERIODO_MES, PERIODO_ANO)
+
+
+class EstatisticasAssinantes:
+    """
+    Contagens e índices de um `AssinantesColunar`, atualizados linha a linha.
+    
+    Como são mantidos durante a extração, consultas repetidas (contagens,
+    filtro por status, contagens por período) não percorrem as linhas de novo.
+    """
+    
+    def __init__(self, colunar: 'AssinantesColunar'):
+        self._colunar = colunar
+        self.por_codigo_plano: Counter = Counter()
+        self.por_codigos: Counter = Counter()  # (código plano, código status) → qtd
+        self.posicoes_status: Dict[int, array] = {}  # código status → posições
+        self.por_ordinal: Counter = Counter()  # ordinal da data → qtd (0 = fora do formato)
+    
+    def registrar(self, posicao: int, plano: int, status: int, ordinal: int) -> None:
+        """Contabiliza a linha `posicao` (códigos de plano/status e ordinal da data)."""
+        self.por_codigo_plano[plano] += 1
+        self.por_codigos[plano, status] += 1
+        posicoes = self.posicoes_status.get(status)
+        if posicoes is None:
+            posicoes = self.posicoes_status[status] = array('l')
+        posicoes.append(posicao)
+        self.por_ordinal[ordinal] += 1
+    
+    @property
+    def total(self) -> int:
+        return len(self._colunar)
+    
+    def por_status(self) -> Dict[str, int]:
+        """Quantidade de assinantes por status (na ordem em que aparecem)."""
+        vocab = self._colunar.vocab_status
+        return {vocab[c]: len(posicoes) for c, posicoes in self.posicoes_status.items()}
+    
+    def por_plano(self) -> Dict[str, int]:
+        """Quantidade de assinantes por plano (na ordem em que aparecem)."""
+        vocab = self._colunar.vocab_planos
+        return {vocab[c]: n for c, n in self.por_codigo_plano.items()}
+    
+    def por_plano_status(self) -> Dict[Tuple[str, str], int]:
+        """Quantidade de assinantes por (plano, status)."""
+        planos, status = self._colunar.vocab_planos, self._colunar.vocab_status
+        return {(planos[p], status[s]): n for (p, s), n in self.por_codigos.items()}
+    
+    def posicoes(self, status: str) -> List[int]:
+        """
+        Posições (crescentes) dos assinantes com o status informado, sem
+        diferenciar maiúsculas.
+        """
+        alvo = status.lower()
+        listas = [
+            posicoes for c, posicoes in self.posicoes_status.items()
+            if self._colunar.vocab_status[c].lower() == alvo
+        ]
+        if len(listas) == 1:
+            return list(listas[0])
+        return list(heapq.merge(*listas))
+    
+    def por_periodo(self, periodo: str = PERIODO_MES) -> Dict[Optional[str], int]:
+        """
+        Quantidade de assinantes por período da data de criação.
+        
+        Args:
+            periodo: 'dia' (aaaa-mm-dd), 'mes' (aaaa-mm) ou 'ano' (aaaa)
+        
+        Returns:
+            Dicionário período → quantidade, em ordem cronológica; datas fora
+            do formato ficam na chave None
+        """
+        if periodo not in PERIODOS:
+            raise ValueError(f"Período inválido: {periodo} (opções: {', '.join(PERIODOS)})")
+        
+        tamanho = {PERIODO_DIA: 10, PERIODO_MES: 7, PERIODO_ANO: 4}[periodo]
+        contagem: Dict[Optional[str], int] = {}
+        
+        # Percorre só as datas distintas
+        for ordinal in sorted(o for o in self.por_ordinal if o):
+            chave = date.fromordinal(ordinal).isoformat()[:tamanho]
+            contagem[chave] = contagem.get(chave, 0) + self.por_ordinal[ordinal]
+        
+        if self.por_ordinal.get(0):
+            contagem[None] = self.por_ordinal[0]
+        return contagem
+
+
+class AssinantesColunar:
+    """
+    Assinantes de uma extração guardados em colunas.
+    
+    Plano e status viram códigos (array de inteiros) sobre um vocabulário
+    (o de status começa por `STATUS_MAP`) e a data de criação vira o ordinal
+    da data; só os nomes ficam como strings, uma por assinante.
+    """
+    
+    def __init__(self, assinantes: Iterable[Assinante] = ()):
+        self.nomes: List[str] = []
+        self.planos = array('H')
+        self.status = array('H')
+        self.datas = array('l')  # date.toordinal() (0 = texto fora do formato)
+        self.vocab_planos: List[str] = []
+        self.vocab_status: List[str] = list(STATUS_MAP)
+        self._codigos_planos: Dict[str, int] = {}
+        self._codigos_status: Dict[str, int] = {s: i for i, s in enumerate(self.vocab_status)}
+        self._datas_texto: Dict[int, str] = {}  # datas fora do formato, por posição
+        self._texto_ordinal: Dict[int, str] = {}  # ordinal → texto original da data
+        self._ordinais: Dict[str, int] = {}  # texto da data → ordinal (datas se repetem)
+        self.estatisticas = EstatisticasAssinantes(self)
+        
+        for assinante in assinantes:
+            self.append(assinante)
+    
+    @staticmethod
+    def _codigo(valor: str, vocab: List[str], codigos: Dict[str, int]) -> int:
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = codigos[valor] = len(vocab)
+            vocab.append(valor)
+        return codigo
+    
+    def append(self, assinante: Assinante) -> None:
+        """Acrescenta um assinante ao final (e às estatísticas)."""
+        plano = self._codigo(assinante.plano, self.vocab_planos, self._codigos_planos)
+        status = self._codigo(assinante.status, self.vocab_status, self._codigos_status)
+        self.planos.append(plano)
+        self.status.append(status)
+        
+        texto = assinante.data_criacao
+        ordinal = self._ordinais.get(texto)
+        if ordinal is None:
+            data = parse_data(texto)
+            ordinal = data.toordinal() if data is not None else 0
+            if ordinal:
+                self._ordinais[texto] = ordinal
+                self._texto_ordinal[ordinal] = texto
+        if not ordinal:
+            self._datas_texto[len(self.nomes)] = texto
+        self.datas.append(ordinal)
+        
+        self.estatisticas.registrar(len(self.nomes), plano, status, ordinal)
+        self.nomes.append(assinante.nome)
+    
+    def __len__(self) -> int:
+        return len(self.nomes)
+    
+    def __getitem__(self, i: int) -> Assinante:
+        return Assinante(
+            nome=self.nomes[i],
+            plano=self.vocab_planos[self.planos[i]],
+            status=self.vocab_status[self.status[i]],
+            data_criacao=self.data_texto(i),
+            ordinal=self.datas[i]
+        )
+    
+    def __iter__(self) -> Iterator[Assinante]:
+        for i in range(len(self.nomes)):
+            yield self[i]
+    
+    def data(self, i: int) -> Optional[date]:
+        """Data de criação do i-ésimo assinante (None se fora do formato)."""
+        ordinal = self.datas[i]
+        return date.fromordinal(ordinal) if ordinal else None
+    
+    def data_texto(self, i: int) -> str:
+        """Data de criação do i-ésimo assinante como no relatório."""
+        ordinal = self.datas[i]
+        if not ordinal:
+            return self._datas_texto[i]
+        return self._texto_ordinal[ordinal]
+    
+    def filtrar_status(self, status: str) -> List[Assinante]:
+        """Assinantes com o status informado (sem diferenciar maiúsculas)."""
+        return [self[i] for i in self.estatisticas.posicoes(status)]
+    
+    def to_dicts(self) -> List[Dict]:
+        """Converte para uma lista de dicionários (ex.: para gravar em JSON)."""
+        return [assinante.to_dict() for assinante in self]
+
+
+@dataclass
+class RelatorioParseado:
+    """Tabela do relatório lida uma única vez (linhas e célula de total)."""
+    linhas: List[Tuple[Optional[str], List[str]]]  # (colspan da 1ª célula, textos)
+    total_texto: Optional[str] = None
+    
+    @property
+    def total(self) -> Optional[int]:
+        """Total informado na última linha da tabela (ou None)."""
+        if self.total_texto is None:
+            return None
+        return int(self.total_texto.strip())
+    
+    def assinantes(self) -> List[Assinante]:
+        """Converte as linhas de dados (ignora a linha de total) em assinantes."""
+        assinantes = []
+        
+        for colspan, cols in self.linhas:
+            assinante = _linha_para_assinante(colspan, cols)
+            if assinante is not None:
+                assinantes.append(assinante)
+        
+        return assinantes
+    
+    def colunar(self) -> AssinantesColunar:
+        """Converte as linhas de dados em um `AssinantesColunar`."""
+        colunar = AssinantesColunar()
+        
+        for colspan, cols in self.linhas:
+            assinante = _linha_para_assinante(colspan, cols)
+            if assinante is not None:
+                colunar.append(assinante)
+        
+        return colunar
+
+
+class RelatorioStream:
+    """
+    Assinantes do relatório produzidos sob demanda, linha a linha.
+    
+    Pode ser iterado uma única vez; ao final, `total` e `extraidos` permitem
+    conferir a contagem sem reler a tabela.
+    """
+    
+    def __init__(self, linhas: Iterable[Tuple[Optional[str], List[str], Optional[str]]]):
+        """
+        Args:
+            linhas: Linhas da tabela no formato (colspan da 1ª célula, textos,
+                texto do <b> da última célula)
+        """
+        self._linhas = linhas
+        self.total_texto: Optional[str] = None
+        self.linhas_lidas = 0
+        self.extraidos = 0
+    
+    def __iter__(self) -> Iterator[Assinante]:
+        for colspan, cols, negrito in self._linhas:
+            self.linhas_lidas += 1
+            
+            # A célula de total é a da última linha
+            self.total_texto = negrito
+            
+            assinante = _linha_para_assinante(colspan, cols)
+            if assinante is not None:
+                self.extraidos += 1
+                yield assinante
+        
+        logger.info(f"✓ {self.extraidos} assinantes extraídos ({self.linhas_lidas} linhas lidas)")
+    
+    @property
+    def total(self) -> Optional[int]:
+        """Total informado na última linha da tabela (disponível ao final)."""
+        if self.total_texto is None:
+            return None
+        return int(self.total_texto.strip())
+    
+    def verificar_total(self) -> bool:
+        """
+        Confere os assinantes extraídos com a linha de total da tabela.
+        
+        Returns:
+            False se o total existir e divergir das linhas extraídas
+        """
+        try:
+            total = self.total
+        except ValueError as e:
+            logger.warning(f"Não foi possível extrair total: {e}")
+            total = None
+        
+        if total is None:
+            logger.warning("Linha de total não encontrada; contagem não verificada")
+            return True
+        
+        if total != self.extraidos:
+            logger.warning(
+                f"⚠️  Total da tabela ({total}) diferente das linhas extraídas ({self.extraidos})"
+            )
+            return False
+        
+        logger.info(f"✓ Contagem confere com o total da tabela ({total})")
+        return True
+
+
+def _texto_celula(texto: str) -> str:
+    """
+    Texto de uma célula como exibido: espaços nas pontas removidos e
+    sequências de espaços, quebras de linha e &nbsp; reduzidas a um espaço.
+    """
+    return ' '.join(texto.split())
+
+
+def _linha_para_assinante(colspan: Optional[str], cols: List[str]) -> Optional[Assinante]:
+    """Converte uma linha da tabela em assinante (None para a linha de total)."""
+    # Pula linha de total (tem colspan)
+    if len(cols) < 4 or colspan:
+        return None
+    
+    try:
+        # Plano, status e data se repetem entre linhas: compartilham a string
+        return Assinante(
+            nome=_texto_celula(cols[0]),
+            plano=sys.intern(_texto_celula(cols[1])),
+            status=sys.intern(_texto_celula(cols[2])),
+            data_criacao=sys.intern(_texto_celula(cols[3]))
+        )
+    except Exception as e:
+        logger.warning(f"Erro ao processar linha: {e}")
+        return None
+
+
 class CashbarberExtractor:
     """Extrator de dados de assinantes do Cashbarber."""
     
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(
+        self,
+        driver: Optional[webdriver.Chrome] = None,
+        html: Optional[str] = None,
+        parser: Optional[str] = None
+    ):
         """
         Inicializa o extrator com driver já autenticado e navegado.
         
         Args:
             driver: Instância do Chrome WebDriver já posicionada na página do relatório
+            html: HTML do relatório já obtido (ex.: via HTTP); dispensa o driver
+            parser: Parser do HTML: 'lxml', 'bs4' ou 'selectolax'
+                (padrão: variável CASHBARBER_HTML_PARSER ou 'lxml')
         """
+        if driver is None and html is None:
+            raise ValueError("Informe o driver ou o HTML do relatório")
+        
+        self.parser = parser or os.getenv('CASHBARBER_HTML_PARSER', PARSER_LXML)
+        if self.parser not in PARSERS:
+            raise ValueError(f"Parser inválido: {self.parser} (opções: {', '.join(PARSERS)})")
+        
         self.driver = driver
-        self.wait = WebDriverWait(driver, 20)
+        self.html = html
+        self.wait = WebDriverWait(driver, 20) if driver is not None else None
+        self._relatorio: Optional[RelatorioParseado] = None
+        self._assinantes: Optional[List[Assinante]] = None
+        self._colunar: Optional[AssinantesColunar] = None
+    
+    def get_html(self) -> str:
+        """Retorna o HTML do relatório (informado ou do driver)."""
+        if self.html is not None:
+            return self.html
+        return self.driver.page_source
     
     def wait_for_table_load(self) -> None:
         """Aguarda o carregamento completo da tabela de resultados."""
@@ -82,6 +542,34 @@ class CashbarberExtractor:
             logger.error(f"Erro ao aguardar carregamento da tabela: {e}")
             raise
     
+    def get_relatorio(self) -> RelatorioParseado:
+        """
+        Lê e interpreta a tabela do relatório uma única vez.
+        
+        Com o driver, a tabela é lida direto no navegador (execute_script);
+        com o HTML informado, com o parser configurado. As chamadas seguintes
+        reaproveitam o resultado.
+        
+        Returns:
+            Relatório com as linhas e a célula de total
+        """
+        if self._relatorio is None:
+            if self.html is None:
+                self.wait_for_table_load()
+                self._relatorio = self._parse_script()
+            else:
+                self._relatorio = parse_relatorio(self.html, self.parser)
+        return self._relatorio
+    
+    def _parse_script(self) -> RelatorioParseado:
+        """Lê as linhas e a célula de total com um único execute_script."""
+        resultado = self.driver.execute_script(TABLE_SCRIPT)
+        if resultado is None:
+            raise ValueError("Tabela não encontrada na página")
+        
+        linhas = [(colspan, cells) for colspan, cells in resultado['rows']]
+        return RelatorioParseado(linhas, resultado['total'])
+    
     def extract_assinantes(self) -> List[Assinante]:
         """
         Extrai todos os assinantes da tabela HTML.
@@ -89,54 +577,54 @@ class CashbarberExtractor:
         Returns:
             Lista de objetos Assinante com os dados extraídos
         """
+        if self._assinantes is not None:
+            return self._assinantes
+        
         try:
-            self.wait_for_table_load()
+            relatorio = self.get_relatorio()
             
-            # Pega o HTML completo da página
-            html_content = self.driver.page_source
-            soup = BeautifulSoup(html_content, 'html.parser')
+            logger.info(f"Processando {len(relatorio.linhas)} linhas da tabela...")
             
-            # Localiza a tabela
-            table = soup.find('table', class_='table-striped')
-            if not table:
-                raise ValueError("Tabela não encontrada no HTML")
+            self._assinantes = relatorio.assinantes()
             
-            tbody = table.find('tbody')
-            if not tbody:
-                raise ValueError("Corpo da tabela não encontrado")
+            logger.info(f"✓ {len(self._assinantes)} assinantes extraídos com sucesso")
+            return self._assinantes
             
-            assinantes = []
-            rows = tbody.find_all('tr')
+        except Exception as e:
+            logger.error(f"Erro ao extrair assinantes: {e}")
+            raise
+    
+    def extract_colunar(self) -> AssinantesColunar:
+        """
+        Extrai todos os assinantes da tabela em formato colunar (compacto).
+        
+        Returns:
+            `AssinantesColunar` com os dados extraídos
+        """
+        if self._colunar is not None:
+            return self._colunar
+        
+        try:
+            relatorio = self.get_relatorio()
             
-            logger.info(f"Processando {len(rows)} linhas da tabela...")
+            logger.info(f"Processando {len(relatorio.linhas)} linhas da tabela...")
             
-            for row in rows:
-                cols = row.find_all('td')
-                
-                # Pula linha de total (tem colspan)
-                if len(cols) < 4 or cols[0].get('colspan'):
-                    continue
-                
-                try:
-                    assinante = Assinante(
-                        nome=cols[0].text.strip(),
-                        plano=cols[1].text.strip(),
-                        status=cols[2].text.strip(),
-                        data_criacao=cols[3].text.strip()
-                    )
-                    assinantes.append(assinante)
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao processar linha: {e}")
-                    continue
+            self._colunar = relatorio.colunar()
             
-            logger.info(f"✓ {len(assinantes)} assinantes extraídos com sucesso")
-            return assinantes
+            logger.info(f"✓ {len(self._colunar)} assinantes extraídos com sucesso")
+            return self._colunar
             
         except Exception as e:
             logger.error(f"Erro ao extrair assinantes: {e}")
             raise
     
+    def get_estatisticas(self) -> EstatisticasAssinantes:
+        """
+        Estatísticas e índices da extração (contagens por status, plano,
+        plano/status e período; posições por status).
+        """
+        return self.extract_colunar().estatisticas
+    
     def get_total_count(self) -> Optional[int]:
         """
         Extrai o total de assinantes da última linha da tabela.
@@ -145,31 +633,38 @@ class CashbarberExtractor:
             Número total de assinantes ou None se não encontrado
         """
         try:
-            html_content = self.driver.page_source
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            table = soup.find('table', class_='table-striped')
-            if not table:
-                return None
-            
-            tbody = table.find('tbody')
-            if not tbody:
-                return None
-            
-            # Última linha tem o total
-            last_row = tbody.find_all('tr')[-1]
-            total_col = last_row.find_all('td')[-1]
-            
-            if total_col.find('b'):
-                total_text = total_col.find('b').text.strip()
-                return int(total_text)
-            
-            return None
+            return self.get_relatorio().total
             
         except Exception as e:
             logger.warning(f"Não foi possível extrair total: {e}")
             return None
     
+    def verificar_total(self) -> bool:
+        """
+        Confere a quantidade de linhas extraídas com a linha de total da tabela.
+        
+        Returns:
+            False se o total existir e divergir das linhas extraídas
+        """
+        total = self.get_total_count()
+        if self._assinantes is not None:
+            extraidos = len(self._assinantes)
+        else:
+            extraidos = len(self.extract_colunar())
+        
+        if total is None:
+            logger.warning("Linha de total não encontrada; contagem não verificada")
+            return True
+        
+        if total != extraidos:
+            logger.warning(
+                f"⚠️  Total da tabela ({total}) diferente das linhas extraídas ({extraidos})"
+            )
+            return False
+        
+        logger.info(f"✓ Contagem confere com o total da tabela ({total})")
+        return True
+    
     def normalize_status(self, status: str) -> str:
         """
         Normaliza o status para formato padronizado.
@@ -180,58 +675,228 @@ class CashbarberExtractor:
         Returns:
             Status normalizado
         """
-        status_map = {
-            'Em dia': 'ativo',
-            'Pagamento recusado': 'inadimplente',
-            'Cancelado': 'cancelado',
-            'Pendente': 'pendente'
-        }
-        
-        return status_map.get(status, 'desconhecido')
+        return STATUS_MAP.get(status, 'desconhecido')
     
-    def filter_by_status(self, assinantes: List[Assinante], status: str) -> List[Assinante]:
+    def filter_by_status(
+        self, assinantes: Union[List[Assinante], AssinantesColunar], status: str
+    ) -> List[Assinante]:
         """
         Filtra assinantes por status específico.
         
         Args:
-            assinantes: Lista de assinantes
+            assinantes: Lista de assinantes (ou `AssinantesColunar`)
             status: Status para filtrar
         
         Returns:
             Lista filtrada de assinantes
         """
-        return [a for a in assinantes if a.status.lower() == status.lower()]
+        if isinstance(assinantes, AssinantesColunar):
+            return assinantes.filtrar_status(status)
+        
+        alvo = status.lower()
+        return [a for a in assinantes if a.status.lower() == alvo]
     
-    def get_statistics(self, assinantes: List[Assinante]) -> Dict:
+    def get_statistics(
+        self, assinantes: Optional[Union[List[Assinante], AssinantesColunar]] = None
+    ) -> Dict:
         """
         Gera estatísticas sobre os assinantes extraídos.
         
         Args:
-            assinantes: Lista de assinantes
+            assinantes: Lista de assinantes ou `AssinantesColunar`
+                (padrão: os extraídos do relatório)
         
         Returns:
             Dicionário com estatísticas
         """
-        stats = {
+        if assinantes is None:
+            assinantes = self.extract_colunar()
+        
+        if isinstance(assinantes, AssinantesColunar):
+            # Contagens já mantidas durante a extração
+            estatisticas = assinantes.estatisticas
+            return {
+                'total': estatisticas.total,
+                'por_status': estatisticas.por_status(),
+                'por_plano': estatisticas.por_plano()
+            }
+        
+        return {
             'total': len(assinantes),
-            'por_status': {},
-            'por_plano': {}
+            'por_status': dict(Counter(a.status for a in assinantes)),
+            'por_plano': dict(Counter(a.plano for a in assinantes))
         }
+
+
+def _parse_bs4(html: str) -> RelatorioParseado:
+    """Interpreta o relatório com BeautifulSoup (html.parser)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Localiza a tabela
+    table = soup.find('table', class_='table-striped')
+    if not table:
+        raise ValueError("Tabela não encontrada no HTML")
+    
+    tbody = table.find('tbody')
+    if not tbody:
+        raise ValueError("Corpo da tabela não encontrado")
+    
+    linhas = []
+    total_texto = None
+    for row in tbody.find_all('tr'):
+        cols = row.find_all('td')
+        colspan = cols[0].get('colspan') if cols else None
+        linhas.append((colspan, [col.text for col in cols]))
         
-        # Conta por status
-        for assinante in assinantes:
-            status = assinante.status
-            stats['por_status'][status] = stats['por_status'].get(status, 0) + 1
+        # Última linha tem o total
+        negrito = cols[-1].find('b') if cols else None
+        total_texto = negrito.text if negrito else None
+    
+    return RelatorioParseado(linhas, total_texto)
+
+
+def _parse_lxml(html: str) -> RelatorioParseado:
+    """Interpreta o relatório com lxml, via XPath direto sobre o tbody."""
+    tables = lxml.html.document_fromstring(html).xpath(TABLE_XPATH)
+    if not tables:
+        raise ValueError("Tabela não encontrada no HTML")
+    
+    tbodies = tables[0].xpath('.//tbody')
+    if not tbodies:
+        raise ValueError("Corpo da tabela não encontrado")
+    
+    linhas = []
+    total_texto = None
+    for row in tbodies[0].iterdescendants('tr'):
+        cols = list(row.iterdescendants('td'))
+        colspan = cols[0].get('colspan') if cols else None
+        linhas.append((colspan, [''.join(col.itertext()) for col in cols]))
         
-        # Conta por plano
-        for assinante in assinantes:
-            plano = assinante.plano
-            stats['por_plano'][plano] = stats['por_plano'].get(plano, 0) + 1
+        # Última linha tem o total
+        negrito = next(cols[-1].iterdescendants('b'), None) if cols else None
+        total_texto = ''.join(negrito.itertext()) if negrito is not None else None
+    
+    return RelatorioParseado(linhas, total_texto)
+
+
+def _parse_selectolax(html: str) -> RelatorioParseado:
+    """Interpreta o relatório com selectolax (parser Lexbor)."""
+    if LexborHTMLParser is None:
+        raise ImportError("selectolax é necessário para o parser 'selectolax'")
+    
+    table = LexborHTMLParser(html).css_first('table.table-striped')
+    if table is None:
+        raise ValueError("Tabela não encontrada no HTML")
+    
+    tbody = table.css_first('tbody')
+    if tbody is None:
+        raise ValueError("Corpo da tabela não encontrado")
+    
+    linhas = []
+    total_texto = None
+    for row in tbody.css('tr'):
+        cols = row.css('td')
+        colspan = cols[0].attributes.get('colspan') if cols else None
+        linhas.append((colspan, [col.text(deep=True) for col in cols]))
         
-        return stats
+        # Última linha tem o total
+        negrito = cols[-1].css_first('b') if cols else None
+        total_texto = negrito.text(deep=True) if negrito is not None else None
+    
+    return RelatorioParseado(linhas, total_texto)
 
 
-def extract_from_driver(driver: webdriver.Chrome) -> List[Dict]:
+def iter_linhas_html(
+    chunks: Iterable[Union[str, bytes]], encoding: str = 'utf-8'
+) -> Iterator[Tuple[Optional[str], List[str], Optional[str]]]:
+    """
+    Lê as linhas da tabela do relatório incrementalmente (lxml HTMLPullParser).
+    
+    Cada linha é descartada da árvore logo após ser lida, então a memória
+    usada não cresce com o tamanho do relatório.
+    
+    Args:
+        chunks: Pedaços do HTML, na ordem (ex.: `response.iter_content`)
+        encoding: Codificação dos pedaços em bytes (texto é usado como está)
+    
+    Yields:
+        Tupla (colspan da 1ª célula, textos das células, texto do <b> da
+        última célula) para cada linha do tbody
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    table = None
+    tbody = None
+    
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            
+            for evento, el in parser.read_events():
+                if evento == 'start':
+                    if (table is None and el.tag == 'table'
+                            and 'table-striped' in (el.get('class') or '').split()):
+                        table = el
+                    elif table is not None and tbody is None and el.tag == 'tbody':
+                        tbody = el
+                    continue
+                
+                if el is tbody:
+                    return
+                if el is table:
+                    raise ValueError("Corpo da tabela não encontrado")
+                
+                # Só as linhas do tbody (no 'end' o conteúdo da linha está completo)
+                if el.tag != 'tr' or tbody is None or el.getparent() is not tbody:
+                    continue
+                
+                cols = list(el.iterdescendants('td'))
+                colspan = cols[0].get('colspan') if cols else None
+                negrito = next(cols[-1].iterdescendants('b'), None) if cols else None
+                yield (
+                    colspan,
+                    [''.join(col.itertext()) for col in cols],
+                    ''.join(negrito.itertext()) if negrito is not None else None
+                )
+                
+                # Libera a linha lida (e as anteriores) da árvore
+                el.clear()
+                while el.getprevious() is not None:
+                    del tbody[0]
+        
+        if table is None:
+            raise ValueError("Tabela não encontrada no HTML")
+        if tbody is None:
+            raise ValueError("Corpo da tabela não encontrado")
+    
+    finally:
+        # Interrompe o download se a tabela terminou antes do fim da página
+        fechar = getattr(chunks, 'close', None)
+        if fechar is not None:
+            fechar()
+
+
+PARSER_BACKENDS: Dict[str, Callable[[str], RelatorioParseado]] = {
+    PARSER_BS4: _parse_bs4,
+    PARSER_LXML: _parse_lxml,
+    PARSER_SELECTOLAX: _parse_selectolax,
+}
+
+
+def parse_relatorio(html: str, parser: str = PARSER_LXML) -> RelatorioParseado:
+    """
+    Interpreta o HTML do relatório com o parser escolhido.
+    
+    Args:
+        html: HTML da página do relatório
+        parser: 'lxml', 'bs4' ou 'selectolax'
+    
+    Returns:
+        Relatório com as linhas e a célula de total
+    """
+    return PARSER_BACKENDS[parser](html)
+
+
+def extract_from_driver(driver: webdriver.Chrome) -> AssinantesColunar:
     """
     Função helper para extrair dados de um driver já posicionado.
     
@@ -239,10 +904,90 @@ def extract_from_driver(driver: webdriver.Chrome) -> List[Dict]:
         driver: WebDriver do Selenium já autenticado e na página do relatório
     
     Returns:
-        Lista de dicionários com dados dos assinantes
+        Assinantes em colunas (iterável de `Assinante`, consumido direto
+        pela sincronização)
+    """
+    return _extract(CashbarberExtractor(driver))
+
+
+def extract_from_html(html: str, parser: Optional[str] = None) -> AssinantesColunar:
+    """
+    Função helper para extrair dados do HTML do relatório (sem navegador).
+    
+    Args:
+        html: HTML da página do relatório
+        parser: Parser do HTML (padrão: CASHBARBER_HTML_PARSER ou 'lxml')
+    
+    Returns:
+        Assinantes em colunas (iterável de `Assinante`, consumido direto
+        pela sincronização)
+    """
+    return _extract(CashbarberExtractor(html=html, parser=parser))
+
+
+def stream_from_html(chunks: Iterable[Union[str, bytes]], encoding: str = 'utf-8') -> RelatorioStream:
+    """
+    Função helper para extrair assinantes sob demanda a partir do HTML.
+    
+    Args:
+        chunks: Pedaços do HTML do relatório (ex.: `stream_relatorio_html`)
+        encoding: Codificação dos pedaços em bytes
+    
+    Returns:
+        Iterável de `Assinante`
+    """
+    return RelatorioStream(iter_linhas_html(chunks, encoding))
+
+
+def stream_from_driver(
+    driver: webdriver.Chrome, batch_size: int = STREAM_DRIVER_BATCH
+) -> RelatorioStream:
+    """
+    Função helper para extrair assinantes sob demanda de um driver já posicionado.
+    
+    As células são lidas em lotes de `batch_size` linhas (um execute_script
+    por lote), conforme os assinantes são consumidos; nem a página nem a
+    tabela inteira passam de uma vez pelo WebDriver.
+    
+    Args:
+        driver: WebDriver do Selenium já autenticado e na página do relatório
+        batch_size: Linhas da tabela lidas por chamada
+    
+    Returns:
+        Iterável de `Assinante`
     """
     extractor = CashbarberExtractor(driver)
-    assinantes = extractor.extract_assinantes()
+    extractor.wait_for_table_load()
+    
+    # O primeiro lote é lido já aqui para acusar a falta da tabela
+    primeiro = driver.execute_script(TABLE_ROWS_SCRIPT, 0, batch_size)
+    if primeiro is None:
+        raise ValueError("Tabela não encontrada na página")
+    
+    def linhas():
+        lote = primeiro
+        inicio = 0
+        while True:
+            rows = lote['rows']
+            for i, (colspan, cells) in enumerate(rows):
+                ultima = lote['fim'] and i == len(rows) - 1
+                yield colspan, cells, lote['total'] if ultima else None
+            
+            if lote['fim']:
+                return
+            
+            inicio += len(rows)
+            lote = driver.execute_script(TABLE_ROWS_SCRIPT, inicio, batch_size)
+            if lote is None:
+                raise ValueError("Tabela do relatório mudou durante a leitura")
+    
+    return RelatorioStream(linhas())
+
+
+def _extract(extractor: CashbarberExtractor) -> AssinantesColunar:
+    """Extrai os assinantes e registra as estatísticas no log."""
+    assinantes = extractor.extract_colunar()
+    extractor.verificar_total()
     
     # Log de estatísticas
     stats = extractor.get_statistics(assinantes)
@@ -251,4 +996,4 @@ def extract_from_driver(driver: webdriver.Chrome) -> List[Dict]:
     logger.info(f"  Por Status: {stats['por_status']}")
     logger.info(f"  Planos únicos: {len(stats['por_plano'])}")
     
-    return [a.to_dict() for a in assinantes]
+    return assinantes
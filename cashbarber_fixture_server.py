@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o painel Cashbarber, para testes e benchmarks offline.
+
+Páginas servidas:
+- GET  /login                  → formulário de login (token CSRF em _token)
+- POST /login                  → valida token e credenciais, cria a sessão
+- GET  /                       → painel com o menu Relatórios → Assinaturas
+- GET  /relatorio/relatorio19  → tabela de Quantidade de assinantes
+- GET  /relatorio/relatorio19/dados → linhas em JSON (com --xhr, a tabela
+                                      é preenchida por essa chamada)
+
+Uso:
+    python cashbarber_fixture_server.py --port 8899 --rows 1000
+    python cashbarber_fixture_server.py --rows 1000 --benchmark
+    python cashbarber_fixture_server.py --benchmark-parsers --sizes 1000,10000,50000
+    python cashbarber_fixture_server.py --check-parsers
+    python cashbarber_fixture_server.py --rows 1000 --benchmark-profiles
+    python cashbarber_fixture_server.py --rows 1000 --record-network gravacao.json [--xhr]
+    python cashbarber_fixture_server.py --port 8899 --no-charset
+
+Para apontar o sincronizador para o servidor:
+    CASHBARBER_BASE_URL=http://127.0.0.1:8899 python main.py \\
+        --email teste@example.com --password teste --dry-run
+"""
+
+import argparse
+import base64
+import html
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+FIXTURE_EMAIL = 'teste@example.com'
+FIXTURE_PASSWORD = 'teste'
+
+PLANOS = ['Plano Mensal', 'Plano Trimestral', 'Plano Anual', 'Plano Barba', 'Plano Corte + Barba']
+STATUS = ['Em dia', 'Em dia', 'Em dia', 'Pagamento recusado', 'Cancelado', 'Pendente']
+PRIMEIROS_NOMES = [
+    'João', 'Maria', 'Pedro', 'Ana', 'Lucas', 'Gabriel', 'Rafael', 'Bruno', 'Carlos',
+    'Felipe', 'Mateus', 'Júlia', 'Beatriz', 'Thiago', 'Rodrigo', 'Marcos', 'Paulo'
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves',
+    'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho'
+]
+
+
+def gerar_assinantes(quantidade: int, seed: int = 42) -> List[Tuple[str, str, str, str]]:
+    """
+    Gera assinantes sintéticos (nome, plano, status, data de criação).
+
+    Args:
+        quantidade: Número de linhas
+        seed: Semente do gerador (mesma semente → mesmas linhas)
+    """
+    rng = random.Random(seed)
+    linhas = []
+    for _ in range(quantidade):
+        nome = ' '.join([rng.choice(PRIMEIROS_NOMES)] + rng.sample(SOBRENOMES, rng.randint(1, 3)))
+        data = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2019, 2025)}"
+        linhas.append((nome, rng.choice(PLANOS), rng.choice(STATUS), data))
+    return linhas
+
+
+# Recursos estáticos pesados, como os do tema do painel (servidos com atraso)
+ASSETS = {
+    '/assets/app.css': ('text/css', 200_000),
+    '/assets/fonts/poppins.woff2': ('font/woff2', 100_000),
+    '/assets/logo.png': ('image/png', 150_000),
+}
+ASSET_DELAY = 0.1
+ASSETS_HEAD = (
+    '<link rel="stylesheet" href="/assets/app.css">'
+    '<link rel="preload" as="font" crossorigin href="/assets/fonts/poppins.woff2">'
+)
+ASSETS_BODY = '<img src="/assets/logo.png" alt="logo">\n'
+
+
+def render_login(token: str, erro: bool = False) -> str:
+    """HTML da página de login (mesmos nomes de campos do painel real)."""
+    aviso = '<div class="alert alert-danger">Credenciais inválidas</div>' if erro else ''
+    return f"""<!DOCTYPE html>
+<html><head><meta name="csrf-token" content="{token}"><title>Login</title></head>
+<body>
+{aviso}
+<form class="kt-form" method="POST" action="/login">
+  <input type="hidden" name="_token" value="{token}">
+  <input type="text" name="email" placeholder="Email">
+  <input type="password" name="password" placeholder="Senha">
+  <button type="submit" id="kt_login_signin_submit">Acessar</button>
+</form>
+</body></html>"""
+
+
+def render_painel() -> str:
+    """HTML do painel com o menu lateral (submenus abrem ao clicar)."""
+    return """<!DOCTYPE html>
+<html><head><title>Painel</title>
+<style>.kt-menu__submenu { display: none; } .kt-menu__item--open > .kt-menu__submenu { display: block; }</style>
+""" + ASSETS_HEAD + """
+</head><body>
+""" + ASSETS_BODY + """<div id="kt_aside_menu">
+<ul class="kt-menu__nav">
+  <li class="kt-menu__item kt-menu__item--submenu">
+    <a href="javascript:;" class="kt-menu__link kt-menu__toggle">
+      <span class="kt-menu__link-text">Relatórios</span></a>
+    <div class="kt-menu__submenu"><ul class="kt-menu__subnav">
+      <li class="kt-menu__item kt-menu__item--submenu">
+        <a href="javascript:;" class="kt-menu__link kt-menu__toggle">
+          <span class="kt-menu__link-text">Assinaturas</span></a>
+        <div class="kt-menu__submenu"><ul class="kt-menu__subnav">
+          <li class="kt-menu__item"><a href="/relatorio/relatorio19" class="kt-menu__link">
+            <span class="kt-menu__link-text">Quantidade de assinantes</span></a></li>
+        </ul></div>
+      </li>
+    </ul></div>
+  </li>
+</ul>
+</div>
+<script>
+document.querySelectorAll('.kt-menu__toggle').forEach(function (link) {
+  link.addEventListener('click', function () {
+    link.parentElement.classList.toggle('kt-menu__item--open');
+  });
+});
+</script>
+</body></html>"""
+
+
+def render_relatorio(assinantes: List[Tuple[str, str, str, str]]) -> str:
+    """
+    HTML do relatório de Quantidade de assinantes.
+
+    Segue o formato lido por `CashbarberExtractor`: tabela `table-striped`,
+    uma linha por assinante (Cliente, Plano, Status, Data) e uma linha final
+    de total com colspan.
+    """
+    partes = [
+        "<!DOCTYPE html>\n<html><head><title>Quantidade de assinantes</title>",
+        ASSETS_HEAD,
+        "</head><body>\n",
+        ASSETS_BODY,
+        render_painel_menu_minimo(),
+        '<form method="GET"><button type="submit" class="btn btn-primary">Filtrar</button></form>\n',
+        '<table class="table table-striped table-bordered">\n',
+        "<thead><tr><th>Cliente</th><th>Plano</th><th>Status</th><th>Data de criação</th></tr></thead>\n",
+        "<tbody>\n",
+    ]
+    for nome, plano, status, data in assinantes:
+        partes.append(
+            f"<tr><td>{html.escape(nome)}</td><td>{html.escape(plano)}</td>"
+            f"<td>{html.escape(status)}</td><td>{data}</td></tr>\n"
+        )
+    partes.append(
+        f'<tr><td colspan="3"><b>Total</b></td><td><b>{len(assinantes)}</b></td></tr>\n'
+    )
+    partes.append("</tbody></table>\n</body></html>")
+    return ''.join(partes)
+
+
+def render_relatorio_xhr() -> str:
+    """
+    Variante do relatório em que a tabela chega vazia e é preenchida pelo
+    JSON de /relatorio/relatorio19/dados (como em painéis com DataTables).
+    """
+    return """<!DOCTYPE html>
+<html><head><title>Quantidade de assinantes</title>""" + ASSETS_HEAD + """</head><body>
+""" + ASSETS_BODY + render_painel_menu_minimo() + """<form method="GET"><button type="submit" class="btn btn-primary">Filtrar</button></form>
+<table class="table table-striped table-bordered">
+<thead><tr><th>Cliente</th><th>Plano</th><th>Status</th><th>Data de criação</th></tr></thead>
+<tbody></tbody></table>
+<script>
+fetch('/relatorio/relatorio19/dados').then(function (r) { return r.json(); }).then(function (dados) {
+  var tbody = document.querySelector('table.table-striped tbody');
+  var html = dados.data.map(function (linha) {
+    return '<tr>' + linha.map(function (c) {
+      var td = document.createElement('td'); td.textContent = c; return td.outerHTML;
+    }).join('') + '</tr>';
+  });
+  html.push('<tr><td colspan="3"><b>Total</b></td><td><b>' + dados.data.length + '</b></td></tr>');
+  tbody.innerHTML = html.join('');
+});
+</script>
+</body></html>"""
+
+
+def render_dados_json(
+    assinantes: List[Tuple[str, str, str, str]], inicio: int = 0, quantidade: int = -1
+) -> str:
+    """
+    Linhas do relatório no formato JSON do DataTables ({"data": [...],
+    "recordsTotal": ..., "recordsFiltered": ...}).
+
+    `inicio` e `quantidade` seguem os parâmetros `start` e `length` da
+    paginação no servidor (quantidade -1 = todas as linhas).
+    """
+    fim = len(assinantes) if quantidade < 0 else inicio + quantidade
+    return json.dumps({
+        'recordsTotal': len(assinantes),
+        'recordsFiltered': len(assinantes),
+        'data': [list(linha) for linha in assinantes[inicio:fim]],
+    }, ensure_ascii=False)
+
+
+def render_painel_menu_minimo() -> str:
+    """Menu lateral (sem scripts) incluído nas páginas internas."""
+    return '<div id="kt_aside_menu"><a href="/relatorio/relatorio19">Quantidade de assinantes</a></div>\n'
+
+
+class FixtureState:
+    """Estado compartilhado do servidor (tokens, sessões e relatório)."""
+
+    def __init__(self, rows: int, seed: int = 42, xhr: bool = False, charset: bool = True):
+        self.tokens = set()
+        self.sessions = set()
+        self.lock = threading.Lock()
+        assinantes = gerar_assinantes(rows, seed)
+        self.assinantes = assinantes
+        pagina = render_relatorio_xhr() if xhr else render_relatorio(assinantes)
+        self.relatorio_html = pagina.encode('utf-8')
+        self.dados_json = render_dados_json(assinantes).encode('utf-8')
+        # Sem charset, o relatório (UTF-8) sai como 'text/html' puro
+        self.relatorio_tipo = 'text/html; charset=utf-8' if charset else 'text/html'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Handler HTTP que imita as páginas usadas do painel."""
+
+    state: FixtureState = None
+
+    def log_message(self, format, *args):  # noqa: A002 - assinatura do BaseHTTPRequestHandler
+        pass
+
+    def _session_id(self) -> Optional[str]:
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        morsel = cookie.get('cashbarber_session')
+        return morsel.value if morsel else None
+
+    def _autenticado(self) -> bool:
+        return self._session_id() in self.state.sessions
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b'',
+        headers: Optional[Dict[str, str]] = None,
+        content_type: str = 'text/html; charset=utf-8'
+    ) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(302, headers={'Location': location, **(headers or {})})
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+
+        if path in ASSETS:
+            tipo, tamanho = ASSETS[path]
+            time.sleep(ASSET_DELAY)
+            self.send_response(200)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(tamanho))
+            self.end_headers()
+            self.wfile.write(b'\0' * tamanho)
+        elif path == '/login':
+            token = secrets.token_hex(16)
+            with self.state.lock:
+                self.state.tokens.add(token)
+            self._send(200, render_login(token).encode('utf-8'))
+        elif not self._autenticado():
+            self._redirect('/login')
+        elif path in ('/', '/dashboard'):
+            self._send(200, render_painel().encode('utf-8'))
+        elif path == '/relatorio/relatorio19':
+            self._send(200, self.state.relatorio_html, content_type=self.state.relatorio_tipo)
+        elif path == '/relatorio/relatorio19/dados':
+            params = parse_qs(query)
+            if 'start' in params or 'length' in params:
+                corpo = render_dados_json(
+                    self.state.assinantes,
+                    int(params.get('start', ['0'])[0]),
+                    int(params.get('length', ['-1'])[0])
+                ).encode('utf-8')
+            else:
+                corpo = self.state.dados_json
+            self._send(200, corpo, content_type='application/json; charset=utf-8')
+        else:
+            self._send(404, b'Not found')
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != '/login':
+            self._send(404, b'Not found')
+            return
+
+        tamanho = int(self.headers.get('Content-Length', 0))
+        dados = parse_qs(self.rfile.read(tamanho).decode('utf-8'))
+        token = dados.get('_token', [''])[0]
+        email = dados.get('email', [''])[0]
+        password = dados.get('password', [''])[0]
+
+        with self.state.lock:
+            token_valido = token in self.state.tokens
+            self.state.tokens.discard(token)
+
+        if not token_valido:
+            self._send(419, b'Page expired')
+            return
+
+        if email != FIXTURE_EMAIL or password != FIXTURE_PASSWORD:
+            self._redirect('/login')
+            return
+
+        session_id = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions.add(session_id)
+        self._redirect('/', {'Set-Cookie': f'cashbarber_session={session_id}; Path=/; HttpOnly'})
+
+
+def start_fixture_server(
+    port: int = 0,
+    rows: int = 1000,
+    seed: int = 42,
+    xhr: bool = False,
+    charset: bool = True
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Inicia o servidor em uma thread em segundo plano.
+
+    Args:
+        port: Porta (0 = escolhe uma livre)
+        rows: Número de assinantes no relatório
+        seed: Semente dos dados sintéticos
+        xhr: Tabela preenchida via XHR (JSON) em vez de renderizada no servidor
+        charset: Informa o charset no Content-Type do relatório (False imita
+            servidores que mandam só 'text/html')
+
+    Returns:
+        Tupla (servidor, URL base); encerre com `servidor.shutdown()`
+    """
+    handler = type('Handler', (FixtureHandler,), {'state': FixtureState(rows, seed, xhr, charset)})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def gravar_rede(
+    path: str,
+    rows: int = 1000,
+    seed: int = 42,
+    xhr: bool = False,
+    base_url: str = 'http://127.0.0.1:8899'
+) -> None:
+    """
+    Grava uma sessão de rede sintética no formato de `NetworkRecording`
+    (eventos Network.* do log de performance do Chrome + corpos), para
+    testar `network_capture.py` sem navegador.
+
+    Inclui o documento do relatório, os recursos estáticos e, com `xhr`,
+    as chamadas do DataTables, na ordem:
+
+    1. primeira página (10 linhas de `rows`);
+    2. todas as linhas antes do "Filtrar" (sem o último assinante);
+    3. todas as linhas após o "Filtrar" (o relatório correto);
+    4. segunda página, pedida por último.
+
+    A extração deve ignorar as páginas e ficar com a resposta 3.
+    """
+    assinantes = gerar_assinantes(rows, seed)
+    pagina = base_url + '/relatorio/relatorio19'
+
+    documento = render_relatorio_xhr() if xhr else render_relatorio(assinantes)
+
+    respostas = [('1', pagina, 'Document', 'text/html', documento)]
+    for numero, (asset, (tipo, _)) in enumerate(ASSETS.items(), start=2):
+        recurso = 'Stylesheet' if tipo == 'text/css' else 'Image' if tipo.startswith('image') else 'Font'
+        respostas.append((str(numero), base_url + asset, recurso, tipo, None))
+    if xhr:
+        dados = pagina + '/dados'
+        chamadas = [
+            ('start=0&length=10', render_dados_json(assinantes, 0, 10)),
+            ('start=0&length=-1', render_dados_json(assinantes[:-1])),
+            ('start=0&length=-1', render_dados_json(assinantes)),
+            ('start=10&length=10', render_dados_json(assinantes, 10, 10)),
+        ]
+        for numero, (query, corpo) in enumerate(chamadas, start=len(respostas) + 1):
+            respostas.append((str(numero), f'{dados}?{query}', 'XHR', 'application/json', corpo))
+
+    events = []
+    bodies = {}
+    for request_id, url, recurso, mime, corpo in respostas:
+        events.append({'method': 'Network.requestWillBeSent', 'params': {
+            'requestId': request_id, 'documentURL': pagina, 'type': recurso,
+            'request': {'url': url, 'method': 'GET'},
+        }})
+        events.append({'method': 'Network.responseReceived', 'params': {
+            'requestId': request_id, 'type': recurso,
+            'response': {'url': url, 'status': 200, 'mimeType': mime},
+        }})
+        events.append({'method': 'Network.loadingFinished', 'params': {'requestId': request_id}})
+        if corpo is not None:
+            # O Chrome devolve alguns corpos em base64; a gravação cobre os dois casos
+            if recurso == 'XHR':
+                bodies[request_id] = {'body': corpo, 'base64Encoded': False}
+            else:
+                codificado = base64.b64encode(corpo.encode('utf-8')).decode('ascii')
+                bodies[request_id] = {'body': codificado, 'base64Encoded': True}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'events': events, 'bodies': bodies}, f, ensure_ascii=False)
+
+
+def benchmark(base_url: str, repeticoes: int = 3, headless: bool = True) -> Dict[str, float]:
+    """
+    Mede login + busca do relatório com cada engine contra o servidor.
+
+    Returns:
+        Dicionário engine → tempo médio em segundos
+    """
+    import os
+
+    os.environ['CASHBARBER_BASE_URL'] = base_url
+
+    from cashbarber_full_navigation import (
+        login_cashbarber, login_cashbarber_http, navigate_direto, fetch_relatorio_html
+    )
+    from cashbarber_extractor import extract_from_driver, extract_from_html
+
+    def via_http():
+        session = login_cashbarber_http(FIXTURE_EMAIL, FIXTURE_PASSWORD)
+        return len(extract_from_html(fetch_relatorio_html(session)))
+
+    def via_selenium():
+        driver = login_cashbarber(FIXTURE_EMAIL, FIXTURE_PASSWORD, headless=headless)
+        try:
+            navigate_direto(driver)
+            return len(extract_from_driver(driver))
+        finally:
+            driver.quit()
+
+    resultados = {}
+    for engine, executar in (('http', via_http), ('selenium', via_selenium)):
+        tempos = []
+        try:
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                linhas = executar()
+                tempos.append(time.perf_counter() - inicio)
+        except Exception as e:
+            print(f"{engine}: indisponível ({e})")
+            continue
+        resultados[engine] = sum(tempos) / len(tempos)
+        print(f"{engine}: {resultados[engine]:.3f}s em média ({linhas} linhas)")
+
+    return resultados
+
+
+# Relatório com casos de borda das células (vazias, &nbsp;, tags aninhadas,
+# entidades, comentários e quebras de linha) e os assinantes esperados
+RELATORIO_BORDAS = """<!DOCTYPE html>
+<html><head><title>Quantidade de assinantes</title></head><body>
+<table class="table table-striped table-bordered">
+<thead><tr><th>Cliente</th><th>Plano</th><th>Status</th><th>Data de criação</th></tr></thead>
+<tbody>
+<tr><td>  João&nbsp;Silva </td><td>Plano&nbsp;Mensal</td><td>Em dia</td><td>01/02/2024</td></tr>
+<tr><td><a href="/clientes/2"><span>Maria</span> <b>Souza</b></a></td><td><span class="badge">Plano Anual</span></td><td><span class="label label-danger">Cancelado</span></td><td>03/04/2024</td></tr>
+<tr><td></td><td>Plano Barba</td><td>Pendente</td><td></td></tr>
+<tr><td>Pedro &amp; Filhos<!-- id 4 --></td><td>Plano Corte + Barba</td><td>&nbsp;</td><td>05/06/2024</td></tr>
+<tr><td>Ana
+    Lima</td><td>Plano Mensal</td><td>Em dia</td><td><span>07/08/2024</span></td></tr>
+<tr><td colspan="3"><b>Total</b></td><td><b> 5 </b></td></tr>
+</tbody></table>
+</body></html>"""
+
+ASSINANTES_BORDAS = [
+    ('João Silva', 'Plano Mensal', 'Em dia', '01/02/2024'),
+    ('Maria Souza', 'Plano Anual', 'Cancelado', '03/04/2024'),
+    ('', 'Plano Barba', 'Pendente', ''),
+    ('Pedro & Filhos', 'Plano Corte + Barba', '', '05/06/2024'),
+    ('Ana Lima', 'Plano Mensal', 'Em dia', '07/08/2024'),
+]
+
+
+def verificar_parsers(tamanho: int = 1000, seed: int = 42) -> List[str]:
+    """
+    Confere a paridade dos parsers de HTML do extrator.
+
+    Todos os parsers (e a leitura incremental de `stream_from_html`) devem
+    produzir exatamente os assinantes e o total esperados, tanto no
+    relatório de casos de borda quanto em um relatório sintético de
+    `tamanho` linhas.
+
+    Returns:
+        Lista de divergências (vazia se todos concordam)
+    """
+    from cashbarber_extractor import PARSERS, parse_relatorio, stream_from_html
+
+    sinteticos = gerar_assinantes(tamanho, seed)
+    paginas = [
+        ('bordas', RELATORIO_BORDAS, ASSINANTES_BORDAS),
+        (f'{tamanho} linhas', render_relatorio(sinteticos), sinteticos),
+    ]
+
+    divergencias = []
+    for descricao, pagina, esperado in paginas:
+        esperado = ([list(linha) for linha in esperado], len(esperado))
+
+        obtidos = {}
+        for nome in PARSERS:
+            try:
+                relatorio = parse_relatorio(pagina, nome)
+            except ImportError as e:
+                print(f"{descricao:<12} {nome:<10}: indisponível ({e})")
+                continue
+            obtidos[nome] = (
+                [[a.nome, a.plano, a.status, a.data_criacao] for a in relatorio.assinantes()],
+                relatorio.total
+            )
+
+        stream = stream_from_html([pagina[i:i + 4096] for i in range(0, len(pagina), 4096)])
+        obtidos['stream'] = (
+            [[a.nome, a.plano, a.status, a.data_criacao] for a in stream],
+            stream.total
+        )
+
+        for nome, obtido in obtidos.items():
+            if obtido == esperado:
+                print(f"{descricao:<12} {nome:<10}: ok")
+                continue
+
+            linhas_obtidas, total = obtido
+            diferentes = [
+                (i, linha, linhas_obtidas[i] if i < len(linhas_obtidas) else None)
+                for i, linha in enumerate(esperado[0])
+                if i >= len(linhas_obtidas) or linhas_obtidas[i] != linha
+            ]
+            detalhe = (
+                f"linha {diferentes[0][0]}: esperado {diferentes[0][1]}, obtido {diferentes[0][2]}"
+                if diferentes else f"{len(linhas_obtidas)} linhas, total {total}"
+            )
+            divergencias.append(f"{descricao} / {nome}: {detalhe}")
+            print(f"{descricao:<12} {nome:<10}: DIVERGENTE ({detalhe})")
+
+    return divergencias
+
+
+def benchmark_parsers(
+    tamanhos: List[int], repeticoes: int = 3, seed: int = 42
+) -> Tuple[Dict[int, Dict[str, float]], List[str]]:
+    """
+    Compara os parsers de HTML do extrator em relatórios sintéticos.
+
+    Cada parser precisa produzir os mesmos assinantes e o mesmo total que o
+    BeautifulSoup (referência); divergências são reportadas.
+
+    Returns:
+        Tupla (tamanho → {parser: tempo médio em segundos}, divergências)
+    """
+    from cashbarber_extractor import PARSERS, PARSER_BS4, parse_relatorio
+
+    resultados = {}
+    divergencias = []
+    for tamanho in tamanhos:
+        pagina = render_relatorio(gerar_assinantes(tamanho, seed))
+        referencia = parse_relatorio(pagina, PARSER_BS4)
+        esperado = (referencia.assinantes(), referencia.total)
+
+        resultados[tamanho] = {}
+        for nome in PARSERS:
+            tempos = []
+            try:
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    relatorio = parse_relatorio(pagina, nome)
+                    obtido = (relatorio.assinantes(), relatorio.total)
+                    tempos.append(time.perf_counter() - inicio)
+            except ImportError as e:
+                print(f"{tamanho:>7} linhas  {nome:<10}: indisponível ({e})")
+                continue
+
+            resultados[tamanho][nome] = sum(tempos) / len(tempos)
+            paridade = 'ok' if obtido == esperado else 'DIVERGENTE'
+            if obtido != esperado:
+                divergencias.append(f"{tamanho} linhas / {nome}")
+            print(
+                f"{tamanho:>7} linhas  {nome:<10}: "
+                f"{resultados[tamanho][nome] * 1000:8.1f} ms  (paridade: {paridade})"
+            )
+
+    return resultados, divergencias
+
+
+def benchmark_profiles(base_url: str, repeticoes: int = 3, headless: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Compara os perfis do Chrome: login + relatório, tempo de carregamento
+    da página e RSS do navegador.
+
+    Returns:
+        Dicionário perfil → médias de 'total', 'load' e 'rss_mb'
+    """
+    import os
+
+    os.environ['CASHBARBER_BASE_URL'] = base_url
+
+    from chrome_profile import PROFILES, ChromeProfile, page_load_metrics, chrome_rss_mb
+    from cashbarber_full_navigation import login_cashbarber, navigate_direto
+
+    resultados = {}
+    for nome in PROFILES:
+        medidas = {'total': [], 'load': [], 'rss_mb': []}
+        try:
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                driver = login_cashbarber(
+                    FIXTURE_EMAIL, FIXTURE_PASSWORD, headless=headless, profile=ChromeProfile(nome)
+                )
+                try:
+                    navigate_direto(driver)
+                    medidas['total'].append(time.perf_counter() - inicio)
+                    medidas['load'].append(page_load_metrics(driver)['load'])
+                    medidas['rss_mb'].append(chrome_rss_mb(driver) or 0.0)
+                finally:
+                    driver.quit()
+        except Exception as e:
+            print(f"{nome}: indisponível ({e})")
+            continue
+
+        resultados[nome] = {chave: sum(v) / len(v) for chave, v in medidas.items()}
+        print(
+            f"{nome:<8}: {resultados[nome]['total']:.3f}s login + relatório, "
+            f"load {resultados[nome]['load']:.3f}s, Chrome RSS {resultados[nome]['rss_mb']:.0f} MB"
+        )
+
+    return resultados
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Sobe o servidor de fixtures (ou executa o benchmark)."""
+    parser = argparse.ArgumentParser(description="Servidor local que imita o painel Cashbarber")
+    parser.add_argument('--port', type=int, default=8899, help='Porta (padrão: 8899)')
+    parser.add_argument('--rows', type=int, default=1000, help='Assinantes no relatório (padrão: 1000)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente dos dados sintéticos')
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help='Mede login + relatório com as engines HTTP e Selenium e encerra'
+    )
+    parser.add_argument(
+        '--benchmark-profiles',
+        action='store_true',
+        help="Compara os perfis do Chrome ('default' x 'lean') e encerra"
+    )
+    parser.add_argument(
+        '--benchmark-parsers',
+        action='store_true',
+        help='Compara os parsers de HTML do extrator (tempo e paridade) e encerra'
+    )
+    parser.add_argument(
+        '--check-parsers',
+        action='store_true',
+        help='Confere a paridade dos parsers (casos de borda e --rows linhas); '
+             'sai com código 1 se algum divergir'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=str,
+        default='1000,10000,50000',
+        help='Tamanhos dos relatórios do --benchmark-parsers (padrão: 1000,10000,50000)'
+    )
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições do benchmark')
+    parser.add_argument(
+        '--xhr',
+        action='store_true',
+        help='Tabela do relatório preenchida via XHR (JSON em /relatorio/relatorio19/dados)'
+    )
+    parser.add_argument(
+        '--no-charset',
+        action='store_false',
+        dest='charset',
+        help="Serve o relatório como 'text/html' sem charset (o corpo continua em UTF-8)"
+    )
+    parser.add_argument(
+        '--record-network',
+        type=str,
+        metavar='ARQUIVO',
+        help='Grava uma sessão de rede sintética (para network_capture.py) e encerra'
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.record_network:
+        gravar_rede(args.record_network, args.rows, args.seed, args.xhr)
+        print(f"Gravação de rede salva em {args.record_network}")
+        return 0
+
+    if args.check_parsers:
+        divergencias = verificar_parsers(args.rows, args.seed)
+        return 1 if divergencias else 0
+
+    if args.benchmark_parsers:
+        tamanhos = [int(t) for t in args.sizes.split(',') if t.strip()]
+        resultados, divergencias = benchmark_parsers(tamanhos, args.repeticoes, args.seed)
+        divergencias += verificar_parsers(seed=args.seed)
+        if divergencias:
+            print(f"\n{len(divergencias)} divergências entre parsers:")
+            for divergencia in divergencias:
+                print(f"  - {divergencia}")
+            return 1
+        return 0 if resultados else 1
+
+    if args.benchmark or args.benchmark_profiles:
+        server, base_url = start_fixture_server(0, args.rows, args.seed, args.xhr, args.charset)
+        try:
+            if args.benchmark:
+                benchmark(base_url, args.repeticoes)
+            if args.benchmark_profiles:
+                benchmark_profiles(base_url, args.repeticoes)
+        finally:
+            server.shutdown()
+        return 0
+
+    server, base_url = start_fixture_server(args.port, args.rows, args.seed, args.xhr, args.charset)
+    print(f"Servidor de fixtures em {base_url} (login: {FIXTURE_EMAIL} / {FIXTURE_PASSWORD})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,20 +2,28 @@
 Script completo para acessar o relatório de Quantidade de Assinantes no Cashbarber.
 
 Este script realiza:
-1. Login no painel Cashbarber
+1. Login no painel Cashbarber (via Selenium ou via HTTP, sem navegador)
 2. Navegação pelo menu: Relatórios → Assinaturas → Quantidade de assinantes
 3. Aplica filtros (opcional)
 
+A URL base do painel pode ser trocada com a variável CASHBARBER_BASE_URL
+(ex.: para o servidor de fixtures em cashbarber_fixture_server.py).
+
 Uso:
     python cashbarber_full_navigation.py <email> <senha> [--headless]
 """
 
 import argparse
+import codecs
 import sys
 import os
+import tempfile
 import time
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin
 
+import requests
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -23,33 +31,70 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.service import Service
 
+from chrome_profile import ChromeProfile
+
+
+DEFAULT_BASE_URL = "https://painel.cashbarber.com.br"
+
+# Engines de login
+LOGIN_ENGINE_SELENIUM = 'selenium'
+LOGIN_ENGINE_HTTP = 'http'
+LOGIN_ENGINE_AUTO = 'auto'  # HTTP, com fallback para Selenium
+LOGIN_ENGINES = (LOGIN_ENGINE_AUTO, LOGIN_ENGINE_HTTP, LOGIN_ENGINE_SELENIUM)
+
+# Bytes do relatório em streaming mantidos em memória antes de ir para o disco
+RELATORIO_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Respostas do POST de login que indicam formulário desatualizado (Laravel:
+# 419 = token CSRF expirado/inválido, 422 = campos inválidos)
+LOGIN_FORM_REJEITADO = (419, 422)
+
+
+class LoginFormChanged(RuntimeError):
+    """O formulário de login não tem o formato esperado pelo login via HTTP."""
+
+
+def cashbarber_url(path: str) -> str:
+    """Monta a URL do painel (base configurável via CASHBARBER_BASE_URL)."""
+    base = os.environ.get('CASHBARBER_BASE_URL', DEFAULT_BASE_URL).rstrip('/')
+    return f"{base}{path}"
+
+
+def _encoding_resposta(response: requests.Response) -> str:
+    """
+    Codificação do corpo de uma resposta do painel.
+    
+    Sem charset no Content-Type, o requests assume ISO-8859-1 para text/*;
+    nesse caso vale UTF-8 (a codificação do painel).
+    """
+    if 'charset' in response.headers.get('content-type', '').lower():
+        return response.encoding
+    return 'utf-8'
+
 
 # ============================================================================
 # FUNÇÃO DE LOGIN
 # ============================================================================
 
-def login_cashbarber(email: str, password: str, headless: bool = False) -> webdriver.Chrome:
+def create_driver(headless: bool = False, profile: Optional[ChromeProfile] = None) -> webdriver.Chrome:
     """
-    Realiza o login no painel Cashbarber e retorna o driver autenticado.
+    Inicia o Chrome (usa CHROMEDRIVER_PATH se configurado).
     
     Args:
-        email: E-mail de acesso ao painel
-        password: Senha de acesso ao painel
         headless: Se True, executa o navegador em modo headless
+        profile: Perfil do navegador (padrão: variável CHROME_PROFILE)
     
     Returns:
-        webdriver.Chrome: Instância do driver do Chrome já autenticado
-    
-    Raises:
-        RuntimeError: Se o login falhar
+        webdriver.Chrome: Instância do driver do Chrome
     """
-    LOGIN_URL = "https://painel.cashbarber.com.br/login"
+    profile = profile or ChromeProfile()
     
     options = webdriver.ChromeOptions()
     if headless:
         options.add_argument("--headless")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+    profile.apply_options(options)
     
     chromedriver_path = os.environ.get('CHROMEDRIVER_PATH', 'chromedriver')
     
@@ -59,7 +104,58 @@ def login_cashbarber(email: str, password: str, headless: bool = False) -> webdr
     except Exception:
         driver = webdriver.Chrome(options=options)
     
-    driver.get(LOGIN_URL)
+    profile.apply_cdp(driver)
+    return driver
+
+
+def login_cashbarber(
+    email: str,
+    password: str,
+    headless: bool = False,
+    profile: Optional[ChromeProfile] = None
+) -> webdriver.Chrome:
+    """
+    Realiza o login no painel Cashbarber e retorna o driver autenticado.
+    
+    Args:
+        email: E-mail de acesso ao painel
+        password: Senha de acesso ao painel
+        headless: Se True, executa o navegador em modo headless
+        profile: Perfil do navegador (padrão: variável CHROME_PROFILE)
+    
+    Returns:
+        webdriver.Chrome: Instância do driver do Chrome já autenticado
+    
+    Raises:
+        RuntimeError: Se o login falhar
+    """
+    driver = create_driver(headless, profile)
+    
+    try:
+        login_driver(driver, email, password)
+    except Exception:
+        driver.quit()
+        raise
+    
+    return driver
+
+
+def login_driver(driver: webdriver.Chrome, email: str, password: str) -> None:
+    """
+    Preenche o formulário de login num navegador já aberto.
+    
+    Usado também para renovar a sessão expirada de um navegador mantido
+    entre execuções, sem reiniciar o Chrome.
+    
+    Args:
+        driver: Instância do webdriver Chrome
+        email: E-mail de acesso ao painel
+        password: Senha de acesso ao painel
+    
+    Raises:
+        RuntimeError: Se o login falhar
+    """
+    driver.get(cashbarber_url("/login"))
     wait = WebDriverWait(driver, 20)
     
     email_input = wait.until(EC.presence_of_element_located((By.NAME, "email")))
@@ -80,100 +176,282 @@ def login_cashbarber(email: str, password: str, headless: bool = False) -> webdr
     try:
         wait.until(lambda drv: "/login" not in drv.current_url)
     except TimeoutException:
-        driver.quit()
         raise RuntimeError("Falha no login: verifique as credenciais.")
+
+
+def login_cashbarber_http(email: str, password: str, timeout: int = 30) -> requests.Session:
+    """
+    Realiza o login no painel Cashbarber apenas com HTTP (sem navegador).
     
-    return driver
+    Busca a página de login, extrai o token CSRF e os demais campos ocultos
+    do formulário, envia email/senha e confirma que o painel redirecionou
+    para fora de /login.
+    
+    Args:
+        email: E-mail de acesso ao painel
+        password: Senha de acesso ao painel
+        timeout: Tempo máximo de cada requisição em segundos
+    
+    Returns:
+        requests.Session autenticada
+    
+    Raises:
+        LoginFormChanged: Se o formulário de login não tiver o formato esperado
+            ou o envio for recusado como formulário inválido (HTTP 419/422)
+        RuntimeError: Se o login falhar
+    """
+    login_url = cashbarber_url("/login")
+    session = requests.Session()
+    
+    response = session.get(login_url, timeout=timeout)
+    response.raise_for_status()
+    
+    soup = BeautifulSoup(response.text, 'html.parser')
+    form = None
+    for candidate in soup.find_all('form'):
+        if candidate.find('input', attrs={'name': 'email'}) and \
+                candidate.find('input', attrs={'name': 'password'}):
+            form = candidate
+            break
+    
+    if form is None:
+        raise LoginFormChanged("Formulário de login não encontrado")
+    
+    # Campos ocultos (inclui o token CSRF)
+    payload = {
+        field['name']: field.get('value', '')
+        for field in form.find_all('input', attrs={'type': 'hidden'})
+        if field.get('name')
+    }
+    if '_token' not in payload:
+        meta = soup.find('meta', attrs={'name': 'csrf-token'})
+        if meta is None or not meta.get('content'):
+            raise LoginFormChanged("Token CSRF não encontrado no formulário de login")
+        payload['_token'] = meta['content']
+    
+    payload['email'] = email
+    payload['password'] = password
+    
+    action = urljoin(response.url, form.get('action') or response.url)
+    response = session.post(action, data=payload, timeout=timeout)
+    if response.status_code in LOGIN_FORM_REJEITADO:
+        # Token CSRF recusado (419) ou campos do formulário inválidos (422)
+        raise LoginFormChanged(f"Formulário de login recusado (HTTP {response.status_code})")
+    response.raise_for_status()
+    
+    if "/login" in response.url:
+        raise RuntimeError("Falha no login: verifique as credenciais.")
+    
+    return session
 
 
 # ============================================================================
 # FUNÇÃO DE NAVEGAÇÃO
 # ============================================================================
 
-def navigate_to_quantidade_assinantes(driver: webdriver.Chrome, wait_time: int = 20) -> None:
+# Orçamento de tempo (segundos) de cada passo da navegação pelo menu
+STEP_TIMEOUTS = {
+    'relatorios': 20,
+    'assinaturas': 10,
+    'relatorio': 20,
+    'filtro': 3,
+}
+
+# Pausas fixas que cada passo fazia antes das esperas por condição
+# (usadas para registrar o tempo economizado)
+FIXED_SLEEPS = {
+    'relatorios': 0.5,
+    'assinaturas': 0.5,
+    'relatorio': 0.0,
+    'filtro': 1.5,
+    'filtro_ausente': 1.0,
+}
+
+RELATORIOS_XPATH = "//span[@class='kt-menu__link-text' and contains(text(), 'Relatórios')]"
+ASSINATURAS_XPATH = (
+    "//li[@class='kt-menu__item kt-menu__item--submenu']"
+    "//span[contains(text(), 'Assinaturas')]/parent::a"
+)
+QUANTIDADE_XPATH = "//a[@href='/relatorio/relatorio19']"
+FILTRAR_XPATH = "//button[contains(text(), 'Filtrar') or contains(text(), 'filtrar')]"
+
+
+def page_idle(driver: webdriver.Chrome) -> bool:
+    """
+    Condição de espera: documento carregado e sem requisições AJAX (jQuery)
+    pendentes.
+    """
+    return driver.execute_script(
+        "return document.readyState === 'complete' && "
+        "(typeof jQuery === 'undefined' || jQuery.active === 0);"
+    )
+
+
+# Marca (em window.__cashbarberRedesenho) a primeira alteração de linhas em
+# uma tabela da página; instalado antes do clique em "Filtrar"
+FILTRO_REDESENHO_SCRIPT = """
+window.__cashbarberRedesenho = false;
+var observador = new MutationObserver(function (mutacoes) {
+    for (var i = 0; i < mutacoes.length; i++) {
+        if (mutacoes[i].target.closest && mutacoes[i].target.closest('table')) {
+            window.__cashbarberRedesenho = true;
+            observador.disconnect();
+            return;
+        }
+    }
+});
+observador.observe(document.body, {childList: true, subtree: true});
+"""
+
+
+def filtro_aplicado(botao):
+    """
+    Condição de espera do "Filtrar": a página recarregou (o botão saiu do
+    DOM) ou, sem recarga, a tabela foi redesenhada e não há requisições
+    AJAX pendentes. Requer `FILTRO_REDESENHO_SCRIPT` executado antes do clique.
+    """
+    recarregou = EC.staleness_of(botao)
+    
+    def condicao(driver: webdriver.Chrome) -> bool:
+        if recarregou(driver):
+            return True
+        redesenhou = driver.execute_script("return window.__cashbarberRedesenho === true;")
+        return bool(redesenhou) and page_idle(driver)
+    
+    return condicao
+
+
+def _report_step(inicio: float, espera_inicio: float, pausa_fixa: float) -> float:
+    """
+    Imprime o tempo gasto esperando a condição do passo e o economizado em
+    relação à pausa fixa antiga.
+    
+    Returns:
+        Segundos economizados no passo
+    """
+    agora = time.perf_counter()
+    espera = agora - espera_inicio
+    economizado = max(0.0, pausa_fixa - espera)
+    print(f"      ⏱ {agora - inicio:.2f}s (espera {espera:.2f}s, {economizado:.2f}s economizados)")
+    return economizado
+
+
+def navigate_to_quantidade_assinantes(
+    driver: webdriver.Chrome,
+    wait_time: int = 20,
+    step_timeouts: Optional[Dict[str, float]] = None
+) -> None:
     """
     Navega até a página de Quantidade de Assinantes.
     
     Sequência: Relatórios → Assinaturas → Quantidade de assinantes
     
+    Cada passo espera por uma condição do DOM (submenu aberto, link
+    clicável, página sem requisições pendentes) em vez de pausas fixas,
+    limitado ao orçamento de tempo do passo.
+    
     Args:
         driver: Instância do webdriver Chrome já autenticado
-        wait_time: Tempo máximo de espera em segundos
+        wait_time: Tempo máximo de espera de qualquer passo em segundos
+        step_timeouts: Orçamento por passo ('relatorios', 'assinaturas',
+            'relatorio', 'filtro'); sobrepõe `STEP_TIMEOUTS`
     
     Raises:
         TimeoutException: Se algum elemento não for encontrado
     """
-    wait = WebDriverWait(driver, wait_time)
+    orcamentos = {**STEP_TIMEOUTS, **(step_timeouts or {})}
+    
+    def wait(passo: str) -> WebDriverWait:
+        return WebDriverWait(driver, min(orcamentos[passo], wait_time), poll_frequency=0.1)
+    
+    economizado = 0.0
     
     # Passo 1: Clicar em "Relatórios"
     print("\n[1/4] Abrindo menu 'Relatórios'...")
+    inicio = time.perf_counter()
     try:
-        wait.until(EC.presence_of_element_located((By.ID, "kt_aside_menu")))
+        wait('relatorios').until(EC.presence_of_element_located((By.ID, "kt_aside_menu")))
         
-        relatorios_menu = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//span[@class='kt-menu__link-text' and contains(text(), 'Relatórios')]")
-            )
+        relatorios_menu = wait('relatorios').until(
+            EC.element_to_be_clickable((By.XPATH, RELATORIOS_XPATH))
         )
         
         relatorios_menu.click()
-        time.sleep(0.5)
+        espera_inicio = time.perf_counter()
+        
+        # Submenu aberto: o item "Assinaturas" fica visível
+        wait('relatorios').until(EC.visibility_of_element_located((By.XPATH, ASSINATURAS_XPATH)))
         print("      ✓ Menu 'Relatórios' aberto")
+        economizado += _report_step(inicio, espera_inicio, FIXED_SLEEPS['relatorios'])
         
     except TimeoutException:
         raise TimeoutException("Não foi possível localizar o menu 'Relatórios'")
     
     # Passo 2: Clicar em "Assinaturas"
     print("[2/4] Abrindo submenu 'Assinaturas'...")
+    inicio = time.perf_counter()
     try:
-        assinaturas_submenu = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//li[@class='kt-menu__item kt-menu__item--submenu']//span[contains(text(), 'Assinaturas')]/parent::a")
-            )
+        assinaturas_submenu = wait('assinaturas').until(
+            EC.element_to_be_clickable((By.XPATH, ASSINATURAS_XPATH))
         )
         
         assinaturas_submenu.click()
-        time.sleep(0.5)
+        espera_inicio = time.perf_counter()
+        
+        # Submenu aberto: o link do relatório fica clicável
+        wait('assinaturas').until(EC.element_to_be_clickable((By.XPATH, QUANTIDADE_XPATH)))
         print("      ✓ Submenu 'Assinaturas' aberto")
+        economizado += _report_step(inicio, espera_inicio, FIXED_SLEEPS['assinaturas'])
         
     except TimeoutException:
         raise TimeoutException("Não foi possível localizar o submenu 'Assinaturas'")
     
     # Passo 3: Clicar em "Quantidade de assinantes"
     print("[3/4] Acessando 'Quantidade de assinantes'...")
+    inicio = time.perf_counter()
     try:
-        quantidade_assinantes_link = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//a[@href='/relatorio/relatorio19']")
-            )
+        quantidade_assinantes_link = wait('relatorio').until(
+            EC.element_to_be_clickable((By.XPATH, QUANTIDADE_XPATH))
         )
         
         quantidade_assinantes_link.click()
+        espera_inicio = time.perf_counter()
         
-        wait.until(lambda drv: "/relatorio/relatorio19" in drv.current_url)
+        wait('relatorio').until(lambda drv: "/relatorio/relatorio19" in drv.current_url)
+        wait('relatorio').until(page_idle)
         print("      ✓ Página do relatório carregada")
+        economizado += _report_step(inicio, espera_inicio, FIXED_SLEEPS['relatorio'])
         
     except TimeoutException:
         raise TimeoutException("Não foi possível acessar 'Quantidade de assinantes'")
     
     # Passo 4: Verificar se há botão de filtrar
     print("[4/4] Procurando opções de filtro...")
-    try:
-        time.sleep(1)
-        
-        filtrar_button = driver.find_element(
-            By.XPATH, 
-            "//button[contains(text(), 'Filtrar') or contains(text(), 'filtrar')]"
-        )
-        
-        if filtrar_button:
+    inicio = time.perf_counter()
+    espera_inicio = inicio
+    pausa_fixa = FIXED_SLEEPS['filtro_ausente']
+    
+    # A página já terminou de carregar: o botão, se existir, já está no DOM
+    botoes = driver.find_elements(By.XPATH, FILTRAR_XPATH)
+    if botoes:
+        pausa_fixa = FIXED_SLEEPS['filtro']
+        try:
+            filtrar_button = wait('filtro').until(EC.element_to_be_clickable(botoes[0]))
+            driver.execute_script(FILTRO_REDESENHO_SCRIPT)
             filtrar_button.click()
+            espera_inicio = time.perf_counter()
+            
+            # O filtro pode recarregar a página ou só redesenhar a tabela
+            wait('filtro').until(filtro_aplicado(filtrar_button))
+            wait('filtro').until(page_idle)
             print("      ✓ Filtro aplicado")
-            time.sleep(0.5)
-    except NoSuchElementException:
+        except TimeoutException:
+            print("      ⚠ Filtro não concluído dentro do tempo do passo")
+    else:
         print("      ℹ Nenhum filtro adicional necessário")
+    economizado += _report_step(inicio, espera_inicio, pausa_fixa)
     
-    print("\n✅ Navegação concluída com sucesso!")
+    print(f"\n✅ Navegação concluída com sucesso! ({economizado:.2f}s economizados em pausas)")
 
 
 def navigate_direto(driver: webdriver.Chrome) -> None:
@@ -183,16 +461,210 @@ def navigate_direto(driver: webdriver.Chrome) -> None:
     Args:
         driver: Instância do webdriver Chrome já autenticado
     """
-    RELATORIO_URL = "https://painel.cashbarber.com.br/relatorio/relatorio19"
-    
     print("\nNavegando diretamente para o relatório...")
-    driver.get(RELATORIO_URL)
+    driver.get(cashbarber_url("/relatorio/relatorio19"))
     
     wait = WebDriverWait(driver, 20)
     wait.until(lambda drv: "/relatorio/relatorio19" in drv.current_url)
     print("✅ Relatório carregado!")
 
 
+# ============================================================================
+# BUSCA DO RELATÓRIO SEM NAVEGADOR
+# ============================================================================
+
+def session_from_driver(driver: webdriver.Chrome) -> requests.Session:
+    """
+    Cria uma sessão HTTP com os cookies da sessão autenticada do navegador.
+    
+    Depois de copiar os cookies o navegador pode ser fechado; o relatório
+    é então buscado com `fetch_relatorio_html`.
+    
+    Args:
+        driver: Instância do webdriver Chrome já autenticado
+    
+    Returns:
+        requests.Session com os cookies e o User-Agent do navegador
+    """
+    session = session_from_cookies(driver.get_cookies())
+    session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent")
+    return session
+
+
+def session_from_cookies(cookies: List[Dict]) -> requests.Session:
+    """
+    Cria uma sessão HTTP a partir de cookies no formato do Selenium
+    (dicionários com name, value, domain, path).
+    """
+    session = requests.Session()
+    
+    for cookie in cookies:
+        session.cookies.set(
+            cookie['name'],
+            cookie['value'],
+            domain=cookie.get('domain'),
+            path=cookie.get('path', '/')
+        )
+    
+    return session
+
+
+def cookies_from_session(session: requests.Session) -> List[Dict]:
+    """
+    Exporta os cookies de uma sessão HTTP no formato do Selenium.
+    """
+    return [
+        {
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path,
+            'secure': cookie.secure
+        }
+        for cookie in session.cookies
+    ]
+
+
+def restore_driver_session(driver: webdriver.Chrome, cookies: List[Dict]) -> None:
+    """
+    Carrega cookies de uma sessão salva no navegador (dispensa o login).
+    
+    Args:
+        driver: Instância do webdriver Chrome
+        cookies: Cookies no formato do Selenium
+    """
+    # O navegador só aceita cookies do domínio da página atual
+    driver.get(cashbarber_url("/login"))
+    
+    for cookie in cookies:
+        driver.add_cookie({
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'path': cookie.get('path') or '/',
+            'secure': bool(cookie.get('secure', False))
+        })
+
+
+def probe_session(session: requests.Session, timeout: int = 15) -> bool:
+    """
+    Verifica com uma requisição leve se a sessão ainda está autenticada.
+    
+    Args:
+        session: Sessão HTTP com os cookies a validar
+        timeout: Tempo máximo da requisição em segundos
+    
+    Returns:
+        True se o painel não redirecionou para o login
+    """
+    try:
+        response = session.get(
+            cashbarber_url("/"), allow_redirects=False, stream=True, timeout=timeout
+        )
+        response.close()
+    except requests.RequestException:
+        return False
+    
+    if response.is_redirect:
+        return "/login" not in response.headers.get('Location', '')
+    
+    return response.status_code == 200
+
+
+def fetch_relatorio_html(session: requests.Session, timeout: int = 30) -> str:
+    """
+    Busca o HTML do relatório de Quantidade de Assinantes via HTTP.
+    
+    Args:
+        session: Sessão HTTP autenticada (ver `session_from_driver`)
+        timeout: Tempo máximo da requisição em segundos
+    
+    Returns:
+        HTML da página do relatório
+    
+    Raises:
+        RuntimeError: Se a sessão não estiver autenticada
+    """
+    print("\nBuscando relatório via HTTP...")
+    response = session.get(cashbarber_url("/relatorio/relatorio19"), timeout=timeout)
+    response.raise_for_status()
+    
+    if "/login" in response.url:
+        raise RuntimeError("Sessão não autenticada: redirecionado para o login.")
+    
+    print("✅ Relatório carregado!")
+    response.encoding = _encoding_resposta(response)
+    return response.text
+
+
+def stream_relatorio_html(
+    session: requests.Session,
+    timeout: int = 30,
+    chunk_size: int = 64 * 1024,
+    max_memoria: int = RELATORIO_SPOOL_BYTES
+) -> Iterator[str]:
+    """
+    Baixa o HTML do relatório via HTTP e o entrega em pedaços, sem
+    carregá-lo inteiro.
+    
+    O corpo é gravado em um arquivo temporário (em memória até
+    `max_memoria` bytes, depois em disco) e a conexão é fechada antes do
+    retorno: a leitura dos pedaços, feita durante a sincronização com o
+    Supabase, não mantém a resposta HTTP aberta.
+    
+    Args:
+        session: Sessão HTTP autenticada (ver `session_from_driver`)
+        timeout: Tempo máximo de conexão/leitura em segundos
+        chunk_size: Tamanho de cada pedaço em bytes
+        max_memoria: Bytes mantidos em memória antes de usar o disco
+    
+    Returns:
+        Iterador dos pedaços do HTML já decodificados (o arquivo temporário
+        é removido ao fim da leitura ou no `close()`)
+    
+    Raises:
+        RuntimeError: Se a sessão não estiver autenticada
+    """
+    print("\nBuscando relatório via HTTP (streaming)...")
+    arquivo = tempfile.SpooledTemporaryFile(max_size=max_memoria)
+    
+    try:
+        with session.get(
+            cashbarber_url("/relatorio/relatorio19"), timeout=timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            
+            if "/login" in response.url:
+                raise RuntimeError("Sessão não autenticada: redirecionado para o login.")
+            
+            encoding = _encoding_resposta(response)
+            
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                arquivo.write(chunk)
+    except BaseException:
+        arquivo.close()
+        raise
+    
+    print(f"✅ Relatório baixado ({arquivo.tell() / 1024 / 1024:.1f} MB)")
+    arquivo.seek(0)
+    return _ler_pedacos(arquivo, encoding, chunk_size)
+
+
+def _ler_pedacos(arquivo, encoding: str, chunk_size: int) -> Iterator[str]:
+    """Lê um arquivo binário em pedaços de texto e o fecha ao final."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    
+    try:
+        while True:
+            dados = arquivo.read(chunk_size)
+            texto = decoder.decode(dados, final=not dados)
+            if texto:
+                yield texto
+            if not dados:
+                return
+    finally:
+        arquivo.close()
+
+
 # ============================================================================
 # FUNÇÃO PRINCIPAL
 # ============================================================================
@@ -0,0 +1,224 @@
+"""
+Perfis do Chrome usados pelo Selenium e métricas do navegador.
+
+Este módulo gerencia:
+1. Perfil 'lean': carregamento 'eager', sem imagens, fontes, CSS e scripts
+   de terceiros (CDP Network.setBlockedURLs + preferências de conteúdo)
+2. Listas configuráveis de bloqueio (padrões de URL) e de hosts permitidos
+3. Medição do tempo de carregamento da página e da memória (RSS) do Chrome
+4. Log de performance (eventos CDP Network.*), usado por network_capture.py
+
+Variáveis de ambiente:
+- CHROME_PROFILE: 'default' ou 'lean'
+- CHROME_BLOCKED_URLS: padrões bloqueados no perfil 'lean', separados por
+  vírgula (substitui a lista padrão; '*' é curinga)
+- CHROME_ALLOWED_HOSTS: hosts além do painel que podem ser acessados no
+  perfil 'lean' (ex.: um CDN de scripts necessário), separados por vírgula
+"""
+
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import logging
+import os
+
+from selenium import webdriver
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROFILE_DEFAULT = 'default'
+PROFILE_LEAN = 'lean'
+PROFILES = (PROFILE_DEFAULT, PROFILE_LEAN)
+
+# Recursos que o painel não precisa para login, menu e tabela
+DEFAULT_BLOCKED_URLS = [
+    # Imagens
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+    # Fontes
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Folhas de estilo
+    '*.css',
+    # Analytics e rastreadores
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*clarity.ms*',
+]
+
+
+def _lista_env(nome: str) -> Optional[List[str]]:
+    """Lê uma lista separada por vírgulas de uma variável de ambiente."""
+    valor = os.getenv(nome)
+    if valor is None:
+        return None
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+
+class ChromeProfile:
+    """Opções do Chrome e comandos CDP de um perfil."""
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        blocked_urls: Optional[List[str]] = None,
+        allowed_hosts: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        performance_log: bool = False
+    ):
+        """
+        Args:
+            name: 'default' ou 'lean' (padrão: variável CHROME_PROFILE ou 'default')
+            blocked_urls: Padrões de URL bloqueados no perfil 'lean'
+                (padrão: CHROME_BLOCKED_URLS ou DEFAULT_BLOCKED_URLS)
+            allowed_hosts: Hosts extras acessíveis no perfil 'lean'
+                (padrão: CHROME_ALLOWED_HOSTS)
+            base_url: URL do painel, sempre permitido (padrão: CASHBARBER_BASE_URL)
+            performance_log: Habilita o log de performance (eventos de rede),
+                em qualquer perfil
+        """
+        self.name = name or os.getenv('CHROME_PROFILE', PROFILE_DEFAULT)
+        if self.name not in PROFILES:
+            raise ValueError(f"Perfil inválido: {self.name} (opções: {', '.join(PROFILES)})")
+
+        if blocked_urls is None:
+            blocked_urls = _lista_env('CHROME_BLOCKED_URLS')
+        self.blocked_urls = blocked_urls if blocked_urls is not None else list(DEFAULT_BLOCKED_URLS)
+
+        if allowed_hosts is None:
+            allowed_hosts = _lista_env('CHROME_ALLOWED_HOSTS') or []
+        base_url = base_url or os.getenv('CASHBARBER_BASE_URL', 'https://painel.cashbarber.com.br')
+        painel = urlparse(base_url).hostname
+
+        # O painel e a máquina local (chromedriver) nunca são bloqueados
+        hosts = [painel, 'localhost', '127.0.0.1'] + allowed_hosts
+        self.allowed_hosts = list(dict.fromkeys(h for h in hosts if h))
+        self.performance_log = performance_log
+
+    @property
+    def lean(self) -> bool:
+        return self.name == PROFILE_LEAN
+
+    def apply_options(self, options: webdriver.ChromeOptions) -> None:
+        """Ajusta as opções do Chrome antes de iniciar o navegador."""
+        if self.performance_log:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        if not self.lean:
+            return
+
+        # Não espera imagens/folhas de estilo para devolver o controle
+        options.page_load_strategy = 'eager'
+
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-gpu')
+
+        # Hosts de terceiros não resolvem (só o painel e os permitidos)
+        excecoes = ''.join(f', EXCLUDE {host}' for host in self.allowed_hosts)
+        options.add_argument(f'--host-resolver-rules=MAP * ~NOTFOUND{excecoes}')
+
+    def apply_cdp(self, driver: webdriver.Chrome) -> None:
+        """Aplica os bloqueios de URL via CDP no navegador já iniciado."""
+        if not self.lean or not self.blocked_urls:
+            return
+
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        logger.info(f"Perfil 'lean': {len(self.blocked_urls)} padrões de URL bloqueados")
+
+
+def page_load_metrics(driver: webdriver.Chrome) -> Dict[str, float]:
+    """
+    Tempos de carregamento da página atual (Navigation Timing).
+
+    Returns:
+        Dicionário com 'dom_content_loaded' e 'load' em segundos (0 se o
+        evento ainda não ocorreu) e 'recursos' (quantidade de requisições)
+    """
+    dados = driver.execute_script(
+        "const nav = performance.getEntriesByType('navigation')[0];"
+        "return {"
+        "  dcl: nav ? nav.domContentLoadedEventEnd : 0,"
+        "  load: nav ? nav.loadEventEnd : 0,"
+        "  recursos: performance.getEntriesByType('resource').length"
+        "};"
+    )
+    return {
+        'dom_content_loaded': dados['dcl'] / 1000,
+        'load': dados['load'] / 1000,
+        'recursos': dados['recursos'],
+    }
+
+
+def _filhos(pids: List[int]) -> List[int]:
+    """Todos os descendentes dos processos informados (via /proc)."""
+    pais: Dict[int, List[int]] = {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/stat') as f:
+                # O nome do processo (2º campo) pode ter espaços: usa o último ')'
+                campos = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        pais.setdefault(int(campos[1]), []).append(int(entrada))
+
+    descendentes = []
+    pendentes = list(pids)
+    while pendentes:
+        filhos = pais.get(pendentes.pop(), [])
+        descendentes.extend(filhos)
+        pendentes.extend(filhos)
+    return descendentes
+
+
+def _rss_kb(pid: int) -> int:
+    """VmRSS de um processo em kB (0 se não estiver disponível)."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def chrome_rss_mb(driver: webdriver.Chrome) -> Optional[float]:
+    """
+    Memória residente somada de todos os processos do Chrome do driver.
+
+    Returns:
+        RSS em MB, ou None fora do Linux (/proc indisponível)
+    """
+    processo = getattr(getattr(driver, 'service', None), 'process', None)
+    if processo is None or not os.path.isdir('/proc'):
+        return None
+
+    # chromedriver → chrome → renderers, GPU, etc.
+    pids = _filhos([processo.pid])
+    return sum(_rss_kb(pid) for pid in pids) / 1024
+
+
+def log_browser_metrics(driver: webdriver.Chrome, etapa: str) -> Dict[str, Optional[float]]:
+    """
+    Registra no log o tempo de carregamento da página atual e o RSS do Chrome.
+
+    Returns:
+        Métricas medidas (ver `page_load_metrics`) mais 'rss_mb'
+    """
+    metricas: Dict[str, Optional[float]] = dict(page_load_metrics(driver))
+    metricas['rss_mb'] = chrome_rss_mb(driver)
+
+    rss = f"{metricas['rss_mb']:.0f} MB" if metricas['rss_mb'] is not None else "indisponível"
+    logger.info(
+        f"⏱ {etapa}: DOMContentLoaded {metricas['dom_content_loaded']:.2f}s, "
+        f"load {metricas['load']:.2f}s, {metricas['recursos']} recursos, Chrome RSS {rss}"
+    )
+    return metricas
@@ -19,13 +19,41 @@ import argparse
 import sys
 import json
 import os
+import time
 from typing import Optional
 from datetime import datetime
 
 # Imports dos módulos locais
-from cashbarber_full_navigation import login_cashbarber, navigate_to_quantidade_assinantes
-from cashbarber_extractor import extract_from_driver
-from supabase_integration import sync_from_data
+from cashbarber_full_navigation import (
+    create_driver,
+    login_cashbarber,
+    login_cashbarber_http,
+    navigate_to_quantidade_assinantes,
+    session_from_driver,
+    session_from_cookies,
+    cookies_from_session,
+    restore_driver_session,
+    probe_session,
+    fetch_relatorio_html,
+    stream_relatorio_html,
+    LoginFormChanged,
+    LOGIN_ENGINES,
+    LOGIN_ENGINE_AUTO,
+    LOGIN_ENGINE_HTTP,
+    LOGIN_ENGINE_SELENIUM
+)
+from cashbarber_extractor import (
+    extract_from_driver,
+    extract_from_html,
+    stream_from_driver,
+    stream_from_html,
+    PARSERS
+)
+from supabase_integration import sync_from_data, SUPABASE_OPTIONS, WRITE_MODES, WRITE_MODE_ROW
+from name_matcher import MATCH_MODES, MATCH_MODE_BRUTE
+from session_store import SessionStore, append_run_history
+from chrome_profile import ChromeProfile, PROFILES, log_browser_metrics
+from network_capture import extract_from_network
 
 import logging
 
@@ -50,10 +78,66 @@ class SyncConfig:
         self.headless = config_dict.get('headless', True)
         self.dry_run = config_dict.get('dry_run', False)
         self.direto = config_dict.get('direto', True)  # Usa navegação direta por padrão
+        self.http_report = config_dict.get('http_report', False)  # Relatório via HTTP
+        self.stream_report = config_dict.get('stream_report', False)  # Extração sob demanda
+        self.login_engine = config_dict.get('login_engine', LOGIN_ENGINE_AUTO)
+        self.browser_profile = config_dict.get('browser_profile') or os.getenv('CHROME_PROFILE')
+        self.html_parser = config_dict.get('html_parser') or os.getenv('CASHBARBER_HTML_PARSER')
+        self.network_capture = config_dict.get('network_capture', False)  # Dados via eventos de rede
+        self.network_recording_path = config_dict.get('network_recording') or os.getenv('NETWORK_RECORDING_PATH')
+        
+        # Sessão salva entre execuções e histórico de execuções
+        self.session_store_path = config_dict.get('session_store') or os.getenv('SESSION_STORE_PATH')
+        self.session_store_key = os.getenv('SESSION_STORE_KEY') or self.cashbarber_password
+        self.run_history_path = config_dict.get('run_history') or os.getenv('RUN_HISTORY_PATH')
+        self.match_mode = config_dict.get('match_mode', MATCH_MODE_BRUTE)
+        self.match_workers = config_dict.get('match_workers', 1)
+        self.match_cache_path = config_dict.get('match_cache') or os.getenv('MATCH_CACHE_PATH')
+        self.write_mode = config_dict.get('write_mode', WRITE_MODE_ROW)
+        self.write_batch_size = config_dict.get('write_batch_size', 500)
+        self.skip_unchanged = config_dict.get('skip_unchanged', False)
+        self.touch_days = config_dict.get('touch_days')
+        self.write_workers = config_dict.get('write_workers', 1)
+        self.write_rate_limit = config_dict.get('write_rate_limit')
+        
+        # Tabela e colunas do Supabase (argumentos de SupabaseIntegration;
+        # o que não for informado vem das variáveis de ambiente)
+        self.supabase = dict(config_dict.get('supabase') or {})
+        invalidas = set(self.supabase) - set(SUPABASE_OPTIONS)
+        if invalidas:
+            raise ValueError(f"Opções do Supabase inválidas: {', '.join(sorted(invalidas))}")
         
         # Validação
         if not self.cashbarber_email or not self.cashbarber_password:
             raise ValueError("Email e senha do Cashbarber devem estar configurados")
+        
+        # Opções que só valem com o Chrome: no modo 'auto' forçam o login via
+        # Selenium; com login via HTTP seriam ignoradas em silêncio
+        opcoes_relatorio = [
+            opcao for opcao, ativa in (
+                ('--menu', not self.direto),
+                ('--network-capture', self.network_capture),
+                ('--network-recording', config_dict.get('network_recording'))
+            ) if ativa
+        ]
+        if self.http_report and opcoes_relatorio:
+            logger.warning(
+                f"Com --http-report o relatório não passa pelo Chrome; "
+                f"ignorando {', '.join(opcoes_relatorio)}"
+            )
+            opcoes_relatorio = []
+        opcoes_selenium = opcoes_relatorio + (
+            ['--browser-profile'] if config_dict.get('browser_profile') else []
+        )
+        if opcoes_selenium:
+            if self.login_engine == LOGIN_ENGINE_HTTP:
+                raise ValueError(
+                    f"Opções que exigem o Chrome não combinam com --login-engine http: "
+                    f"{', '.join(opcoes_selenium)}"
+                )
+            if self.login_engine == LOGIN_ENGINE_AUTO:
+                logger.info(f"Login via Selenium (exigido por {', '.join(opcoes_selenium)})")
+                self.login_engine = LOGIN_ENGINE_SELENIUM
     
     @classmethod
     def from_file(cls, filepath: str):
@@ -69,16 +153,125 @@ class SyncConfig:
             'cashbarber_password': args.password,
             'headless': args.headless,
             'dry_run': args.dry_run,
-            'direto': args.direto
+            'direto': args.direto,
+            'http_report': args.http_report,
+            'login_engine': args.login_engine,
+            'browser_profile': args.browser_profile,
+            'stream_report': args.stream_report,
+            'html_parser': args.html_parser,
+            'network_capture': args.network_capture,
+            'network_recording': args.network_recording,
+            'session_store': args.session_store,
+            'run_history': args.run_history,
+            'match_mode': args.match_mode,
+            'match_workers': args.match_workers,
+            'match_cache': args.match_cache,
+            'write_mode': args.write_mode,
+            'write_batch_size': args.write_batch_size,
+            'skip_unchanged': args.skip_unchanged,
+            'touch_days': args.touch_days,
+            'write_workers': args.write_workers,
+            'write_rate_limit': args.write_rate_limit
         })
 
 
-def run_sync(config: SyncConfig) -> int:
+def login(config: SyncConfig):
+    """
+    Obtém uma sessão autenticada no Cashbarber.
+    
+    Com o armazenamento de sessão configurado, tenta primeiro reaproveitar
+    os cookies salvos (validados com uma requisição leve); o login completo
+    só é feito se não houver sessão válida, e a nova sessão é salva.
+    
+    Args:
+        config: Configurações da sincronização
+    
+    Returns:
+        Tupla (session, driver, modo): apenas um entre session e driver é
+        preenchido; modo é 'sessao_salva' ou 'completo'
+    """
+    store = None
+    if config.session_store_path:
+        store = SessionStore(config.session_store_path, config.session_store_key)
+        cookies = store.load(config.cashbarber_email)
+        
+        if cookies and probe_session(session_from_cookies(cookies)):
+            logger.info("✓ Sessão salva ainda válida: login dispensado")
+            
+            if config.login_engine != LOGIN_ENGINE_SELENIUM or config.http_report:
+                return session_from_cookies(cookies), None, 'sessao_salva'
+            
+            driver = create_driver(config.headless, browser_profile(config))
+            restore_driver_session(driver, cookies)
+            return None, driver, 'sessao_salva'
+        
+        if cookies:
+            logger.info("Sessão salva expirada; fazendo login completo")
+            store.delete(config.cashbarber_email)
+    
+    session, driver = login_completo(config)
+    
+    if store is not None:
+        cookies = cookies_from_session(session) if session is not None else driver.get_cookies()
+        store.save(config.cashbarber_email, cookies)
+    
+    return session, driver, 'completo'
+
+
+def login_completo(config: SyncConfig):
+    """
+    Faz o login com a engine configurada.
+    
+    No modo 'auto' tenta o login via HTTP e só usa o fluxo com Selenium se
+    o formulário de login mudou (`LoginFormChanged`). Credenciais inválidas
+    e erros de rede são propagados, para não repetir o login e arriscar
+    bloquear a conta.
+    
+    Args:
+        config: Configurações da sincronização
+    
+    Returns:
+        Tupla (session, driver): apenas um dos dois é preenchido
+    """
+    if config.login_engine in (LOGIN_ENGINE_HTTP, LOGIN_ENGINE_AUTO):
+        try:
+            session = login_cashbarber_http(
+                email=config.cashbarber_email,
+                password=config.cashbarber_password
+            )
+            logger.info("✓ Login via HTTP (sem navegador)")
+            return session, None
+        except LoginFormChanged as e:
+            if config.login_engine == LOGIN_ENGINE_HTTP:
+                raise
+            logger.warning(f"Login via HTTP indisponível ({e}); usando Selenium")
+    
+    driver = login_cashbarber(
+        email=config.cashbarber_email,
+        password=config.cashbarber_password,
+        headless=config.headless,
+        profile=browser_profile(config)
+    )
+    return None, driver
+
+
+def browser_profile(config: SyncConfig) -> ChromeProfile:
+    """Perfil do Chrome da execução (com log de rede se --network-capture)."""
+    return ChromeProfile(config.browser_profile, performance_log=config.network_capture)
+
+
+def run_sync(config: SyncConfig, browser=None, historico: Optional[dict] = None) -> int:
     """
     Executa sincronização completa.
     
     Args:
         config: Configurações da sincronização
+        browser: Navegador mantido entre execuções (ver sync_daemon.WarmBrowser
+            e multi_account.BrowserSlot); se informado, o login vem dele, o
+            Chrome é devolvido com `handoff()` quando o relatório vem via HTTP
+            e com `release()` no final
+        historico: Dicionário preenchido com o registro da execução
+            (o mesmo gravado em --run-history)
     
     Returns:
         Código de saída (0 = sucesso, 1 = erro)
@@ -94,6 +287,11 @@ def run_sync(config: SyncConfig) -> int:
     logger.info("=" * 80 + "\n")
     
     driver = None
+    historico = {} if historico is None else historico
+    historico.update({
+        'inicio': start_time.isoformat(timespec='seconds'),
+        'status': 'erro'
+    })
     
     try:
         # ETAPA 1: Login no Cashbarber
@@ -101,25 +299,51 @@ def run_sync(config: SyncConfig) -> int:
         logger.info("ETAPA 1: LOGIN NO CASHBARBER")
         logger.info("=" * 80)
         
-        driver = login_cashbarber(
-            email=config.cashbarber_email,
-            password=config.cashbarber_password,
-            headless=config.headless
-        )
+        login_inicio = time.perf_counter()
+        if browser is not None:
+            session, driver, modo_login = browser.acquire(config)
+        else:
+            session, driver, modo_login = login(config)
+        historico['login'] = modo_login
+        historico['login_segundos'] = round(time.perf_counter() - login_inicio, 3)
         
-        logger.info("✓ Login realizado com sucesso\n")
+        logger.info(f"✓ Login realizado com sucesso ({historico['login_segundos']:.2f}s)\n")
         
         # ETAPA 2: Navegação até relatório
         logger.info("=" * 80)
         logger.info("ETAPA 2: NAVEGANDO ATÉ RELATÓRIO DE ASSINANTES")
         logger.info("=" * 80)
         
-        if config.direto:
+        etapa_inicio = time.perf_counter()
+        relatorio_html = None
+        relatorio_pedacos = None
+        if session is None and config.http_report:
+            # Reaproveita os cookies da sessão e fecha o navegador antes da busca
+            session = session_from_driver(driver)
+            if browser is not None:
+                browser.handoff()
+            else:
+                driver.quit()
+                logger.info("🔒 Navegador fechado (relatório será buscado via HTTP)")
+            driver = None
+        
+        if session is not None:
+            # Com streaming, o relatório vai para um arquivo temporário e é
+            # lido em pedaços durante a sincronização
+            if config.stream_report:
+                relatorio_pedacos = stream_relatorio_html(session)
+            else:
+                relatorio_html = fetch_relatorio_html(session)
+        elif config.direto:
             from cashbarber_full_navigation import navigate_direto
             navigate_direto(driver)
         else:
             navigate_to_quantidade_assinantes(driver)
         
+        if driver is not None:
+            log_browser_metrics(driver, "Relatório")
+        
+        historico['navegacao_segundos'] = round(time.perf_counter() - etapa_inicio, 3)
         logger.info("✓ Navegação concluída\n")
         
         # ETAPA 3: Extração de dados
@@ -127,15 +351,54 @@ def run_sync(config: SyncConfig) -> int:
         logger.info("ETAPA 3: EXTRAINDO DADOS DA TABELA")
         logger.info("=" * 80)
         
-        assinantes_data = extract_from_driver(driver)
-        logger.info(f"✓ {len(assinantes_data)} registros extraídos\n")
+        etapa_inicio = time.perf_counter()
+        if config.stream_report:
+            # Assinantes lidos sob demanda, conforme a sincronização consome
+            if relatorio_pedacos is not None:
+                assinantes_data = stream_from_html(relatorio_pedacos)
+            else:
+                assinantes_data = stream_from_driver(driver)
+            logger.info("✓ Extração sob demanda (streaming)\n")
+        else:
+            assinantes_data = None
+            if relatorio_html is not None:
+                assinantes_data = extract_from_html(relatorio_html, parser=config.html_parser)
+            elif config.network_capture:
+                assinantes_data = extract_from_network(
+                    driver, config.network_recording_path, parser=config.html_parser
+                )
+                if assinantes_data is None:
+                    logger.info("Dados não encontrados na rede; extraindo pelo DOM")
+            
+            if assinantes_data is None:
+                assinantes_data = extract_from_driver(driver)
+            logger.info(f"✓ {len(assinantes_data)} registros extraídos\n")
+        historico['extracao_segundos'] = round(time.perf_counter() - etapa_inicio, 3)
         
         # ETAPA 4: Sincronização com Supabase
         logger.info("=" * 80)
         logger.info("ETAPA 4: SINCRONIZANDO COM SUPABASE")
         logger.info("=" * 80)
         
-        sync_stats = sync_from_data(assinantes_data, dry_run=config.dry_run)
+        etapa_inicio = time.perf_counter()
+        sync_stats = sync_from_data(
+            assinantes_data,
+            dry_run=config.dry_run,
+            supabase_options=config.supabase,
+            match_mode=config.match_mode,
+            match_workers=config.match_workers,
+            match_cache_path=config.match_cache_path,
+            write_mode=config.write_mode,
+            write_batch_size=config.write_batch_size,
+            skip_unchanged=config.skip_unchanged,
+            touch_days=config.touch_days,
+            write_workers=config.write_workers,
+            write_rate_limit=config.write_rate_limit
+        )
+        
+        if config.stream_report:
+            assinantes_data.verificar_total()
+        historico['sincronizacao_segundos'] = round(time.perf_counter() - etapa_inicio, 3)
         
         # ETAPA 5: Relatório final
         logger.info("\n" + "=" * 80)
@@ -150,10 +413,17 @@ def run_sync(config: SyncConfig) -> int:
         logger.info(f"\nResumo:")
         logger.info(f"  - Extraídos: {sync_stats['total_cashbarber']}")
         logger.info(f"  - Atualizados: {sync_stats['atualizados']}")
+        logger.info(f"  - Sem alterações: {sync_stats['inalterados']}")
         logger.info(f"  - Não encontrados: {sync_stats['nao_encontrados']}")
         logger.info(f"  - Erros: {sync_stats['erros']}")
         logger.info("=" * 80 + "\n")
         
+        historico.update({
+            'status': 'sucesso',
+            'extraidos': sync_stats['total_cashbarber'],
+            'atualizados': sync_stats['atualizados'],
+            'erros': sync_stats['erros']
+        })
         return 0
         
     except Exception as e:
@@ -163,9 +433,15 @@ def run_sync(config: SyncConfig) -> int:
         return 1
         
     finally:
-        if driver:
+        if browser is not None:
+            browser.release(sucesso=historico['status'] == 'sucesso')
+        elif driver:
             driver.quit()
             logger.info("🔒 Navegador fechado")
+        
+        historico['duracao_segundos'] = round((datetime.now() - start_time).total_seconds(), 3)
+        if config.run_history_path:
+            append_run_history(config.run_history_path, historico)
 
 
 def main(argv: Optional[list] = None) -> int:
@@ -222,6 +498,128 @@ def main(argv: Optional[list] = None) -> int:
         dest='direto',
         help='Usar navegação via menu (mais lento)'
     )
+    parser.add_argument(
+        '--login-engine',
+        choices=LOGIN_ENGINES,
+        default=LOGIN_ENGINE_AUTO,
+        help="Login: 'http' (sem navegador), 'selenium' ou 'auto' "
+             "(HTTP com fallback para Selenium) (padrão: auto; --menu, --network-capture, "
+             "--network-recording e --browser-profile exigem o Selenium)"
+    )
+    parser.add_argument(
+        '--browser-profile',
+        choices=PROFILES,
+        help="Perfil do Chrome: 'default' ou 'lean' (sem imagens, fontes, CSS e "
+             "scripts de terceiros) (padrão: variável CHROME_PROFILE ou 'default')"
+    )
+    parser.add_argument(
+        '--stream-report',
+        action='store_true',
+        help='Extrai o relatório sob demanda durante a sincronização '
+             '(memória limitada em relatórios muito grandes)'
+    )
+    parser.add_argument(
+        '--html-parser',
+        choices=PARSERS,
+        help="Parser do HTML do relatório obtido via HTTP "
+             "(padrão: variável CASHBARBER_HTML_PARSER ou 'lxml')"
+    )
+    parser.add_argument(
+        '--network-capture',
+        action='store_true',
+        help='Com Selenium, extrai o relatório das respostas de rede capturadas '
+             '(log de performance do Chrome) em vez do DOM; volta ao DOM se não encontrar'
+    )
+    parser.add_argument(
+        '--network-recording',
+        type=str,
+        metavar='PATH',
+        help='Salva a gravação de rede do --network-capture neste arquivo, para '
+             'reprodução com network_capture.py (padrão: variável NETWORK_RECORDING_PATH)'
+    )
+    parser.add_argument(
+        '--session-store',
+        type=str,
+        metavar='PATH',
+        help='Arquivo (criptografado) com a sessão do painel entre execuções '
+             '(padrão: variável SESSION_STORE_PATH)'
+    )
+    parser.add_argument(
+        '--run-history',
+        type=str,
+        metavar='PATH',
+        help='Arquivo JSON Lines com o histórico de execuções '
+             '(padrão: variável RUN_HISTORY_PATH)'
+    )
+    parser.add_argument(
+        '--http-report',
+        action='store_true',
+        help='Após o login, fecha o navegador e busca o relatório via HTTP '
+             'com os cookies da sessão (menos memória)'
+    )
+    parser.add_argument(
+        '--match-mode',
+        choices=MATCH_MODES,
+        default=MATCH_MODE_BRUTE,
+        help="Fuzzy matching: 'brute' compara com todos os clientes, "
+             "'ngram' usa o índice de trigramas, 'cosine' gera candidatos "
+             "de todos os nomes de uma vez (padrão: brute)"
+    )
+    parser.add_argument(
+        '--match-workers',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Processos usados no matching de nomes (padrão: 1, sem paralelismo)'
+    )
+    parser.add_argument(
+        '--match-cache',
+        type=str,
+        metavar='PATH',
+        help='Arquivo SQLite do cache de matches entre execuções '
+             '(padrão: variável MATCH_CACHE_PATH; sem cache se vazio)'
+    )
+    parser.add_argument(
+        '--write-mode',
+        choices=WRITE_MODES,
+        default=WRITE_MODE_ROW,
+        help="Escrita no Supabase: 'row' (um PATCH por cliente), "
+             "'upsert' (UPDATE em lote via função SQL de "
+             "supabase_bulk_update.sql) ou 'grouped' (um UPDATE por "
+             "combinação de plano/status) (padrão: row)"
+    )
+    parser.add_argument(
+        '--write-batch-size',
+        type=int,
+        default=500,
+        metavar='N',
+        help='Linhas por requisição nas escritas em lote (padrão: 500)'
+    )
+    parser.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        help='Não regravar clientes cujo plano e status não mudaram'
+    )
+    parser.add_argument(
+        '--touch-days',
+        type=int,
+        metavar='N',
+        help='Com --skip-unchanged, regravar o timestamp de clientes sem '
+             'alterações a cada N dias'
+    )
+    parser.add_argument(
+        '--write-workers',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Máximo de escritas individuais simultâneas no Supabase (padrão: 1)'
+    )
+    parser.add_argument(
+        '--write-rate-limit',
+        type=float,
+        metavar='RPS',
+        help='Máximo de escritas individuais por segundo (padrão: sem limite)'
+    )
     
     args = parser.parse_args(argv)
     
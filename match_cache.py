@@ -0,0 +1,299 @@
+"""
+Cache persistente de matches (nome no Cashbarber → cliente no Supabase).
+
+Este módulo gerencia:
+1. Armazenamento em SQLite dos matches já resolvidos (com o ratio obtido)
+2. Revalidação incremental quando a tabela de nomes muda no Supabase: só
+   os clientes adicionados ou renomeados desde a gravação de cada entrada
+   são pontuados contra ela, e a entrada só muda se um deles for melhor
+3. Matches separados por modo de matching
+
+Chave: nome do assinante normalizado (ver `name_matcher.normalize_nome`)
+e modo de matching.
+
+Os clientes vistos ficam numa tabela com a "geração" em que cada
+(id, nome) apareceu; cada entrada guarda a geração em que foi validada.
+"""
+
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import sqlite3
+
+from name_matcher import ClienteNameIndex, MATCH_MODE_BRUTE, normalize_nome
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Versão do esquema das tabelas (arquivos antigos são recriados)
+SCHEMA_VERSION = '3'
+
+
+class MatchCache:
+    """Cache SQLite de matches de nomes."""
+
+    def __init__(self, path: str, threshold: float = 0.85, match_mode: str = MATCH_MODE_BRUTE):
+        """
+        Abre (ou cria) o cache.
+
+        Args:
+            path: Caminho do arquivo SQLite
+            threshold: Limiar de similaridade usado nos matches; se mudar em
+                relação ao gravado no arquivo, o cache é descartado
+            match_mode: Modo de matching dos resultados lidos e gravados
+        """
+        self.path = path
+        self.threshold = threshold
+        self.match_mode = match_mode
+
+        # Preenchidos por `sincronizar_clientes`
+        self.geracao = 0
+        self._index: Optional[ClienteNameIndex] = None
+        self._por_id: Dict[str, int] = {}
+        self._geracoes: List[int] = []         # geração de cada posição, em ordem crescente
+        self._posicoes_geracao: List[int] = []  # posições na mesma ordem de `_geracoes`
+        self._novos: Dict[int, List[int]] = {}   # geração → posições posteriores
+
+        diretorio = os.path.dirname(path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)"
+        )
+
+        row = self.conn.execute("SELECT valor FROM meta WHERE chave = 'schema'").fetchone()
+        if row is None or row[0] != SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS matches")
+            self.conn.execute("DROP TABLE IF EXISTS clientes")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.execute(
+                "INSERT INTO meta (chave, valor) VALUES ('schema', ?)", (SCHEMA_VERSION,)
+            )
+
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " nome_busca TEXT,"
+            " match_mode TEXT,"
+            " cliente_id TEXT,"       # NULL = cliente não encontrado
+            " cliente_nome TEXT,"     # nome normalizado do cliente no match
+            " ratio REAL,"            # ratio do match (NULL se não encontrado)
+            " geracao INTEGER,"       # geração dos clientes na última validação
+            " PRIMARY KEY (nome_busca, match_mode)"
+            ")"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS clientes ("
+            " cliente_id TEXT PRIMARY KEY,"
+            " nome TEXT,"             # nome normalizado
+            " geracao INTEGER"        # geração em que (id, nome) apareceu
+            ")"
+        )
+
+        row = self.conn.execute(
+            "SELECT valor FROM meta WHERE chave = 'threshold'"
+        ).fetchone()
+        if row is None or float(row[0]) != threshold:
+            if row is not None:
+                logger.info(f"Limiar alterado ({row[0]} → {threshold}): limpando cache de matches")
+            self.conn.execute("DELETE FROM matches")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('threshold', ?)",
+                (repr(threshold),)
+            )
+
+        row = self.conn.execute("SELECT valor FROM meta WHERE chave = 'geracao'").fetchone()
+        self.geracao = int(row[0]) if row else 0
+        self.conn.commit()
+
+    def sincronizar_clientes(self, name_index: ClienteNameIndex) -> int:
+        """
+        Registra os clientes atuais do Supabase (uma vez por sincronização).
+
+        Clientes novos ou renomeados entram numa nova geração; os removidos
+        saem da tabela.
+
+        Args:
+            name_index: Índice com os clientes atuais do Supabase
+
+        Returns:
+            Número de clientes adicionados ou renomeados desde a última vez
+        """
+        conhecidos = {
+            cliente_id: (nome, geracao)
+            for cliente_id, nome, geracao in self.conn.execute(
+                "SELECT cliente_id, nome, geracao FROM clientes"
+            )
+        }
+
+        atuais = [str(cliente.id) for cliente in name_index.clientes]
+        alterados = [
+            (cliente_id, nome)
+            for cliente_id, nome in zip(atuais, name_index.nomes)
+            if conhecidos.get(cliente_id, (None,))[0] != nome
+        ]
+        removidos = conhecidos.keys() - set(atuais)
+
+        if alterados or removidos:
+            self.geracao += 1
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO clientes (cliente_id, nome, geracao) VALUES (?, ?, ?)",
+                [(cliente_id, nome, self.geracao) for cliente_id, nome in alterados]
+            )
+            self.conn.executemany(
+                "DELETE FROM clientes WHERE cliente_id = ?", [(i,) for i in removidos]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('geracao', ?)",
+                (str(self.geracao),)
+            )
+            self.conn.commit()
+
+            for cliente_id, nome in alterados:
+                conhecidos[cliente_id] = (nome, self.geracao)
+
+        self._index = name_index
+        self._por_id = {cliente_id: pos for pos, cliente_id in enumerate(atuais)}
+        ordem = sorted(range(len(atuais)), key=lambda pos: conhecidos[atuais[pos]][1])
+        self._posicoes_geracao = ordem
+        self._geracoes = [conhecidos[atuais[pos]][1] for pos in ordem]
+        self._novos = {}
+
+        if alterados:
+            logger.info(f"Cache de matches: {len(alterados)} clientes novos ou renomeados")
+        return len(alterados)
+
+    def _novos_desde(self, geracao: int) -> List[int]:
+        """Posições (em ordem crescente) dos clientes de gerações posteriores."""
+        novos = self._novos.get(geracao)
+        if novos is None:
+            inicio = bisect_right(self._geracoes, geracao)
+            novos = self._novos[geracao] = sorted(self._posicoes_geracao[inicio:])
+        return novos
+
+    def lookup(
+        self,
+        nomes_normalizados: Iterable[str],
+        name_index: ClienteNameIndex
+    ) -> Dict[str, Optional[object]]:
+        """
+        Busca matches válidos no cache.
+
+        Uma entrada encontrada continua válida enquanto o cliente existir
+        com o mesmo nome. Entradas de gerações anteriores são comparadas só
+        com os clientes novos ou renomeados desde então: um deles substitui
+        o match se tiver ratio maior (ou igual e vier antes na tabela, como
+        na busca completa) e, para um "não encontrado", se atingir o limiar.
+
+        Args:
+            nomes_normalizados: Nomes buscados, já normalizados
+            name_index: Índice com os clientes atuais do Supabase
+
+        Returns:
+            Dicionário nome → cliente (ou None para "não encontrado") apenas
+            com as entradas válidas; nomes ausentes precisam de matching
+        """
+        if self._index is not name_index:
+            self.sincronizar_clientes(name_index)
+
+        validos: Dict[str, Optional[object]] = {}
+        invalidos: List[Tuple[str, str]] = []
+        atualizados: List[Tuple] = []
+
+        for nome in set(nomes_normalizados):
+            row = self.conn.execute(
+                "SELECT cliente_id, cliente_nome, ratio, geracao FROM matches "
+                "WHERE nome_busca = ? AND match_mode = ?",
+                (nome, self.match_mode)
+            ).fetchone()
+            if row is None:
+                continue
+
+            cliente_id, cliente_nome, ratio, geracao = row
+            pos = None
+            if cliente_id is not None:
+                pos = self._por_id.get(cliente_id)
+                if pos is None or name_index.nomes[pos] != cliente_nome:
+                    # Cliente removido ou renomeado: precisa de novo matching
+                    invalidos.append((nome, self.match_mode))
+                    continue
+
+            if geracao < self.geracao:
+                novos = self._novos_desde(geracao)
+                if novos:
+                    minimo = self.threshold if ratio is None else ratio
+                    novo_pos, novo_ratio = name_index._melhor_ratio(nome, novos, minimo)
+                    if novo_pos is not None and novo_ratio >= minimo and (
+                        pos is None or novo_ratio > ratio or novo_pos < pos
+                    ):
+                        pos, ratio = novo_pos, novo_ratio
+                        cliente_id = str(name_index.clientes[pos].id)
+                        cliente_nome = name_index.nomes[pos]
+                atualizados.append((
+                    cliente_id, cliente_nome, ratio, self.geracao, nome, self.match_mode
+                ))
+
+            validos[nome] = None if pos is None else name_index.clientes[pos]
+
+        if invalidos:
+            self.conn.executemany(
+                "DELETE FROM matches WHERE nome_busca = ? AND match_mode = ?", invalidos
+            )
+        if atualizados:
+            self.conn.executemany(
+                "UPDATE matches SET cliente_id = ?, cliente_nome = ?, ratio = ?, geracao = ? "
+                "WHERE nome_busca = ? AND match_mode = ?",
+                atualizados
+            )
+        if invalidos or atualizados:
+            self.conn.commit()
+
+        return validos
+
+    def store(
+        self,
+        resultados: Dict[str, Optional[object]],
+        name_index: ClienteNameIndex
+    ) -> None:
+        """
+        Grava matches resolvidos.
+
+        Args:
+            resultados: Dicionário nome normalizado → cliente (ou None)
+            name_index: Índice com os clientes atuais do Supabase
+        """
+        if not resultados:
+            return
+
+        if self._index is not name_index:
+            self.sincronizar_clientes(name_index)
+
+        linhas = []
+        for nome, cliente in resultados.items():
+            if cliente is None:
+                linhas.append((nome, self.match_mode, None, None, None, self.geracao))
+            else:
+                cliente_nome = normalize_nome(cliente.nome)
+                # Mesmo cálculo do matching (nome buscado como seq1)
+                ratio = SequenceMatcher(None, nome, cliente_nome).ratio()
+                linhas.append((
+                    nome, self.match_mode, str(cliente.id), cliente_nome, ratio, self.geracao
+                ))
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO matches "
+            "(nome_busca, match_mode, cliente_id, cliente_nome, ratio, geracao) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            linhas
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Fecha a conexão com o arquivo."""
+        self.conn.close()
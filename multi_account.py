@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Sincronização de várias contas (unidades) do Cashbarber em paralelo.
+
+Este módulo gerencia:
+1. Arquivo de configuração com várias contas, cada uma com suas
+   credenciais e sua tabela/colunas no Supabase
+2. Pool de execuções com um limite de Chromes abertos ao mesmo tempo
+   (contas que fazem login via HTTP não ocupam vaga)
+3. Relatório agregado com os tempos de cada conta
+
+Formato do arquivo (as opções são as mesmas de `main.py --config`):
+    {
+      "max_browsers": 2,
+      "workers": 4,
+      "defaults": {
+        "write_mode": "upsert",
+        "match_cache": "/app/data/match_cache_{conta}.sqlite3",
+        "supabase": {"url": "https://xxx.supabase.co"}
+      },
+      "accounts": [
+        {
+          "name": "centro",
+          "cashbarber_email": "centro@example.com",
+          "cashbarber_password_env": "CASHBARBER_PASSWORD_CENTRO",
+          "supabase": {"table_name": "clientes_centro", "column_plano": "plano"}
+        }
+      ]
+    }
+
+Nos caminhos de arquivo, `{conta}` é trocado pelo nome da conta, inclusive
+nos que vêm do ambiente (MATCH_CACHE_PATH, SESSION_STORE_PATH, ...). Cache de
+matches, sessão salva e gravação de rede precisam ser diferentes por conta.
+
+Uso:
+    python multi_account.py contas.json [--max-browsers 2] [--report relatorio.json]
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from selenium import webdriver
+
+from cashbarber_full_navigation import LoginFormChanged, LOGIN_ENGINE_HTTP, LOGIN_ENGINE_SELENIUM
+from main import SyncConfig, login, run_sync
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BROWSERS = 2
+
+# Opções de caminho que aceitam {conta}: opção → (variável de ambiente
+# usada na falta dela, atributo de SyncConfig)
+PATH_OPTIONS = {
+    'match_cache': ('MATCH_CACHE_PATH', 'match_cache_path'),
+    'session_store': ('SESSION_STORE_PATH', 'session_store_path'),
+    'run_history': ('RUN_HISTORY_PATH', 'run_history_path'),
+    'network_recording': ('NETWORK_RECORDING_PATH', 'network_recording_path'),
+}
+
+# Caminhos que não podem ser compartilhados entre contas
+EXCLUSIVE_PATH_OPTIONS = ('match_cache', 'session_store', 'network_recording')
+
+
+@dataclass
+class Conta:
+    """Uma conta do Cashbarber e a configuração da sua sincronização."""
+    nome: str
+    config: SyncConfig
+
+
+def _config_conta(defaults: Dict[str, Any], conta: Dict[str, Any], nome: str) -> Dict[str, Any]:
+    """Configuração (formato de `SyncConfig`) de uma conta sobre os padrões."""
+    opcoes = {**defaults, **conta}
+    opcoes['supabase'] = {**defaults.get('supabase', {}), **conta.get('supabase', {})}
+    opcoes.pop('name', None)
+
+    # Senha em variável de ambiente, para não deixá-la no arquivo
+    variavel = opcoes.pop('cashbarber_password_env', None)
+    if variavel and not opcoes.get('cashbarber_password'):
+        opcoes['cashbarber_password'] = os.getenv(variavel)
+
+    # Caminhos vindos do ambiente também recebem o nome da conta
+    for chave, (variavel, _) in PATH_OPTIONS.items():
+        caminho = opcoes.get(chave) or os.getenv(variavel)
+        if caminho:
+            opcoes[chave] = caminho.replace('{conta}', nome)
+    return opcoes
+
+
+def load_accounts(path: str) -> Tuple[List[Conta], Dict[str, Any]]:
+    """
+    Lê o arquivo de contas.
+
+    Returns:
+        Tupla (contas, opções do pool: 'max_browsers' e 'workers')
+
+    Raises:
+        ValueError: Se o arquivo for inválido
+    """
+    with open(path, 'r') as f:
+        dados = json.load(f)
+
+    defaults = dados.get('defaults', {})
+    contas = []
+    caminhos: Dict[Tuple[str, str], str] = {}
+
+    for posicao, item in enumerate(dados.get('accounts', []), start=1):
+        nome = item.get('name') or f"conta{posicao}"
+        if not item.get('cashbarber_email'):
+            # Sem email a conta usaria as credenciais padrão do ambiente
+            raise ValueError(f"Conta '{nome}' sem cashbarber_email")
+
+        opcoes = _config_conta(defaults, item, nome)
+        try:
+            config = SyncConfig(opcoes)
+        except ValueError as e:
+            raise ValueError(f"Conta '{nome}': {e}")
+
+        # Confere os caminhos efetivos da configuração (inclusive os do ambiente)
+        for chave in EXCLUSIVE_PATH_OPTIONS:
+            caminho = getattr(config, PATH_OPTIONS[chave][1])
+            if not caminho or (chave == 'network_recording' and not config.network_capture):
+                continue
+            if (chave, caminho) in caminhos:
+                raise ValueError(
+                    f"Contas '{caminhos[(chave, caminho)]}' e '{nome}' usam o mesmo {chave} "
+                    f"({caminho}); use {{conta}} no caminho (também em "
+                    f"{PATH_OPTIONS[chave][0]})"
+                )
+            caminhos[(chave, caminho)] = nome
+
+        contas.append(Conta(nome, config))
+
+    if not contas:
+        raise ValueError("Nenhuma conta configurada em 'accounts'")
+
+    nomes = [conta.nome for conta in contas]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Nomes de conta repetidos")
+
+    pool = {
+        'max_browsers': dados.get('max_browsers'),
+        'workers': dados.get('workers'),
+    }
+    return contas, pool
+
+
+class BrowserSlot:
+    """
+    Login de uma conta com vaga limitada de navegador.
+
+    Usado como `browser` de `run_sync`: tenta o login via HTTP sem ocupar
+    vaga e só espera uma vaga do pool quando o Chrome é necessário. O
+    Chrome é fechado (e a vaga liberada) ao fim da execução, ou logo após
+    o login quando o relatório é buscado via HTTP.
+    """
+
+    def __init__(self, vagas: threading.BoundedSemaphore):
+        self.vagas = vagas
+        self.driver: Optional[webdriver.Chrome] = None
+        self.espera = 0.0
+
+    def acquire(self, config: SyncConfig) -> Tuple[Any, Optional[webdriver.Chrome], str]:
+        """
+        Faz o login (no formato de `main.login`).
+
+        Como em `main.login_completo`, só um formulário de login diferente
+        do esperado leva ao Selenium; os demais erros são propagados.
+        """
+        if config.login_engine != LOGIN_ENGINE_SELENIUM:
+            sem_navegador = copy.copy(config)
+            sem_navegador.login_engine = LOGIN_ENGINE_HTTP
+            try:
+                return login(sem_navegador)
+            except LoginFormChanged as e:
+                if config.login_engine == LOGIN_ENGINE_HTTP:
+                    raise
+                logger.warning(f"Login via HTTP indisponível ({e}); usando Selenium")
+
+            config = copy.copy(config)
+            config.login_engine = LOGIN_ENGINE_SELENIUM
+
+        inicio = time.perf_counter()
+        self.vagas.acquire()
+        self.espera = time.perf_counter() - inicio
+        if self.espera >= 1:
+            logger.info(f"Vaga de navegador liberada após {self.espera:.1f}s")
+
+        try:
+            session, self.driver, modo = login(config)
+        except Exception:
+            self.vagas.release()
+            raise
+
+        if self.driver is None:
+            self.vagas.release()  # sessão salva restaurada via HTTP
+        return session, self.driver, modo
+
+    def handoff(self) -> None:
+        """
+        Chamado quando a sessão passou para HTTP (`--http-report`): fecha o
+        Chrome e libera a vaga antes da busca do relatório e da sincronização.
+        """
+        if self.driver is not None:
+            logger.info("Relatório será buscado via HTTP")
+        self.release()
+
+    def release(self, sucesso: bool = True) -> None:
+        """Fecha o Chrome da conta e libera a vaga."""
+        if self.driver is None:
+            return
+
+        try:
+            self.driver.quit()
+            logger.info("🔒 Navegador fechado")
+        finally:
+            self.driver = None
+            self.vagas.release()
+
+
+def run_accounts(
+    contas: List[Conta],
+    max_browsers: int = DEFAULT_MAX_BROWSERS,
+    workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Sincroniza as contas em paralelo.
+
+    Args:
+        contas: Contas a sincronizar
+        max_browsers: Máximo de Chromes abertos ao mesmo tempo
+        workers: Máximo de contas em execução (padrão: max_browsers)
+
+    Returns:
+        Registro de cada execução (ver `run_sync`), na ordem das contas,
+        com 'conta' e 'espera_navegador_segundos'
+    """
+    max_browsers = max(1, max_browsers)
+    workers = max(1, workers or max_browsers)
+    vagas = threading.BoundedSemaphore(max_browsers)
+
+    def executar(conta: Conta) -> Dict[str, Any]:
+        # O nome da thread identifica a conta nas linhas de log
+        threading.current_thread().name = conta.nome
+
+        historico: Dict[str, Any] = {'conta': conta.nome}
+        slot = BrowserSlot(vagas)
+        run_sync(conta.config, browser=slot, historico=historico)
+        historico['espera_navegador_segundos'] = round(slot.espera, 3)
+        return historico
+
+    logger.info(
+        f"Sincronizando {len(contas)} contas "
+        f"({workers} em paralelo, até {max_browsers} navegadores)"
+    )
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(executar, contas))
+
+
+def format_report(registros: List[Dict[str, Any]], duracao: float) -> str:
+    """Tabela com os tempos e resultados de cada conta e os totais."""
+    colunas = (
+        ('conta', 'Conta', 16),
+        ('status', 'Status', 8),
+        ('login', 'Login', 12),
+        ('login_segundos', 'Login(s)', 9),
+        ('navegacao_segundos', 'Naveg.(s)', 9),
+        ('extracao_segundos', 'Extr.(s)', 9),
+        ('sincronizacao_segundos', 'Sinc.(s)', 9),
+        ('duracao_segundos', 'Total(s)', 9),
+        ('extraidos', 'Extraídos', 10),
+        ('atualizados', 'Atualiz.', 9),
+        ('erros', 'Erros', 6),
+    )
+
+    def celula(valor: Any, largura: int) -> str:
+        if valor is None:
+            valor = '-'
+        elif isinstance(valor, float):
+            valor = f"{valor:.2f}"
+        return str(valor)[:largura].ljust(largura)
+
+    linhas = [' '.join(celula(titulo, largura) for _, titulo, largura in colunas)]
+    linhas.append('-' * len(linhas[0]))
+    for registro in registros:
+        linhas.append(' '.join(celula(registro.get(chave), largura) for chave, _, largura in colunas))
+
+    sucesso = sum(1 for r in registros if r.get('status') == 'sucesso')
+    soma = sum(r.get('duracao_segundos', 0) for r in registros)
+    linhas.append('-' * len(linhas[0]))
+    linhas.append(
+        f"{sucesso}/{len(registros)} contas com sucesso; "
+        f"{sum(r.get('extraidos', 0) for r in registros)} extraídos, "
+        f"{sum(r.get('atualizados', 0) for r in registros)} atualizados, "
+        f"{sum(r.get('erros', 0) for r in registros)} erros"
+    )
+    linhas.append(f"Tempo total: {duracao:.2f}s (soma das contas: {soma:.2f}s)")
+    return '\n'.join(linhas)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Sincroniza todas as contas do arquivo e mostra o relatório agregado."""
+    parser = argparse.ArgumentParser(description="Sincroniza várias contas do Cashbarber com o Supabase")
+    parser.add_argument('config', help='Arquivo JSON com as contas')
+    parser.add_argument(
+        '--max-browsers',
+        type=int,
+        metavar='N',
+        help='Máximo de Chromes abertos ao mesmo tempo '
+             f'(padrão: arquivo, MAX_BROWSERS ou {DEFAULT_MAX_BROWSERS})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        metavar='N',
+        help='Máximo de contas sincronizando ao mesmo tempo (padrão: arquivo ou --max-browsers)'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Simula todas as contas sem atualizar')
+    parser.add_argument('--report', type=str, metavar='PATH', help='Salva o relatório agregado em JSON')
+
+    args = parser.parse_args(argv)
+
+    try:
+        contas, pool = load_accounts(args.config)
+    except (OSError, ValueError) as e:
+        logger.error(f"Erro ao carregar contas: {e}")
+        return 1
+
+    if args.dry_run:
+        for conta in contas:
+            conta.config.dry_run = True
+
+    max_browsers = (
+        args.max_browsers
+        or pool['max_browsers']
+        or int(os.getenv('MAX_BROWSERS', DEFAULT_MAX_BROWSERS))
+    )
+    workers = args.workers or pool['workers']
+
+    # Com contas em paralelo, o nome da conta (thread) vai em cada linha de log
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+
+    inicio = datetime.now()
+    registros = run_accounts(contas, max_browsers, workers)
+    duracao = (datetime.now() - inicio).total_seconds()
+
+    print(format_report(registros, duracao))
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({
+                'inicio': inicio.isoformat(timespec='seconds'),
+                'duracao_segundos': round(duracao, 3),
+                'max_browsers': max_browsers,
+                'contas': registros,
+            }, f, ensure_ascii=False, indent=2)
+        logger.info(f"Relatório salvo em {args.report}")
+
+    return 0 if all(r.get('status') == 'sucesso' for r in registros) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
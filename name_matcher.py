@@ -0,0 +1,548 @@
+"""
+Índices de nomes para o matching de assinantes com clientes do Supabase.
+
+Este módulo gerencia:
+1. Normalização de nomes para comparação
+2. Índice de match exato (nome normalizado → cliente)
+3. Índice invertido de trigramas para gerar candidatos do fuzzy matching
+4. Matching em lote por cosseno de vetores esparsos de n-gramas (numpy/scipy, opcional)
+5. Pontuação dos candidatos com SequenceMatcher (com poda por limites)
+6. Matching em paralelo com um pool de processos
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+import heapq
+import logging
+import multiprocessing
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy são opcionais (apenas para o modo 'cosine')
+    np = None
+    sparse = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Modos do fuzzy matching
+MATCH_MODE_NGRAM = 'ngram'  # Pontua os candidatos do índice de trigramas
+MATCH_MODE_BRUTE = 'brute'  # Pontua todos os clientes (comportamento original)
+MATCH_MODE_COSINE = 'cosine'  # Candidatos de todos os nomes de uma vez (cosseno de n-gramas)
+MATCH_MODES = (MATCH_MODE_NGRAM, MATCH_MODE_BRUTE, MATCH_MODE_COSINE)
+
+# Início dos processos do pool: o processo principal tem threads (escrita em
+# paralelo, várias contas, daemon), e um fork herdaria locks em uso
+POOL_START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def normalize_nome(nome: Optional[str]) -> str:
+    """
+    Normaliza um nome para comparação (minúsculas, sem espaços nas pontas e
+    com sequências de espaços reduzidas a um, como no texto das células do
+    relatório; ver `cashbarber_extractor._texto_celula`).
+
+    Args:
+        nome: Nome original (pode ser None)
+
+    Returns:
+        Nome normalizado
+    """
+    return ' '.join((nome or '').lower().split())
+
+
+def ngrams(nome_normalizado: str, n: int = 3) -> Set[str]:
+    """
+    Gera o conjunto de n-gramas de caracteres de um nome já normalizado.
+
+    O nome é preenchido com espaços nas pontas para que início e fim do nome
+    também gerem n-gramas (nomes curtos continuam indexáveis).
+
+    Args:
+        nome_normalizado: Nome já normalizado
+        n: Tamanho do n-grama
+
+    Returns:
+        Conjunto de n-gramas
+    """
+    padded = f"{' ' * (n - 1)}{nome_normalizado} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class ClienteNameIndex:
+    """
+    Índice de clientes por nome, construído uma vez por sincronização.
+
+    Guarda os nomes já normalizados (na mesma ordem da lista original), um
+    dicionário para responder matches exatos em O(1) e um índice invertido
+    de trigramas que limita o fuzzy matching aos clientes mais parecidos.
+    """
+
+    def __init__(
+        self,
+        clientes: Iterable,
+        ngram_size: int = 3,
+        top_k: int = 50,
+        min_shared: int = 2
+    ):
+        """
+        Constrói o índice.
+
+        Args:
+            clientes: Clientes do Supabase (ClienteSupabase)
+            ngram_size: Tamanho dos n-gramas do índice invertido
+            top_k: Máximo de candidatos pontuados por busca
+            min_shared: Mínimo de n-gramas em comum para virar candidato
+        """
+        self.clientes: List = list(clientes)
+        self.nomes: List[str] = [normalize_nome(c.nome) for c in self.clientes]
+        self.ngram_size = ngram_size
+        self.top_k = top_k
+        self.min_shared = min_shared
+
+        # Em nomes duplicados vale o primeiro da lista, como na busca linear
+        self.exatos: Dict[str, int] = {}
+        for pos, nome in enumerate(self.nomes):
+            self.exatos.setdefault(nome, pos)
+
+        # n-grama → posições (em ordem crescente) dos clientes que o contêm
+        self.postings: Dict[str, List[int]] = {}
+        self.ngram_counts: List[int] = []
+        for pos, nome in enumerate(self.nomes):
+            grams = ngrams(nome, ngram_size)
+            self.ngram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(pos)
+
+        # SequenceMatchers por cliente, criados sob demanda (ver `_matcher`)
+        self.tamanhos: List[int] = [len(nome) for nome in self.nomes]
+        self._matchers: Dict[int, SequenceMatcher] = {}
+
+        # Construído sob demanda no primeiro uso do modo 'cosine'
+        self._cosine: Optional['CosineCandidateMatcher'] = None
+
+    def __len__(self) -> int:
+        return len(self.clientes)
+
+    def get_exato(self, nome_normalizado: str):
+        """
+        Retorna o cliente com nome exatamente igual (já normalizado) ou None.
+        """
+        pos = self.exatos.get(nome_normalizado)
+        return self._cliente(pos)
+
+    def _cliente(self, pos: Optional[int]):
+        """Converte uma posição do índice no cliente (ou None)."""
+        return None if pos is None else self.clientes[pos]
+
+    def candidatos(self, nome_normalizado: str) -> Tuple[List[int], bool]:
+        """
+        Seleciona os clientes que compartilham mais n-gramas com o nome.
+
+        Os candidatos são ordenados pelo coeficiente de Dice entre os
+        conjuntos de n-gramas, que penaliza nomes muito mais longos ou mais
+        curtos (assim como o ratio do SequenceMatcher).
+
+        Args:
+            nome_normalizado: Nome buscado, já normalizado
+
+        Returns:
+            Tupla (posições dos até `top_k` melhores candidatos em ordem
+            crescente, True se havia mais candidatos que `top_k`)
+        """
+        grams = ngrams(nome_normalizado, self.ngram_size)
+        contagem = Counter()
+        for gram in grams:
+            contagem.update(self.postings.get(gram, ()))
+
+        total = len(grams)
+        counts = self.ngram_counts
+        dice = {
+            pos: shared / (total + counts[pos])
+            for pos, shared in contagem.items()
+            if shared >= self.min_shared
+        }
+
+        melhores = heapq.nlargest(self.top_k, dice, key=dice.__getitem__)
+        return sorted(melhores), len(dice) > self.top_k
+
+    def melhor_match(
+        self,
+        nome_normalizado: str,
+        threshold: float = 0.85,
+        mode: str = MATCH_MODE_BRUTE
+    ):
+        """
+        Busca o cliente mais parecido (match exato ou fuzzy).
+
+        Args:
+            nome_normalizado: Nome buscado, já normalizado
+            threshold: Limiar de similaridade (0-1)
+            mode: MATCH_MODE_BRUTE (todos os clientes), MATCH_MODE_NGRAM
+                (candidatos do índice; todos os clientes se o top_k não
+                couber todos) ou MATCH_MODE_COSINE
+
+        Returns:
+            Cliente encontrado ou None
+        """
+        return self._cliente(self.melhor_posicao(nome_normalizado, threshold, mode))
+
+    def melhor_posicao(
+        self,
+        nome_normalizado: str,
+        threshold: float = 0.85,
+        mode: str = MATCH_MODE_BRUTE
+    ) -> Optional[int]:
+        """Igual a `melhor_match`, mas devolve a posição do cliente no índice."""
+        pos = self.exatos.get(nome_normalizado)
+        if pos is not None:
+            return pos
+
+        if mode == MATCH_MODE_COSINE:
+            return self.match_all_posicoes([nome_normalizado], threshold, mode)[0]
+
+        if mode == MATCH_MODE_BRUTE:
+            return self._melhor_fuzzy(nome_normalizado, range(len(self.clientes)), threshold)
+
+        if mode != MATCH_MODE_NGRAM:
+            raise ValueError(f"Modo de matching inválido: {mode}")
+
+        posicoes, truncado = self.candidatos(nome_normalizado)
+        if not truncado:
+            return self._melhor_fuzzy(nome_normalizado, posicoes, threshold)
+
+        # Clientes fora do top_k podem ter ratio maior (ex.: sobrenomes
+        # comuns): o melhor ratio do top_k vira o piso de uma busca em todos
+        # os clientes, que dá o mesmo resultado da força bruta
+        _, piso = self._melhor_ratio(nome_normalizado, posicoes, threshold)
+        return self._melhor_fuzzy(
+            nome_normalizado, range(len(self.clientes)), threshold, max(threshold, piso)
+        )
+
+    def match_all(
+        self,
+        nomes_normalizados: List[str],
+        threshold: float = 0.85,
+        mode: str = MATCH_MODE_BRUTE,
+        workers: int = 1
+    ) -> List:
+        """
+        Busca o melhor cliente para cada nome da lista.
+
+        No modo 'cosine' os candidatos de todos os nomes são gerados de uma
+        vez (produto de matrizes esparsas); nos demais modos cada nome é
+        buscado individualmente com `melhor_match`. Com `workers > 1` a
+        lista é dividida em fatias contíguas entre processos e o resultado
+        volta na ordem original.
+
+        Args:
+            nomes_normalizados: Nomes buscados, já normalizados
+            threshold: Limiar de similaridade (0-1)
+            mode: Modo do fuzzy matching
+            workers: Número de processos do pool (1 = sem paralelismo)
+
+        Returns:
+            Lista alinhada com `nomes_normalizados` (cliente ou None)
+        """
+        if workers > 1:
+            posicoes = match_all_parallel(self, nomes_normalizados, threshold, mode, workers)
+        else:
+            posicoes = self.match_all_posicoes(nomes_normalizados, threshold, mode)
+
+        return [self._cliente(pos) for pos in posicoes]
+
+    def match_all_posicoes(
+        self,
+        nomes_normalizados: List[str],
+        threshold: float = 0.85,
+        mode: str = MATCH_MODE_BRUTE
+    ) -> List[Optional[int]]:
+        """Igual a `match_all` (sem pool), mas devolve posições no índice."""
+        if mode == MATCH_MODE_COSINE and sparse is None:
+            logger.warning(
+                "numpy/scipy não instalados: usando matching por trigramas"
+            )
+            mode = MATCH_MODE_NGRAM
+
+        if mode != MATCH_MODE_COSINE:
+            return [self.melhor_posicao(nome, threshold, mode) for nome in nomes_normalizados]
+
+        resultado = [self.exatos.get(nome) for nome in nomes_normalizados]
+        pendentes = [i for i, pos in enumerate(resultado) if pos is None]
+        if not pendentes:
+            return resultado
+
+        if self._cosine is None:
+            self._cosine = CosineCandidateMatcher(self.nomes, self.ngram_size, self.top_k)
+
+        candidatos = self._cosine.candidatos([nomes_normalizados[i] for i in pendentes])
+        for i, posicoes in zip(pendentes, candidatos):
+            resultado[i] = self._melhor_fuzzy(nomes_normalizados[i], posicoes, threshold)
+
+        return resultado
+
+    def _melhor_fuzzy(
+        self,
+        nome_normalizado: str,
+        posicoes: Iterable[int],
+        threshold: float,
+        piso: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        Pontua os candidatos com SequenceMatcher e aplica o limiar.
+
+        Cada candidato passa por uma cascata de limites superiores do ratio
+        (tamanhos, quick_ratio) e só chega ao ratio() completo se ainda puder
+        atingir o limiar e superar o melhor ratio até agora. O resultado é o
+        mesmo da comparação completa com todos os candidatos.
+
+        Args:
+            piso: Ratio já alcançado por algum dos candidatos (padrão: o
+                limiar); candidatos que não podem alcançá-lo são descartados
+        """
+        best_pos, best_ratio = self._melhor_ratio(
+            nome_normalizado, posicoes, threshold if piso is None else piso
+        )
+        if best_ratio >= threshold:
+            return best_pos
+
+        return None
+
+    def _melhor_ratio(
+        self,
+        nome_normalizado: str,
+        posicoes: Iterable[int],
+        minimo: float
+    ) -> Tuple[Optional[int], float]:
+        """
+        Primeiro candidato com o maior ratio, ignorando os que não podem
+        chegar a `minimo`.
+
+        Returns:
+            Tupla (posição, ratio); (None, 0.0) se nenhum foi pontuado
+        """
+        best_pos = None
+        best_ratio = 0.0
+        tamanho = len(nome_normalizado)
+        tamanhos = self.tamanhos
+
+        for pos in posicoes:
+            # Limite pelos tamanhos (equivale ao real_quick_ratio)
+            total = tamanho + tamanhos[pos]
+            limite = 2.0 * min(tamanho, tamanhos[pos]) / total if total else 1.0
+            if limite < minimo or limite <= best_ratio:
+                continue
+
+            matcher = self._matcher(pos)
+            matcher.set_seq1(nome_normalizado)
+
+            limite = matcher.quick_ratio()
+            if limite < minimo or limite <= best_ratio:
+                continue
+
+            ratio = matcher.ratio()
+
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_pos = pos
+
+        return best_pos, best_ratio
+
+    def _matcher(self, pos: int) -> SequenceMatcher:
+        """
+        Retorna o SequenceMatcher do cliente (nome do cliente como seq2).
+
+        O SequenceMatcher pré-processa apenas a seq2, então manter um por
+        cliente faz essa análise uma única vez por execução; a seq1 (nome
+        buscado) é trocada com set_seq1. A ordem (busca, cliente) é a mesma
+        da comparação original, já que o ratio não é simétrico.
+        """
+        matcher = self._matchers.get(pos)
+        if matcher is None:
+            matcher = SequenceMatcher(None, '', self.nomes[pos])
+            self._matchers[pos] = matcher
+        return matcher
+
+
+# ============================================================================
+# MATCHING EM PARALELO
+# ============================================================================
+
+# Índice de cada processo do pool, construído uma única vez no initializer
+_worker_index: Optional[ClienteNameIndex] = None
+
+
+def _init_worker(nomes_clientes: List[str], ngram_size: int, top_k: int, min_shared: int) -> None:
+    """Reconstrói o índice de nomes dentro do processo do pool."""
+    global _worker_index
+    _worker_index = ClienteNameIndex(
+        (_NomeCliente(nome) for nome in nomes_clientes),
+        ngram_size=ngram_size,
+        top_k=top_k,
+        min_shared=min_shared
+    )
+
+
+def _match_fatia(args) -> List[Optional[int]]:
+    """Executa o matching de uma fatia de nomes no processo do pool."""
+    nomes, threshold, mode = args
+    return _worker_index.match_all_posicoes(nomes, threshold, mode)
+
+
+class _NomeCliente:
+    """Cliente mínimo (só o nome) usado para montar o índice nos processos."""
+    __slots__ = ('nome',)
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+
+def match_all_parallel(
+    index: ClienteNameIndex,
+    nomes_normalizados: List[str],
+    threshold: float = 0.85,
+    mode: str = MATCH_MODE_BRUTE,
+    workers: int = 2
+) -> List[Optional[int]]:
+    """
+    Executa `match_all_posicoes` dividindo os nomes entre processos.
+
+    A tabela de nomes dos clientes é enviada uma vez para cada processo (no
+    initializer do pool) e cada processo recebe fatias contíguas da lista;
+    as posições retornadas são concatenadas na ordem original.
+
+    Args:
+        index: Índice construído no processo principal
+        nomes_normalizados: Nomes buscados, já normalizados
+        threshold: Limiar de similaridade (0-1)
+        mode: Modo do fuzzy matching
+        workers: Número de processos
+
+    Returns:
+        Posições no índice (ou None), alinhadas com `nomes_normalizados`
+    """
+    if not nomes_normalizados:
+        return []
+
+    workers = min(workers, len(nomes_normalizados))
+    tamanho = -(-len(nomes_normalizados) // workers)
+    fatias = [
+        (nomes_normalizados[i:i + tamanho], threshold, mode)
+        for i in range(0, len(nomes_normalizados), tamanho)
+    ]
+
+    # Os nomes já normalizados são os próprios nomes dos clientes do pool
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(POOL_START_METHOD),
+        initializer=_init_worker,
+        initargs=(index.nomes, index.ngram_size, index.top_k, index.min_shared)
+    ) as executor:
+        resultado: List[Optional[int]] = []
+        for posicoes in executor.map(_match_fatia, fatias):
+            resultado.extend(posicoes)
+
+    return resultado
+
+
+class CosineCandidateMatcher:
+    """
+    Gera candidatos para muitos nomes de uma vez por cosseno de n-gramas.
+
+    Os nomes dos clientes viram uma matriz esparsa (clientes × n-gramas)
+    normalizada; os nomes buscados são vetorizados do mesmo jeito e a
+    similaridade de cosseno com todos os clientes sai de um único produto
+    de matrizes por bloco, do qual se tiram os top-k por linha.
+
+    Os vetores são binários (presença do n-grama). O peso IDF é opcional e
+    fica desligado: o SequenceMatcher trata todos os caracteres igualmente,
+    e com IDF n-gramas raros (ex.: o primeiro nome) chegam a tirar do top-k
+    o cliente com maior ratio.
+    """
+
+    def __init__(self, nomes_clientes: List[str], ngram_size: int = 3, top_k: int = 50,
+                 block_size: int = 512, use_idf: bool = False):
+        """
+        Vetoriza os nomes dos clientes.
+
+        Args:
+            nomes_clientes: Nomes dos clientes, já normalizados
+            ngram_size: Tamanho dos n-gramas
+            top_k: Candidatos devolvidos por nome buscado
+            block_size: Linhas multiplicadas por vez (limita a memória)
+            use_idf: Se True, pondera os n-gramas por IDF
+        """
+        if sparse is None:
+            raise ImportError("numpy e scipy são necessários para o modo 'cosine'")
+
+        self.ngram_size = ngram_size
+        self.top_k = top_k
+        self.block_size = block_size
+        self.vocab: Dict[str, int] = {}
+
+        grams_por_cliente = [ngrams(nome, ngram_size) for nome in nomes_clientes]
+        for grams in grams_por_cliente:
+            for gram in grams:
+                self.vocab.setdefault(gram, len(self.vocab))
+
+        self.idf = np.ones(len(self.vocab), dtype=np.float64)
+        if use_idf:
+            total = len(nomes_clientes)
+            df = np.zeros(len(self.vocab), dtype=np.float64)
+            for grams in grams_por_cliente:
+                for gram in grams:
+                    df[self.vocab[gram]] += 1
+            self.idf = np.log((1 + total) / (1 + df)) + 1
+
+        # Transposta já pronta para o produto (n-gramas × clientes)
+        self.matriz_t = self._vetorizar(grams_por_cliente).T.tocsr()
+
+    def _vetorizar(self, grams_por_nome: List[Set[str]]):
+        """Monta a matriz de n-gramas (linhas normalizadas) para os nomes dados."""
+        indptr = [0]
+        indices: List[int] = []
+        for grams in grams_por_nome:
+            indices.extend(self.vocab[g] for g in grams if g in self.vocab)
+            indptr.append(len(indices))
+
+        indices_arr = np.asarray(indices, dtype=np.int64)
+        dados = self.idf[indices_arr] if indices else np.zeros(0)
+        matriz = sparse.csr_matrix(
+            (dados, indices_arr, np.asarray(indptr, dtype=np.int64)),
+            shape=(len(grams_por_nome), len(self.vocab))
+        )
+
+        normas = np.sqrt(matriz.multiply(matriz).sum(axis=1)).A1
+        normas[normas == 0] = 1.0
+        return sparse.diags(1.0 / normas) @ matriz
+
+    def candidatos(self, nomes_normalizados: List[str]) -> List[List[int]]:
+        """
+        Retorna, para cada nome, as posições dos `top_k` clientes mais
+        similares (similaridade > 0), em ordem crescente de posição.
+        """
+        consultas = self._vetorizar([ngrams(nome, self.ngram_size) for nome in nomes_normalizados])
+        k = min(self.top_k, self.matriz_t.shape[1])
+        resultado: List[List[int]] = []
+        if k == 0:
+            return [[] for _ in nomes_normalizados]
+
+        for inicio in range(0, consultas.shape[0], self.block_size):
+            scores = (consultas[inicio:inicio + self.block_size] @ self.matriz_t).toarray()
+            if k < scores.shape[1]:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+            for linha, posicoes in enumerate(top):
+                posicoes = posicoes[scores[linha, posicoes] > 0]
+                resultado.append(sorted(posicoes.tolist()))
+
+        return resultado
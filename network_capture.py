@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Extração do relatório pela camada de rede (CDP), sem ler o DOM.
+
+Este módulo gerencia:
+1. Leitura dos eventos Network.* do log de performance do Chrome
+2. Gravação/leitura desses eventos (com os corpos das respostas) em JSON,
+   para reproduzir a extração offline
+3. Localização da resposta com as linhas dos assinantes (HTML renderizado
+   no servidor ou JSON de uma chamada XHR) e conversão em assinantes
+
+O navegador precisa ser iniciado com o log de performance habilitado
+(`ChromeProfile(performance_log=True)`). Se nenhuma resposta reconhecível
+for encontrada, `extract_from_network` retorna None e a extração volta ao DOM.
+
+Uso (reprodução de uma gravação):
+    python network_capture.py gravacao.json
+    python network_capture.py fixtures/rede_datatables.json --expect 25
+"""
+
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+
+from lxml import etree
+import lxml.html
+from selenium import webdriver
+
+from cashbarber_extractor import (
+    PARSER_LXML,
+    Assinante,
+    RelatorioParseado,
+    parse_relatorio,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPORT_PATH = '/relatorio/relatorio19'
+
+# Tipos de recurso que podem trazer os dados do relatório
+RESOURCE_TYPES = ('Document', 'XHR', 'Fetch')
+
+# Nomes de campo aceitos em respostas JSON (em minúsculas)
+JSON_FIELDS = {
+    'nome': ('cliente', 'nome', 'name', 'cliente_nome', 'nome_cliente'),
+    'plano': ('plano', 'plan', 'plano_nome', 'nome_plano'),
+    'status': ('status', 'situacao', 'status_assinatura'),
+    'data_criacao': ('data_criacao', 'data', 'created_at', 'criado_em', 'data_cadastro'),
+}
+JSON_ROW_KEYS = ('data', 'rows', 'items', 'assinantes', 'aaData')
+
+# Total de linhas informado pelo DataTables (na ordem de preferência): com
+# paginação no servidor, a resposta traz só uma página desse total
+JSON_TOTAL_KEYS = ('recordsFiltered', 'iTotalDisplayRecords', 'recordsTotal', 'iTotalRecords')
+
+
+@dataclass
+class NetworkRecording:
+    """Eventos Network.* do navegador e os corpos das respostas relevantes."""
+    events: List[Dict[str, Any]]
+    bodies: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # requestId → corpo
+
+    @classmethod
+    def from_driver(cls, driver: webdriver.Chrome) -> 'NetworkRecording':
+        """
+        Lê o log de performance do driver e busca os corpos das respostas
+        de documentos e XHR/fetch.
+        """
+        events = []
+        for entrada in driver.get_log('performance'):
+            mensagem = json.loads(entrada['message'])['message']
+            if mensagem.get('method', '').startswith('Network.'):
+                events.append(mensagem)
+
+        recording = cls(events)
+        for resposta in recording.responses():
+            request_id = resposta['requestId']
+            try:
+                recording.bodies[request_id] = driver.execute_cdp_cmd(
+                    'Network.getResponseBody', {'requestId': request_id}
+                )
+            except Exception as e:
+                # O corpo pode já ter saído do buffer do navegador
+                logger.debug(f"Corpo indisponível para {resposta['response']['url']}: {e}")
+        return recording
+
+    @classmethod
+    def load(cls, path: str) -> 'NetworkRecording':
+        """Lê uma gravação salva com `save`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return cls(dados['events'], dados.get('bodies', {}))
+
+    def save(self, path: str) -> None:
+        """Salva a gravação em JSON (para reprodução offline)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'events': self.events, 'bodies': self.bodies}, f, ensure_ascii=False)
+
+    def responses(self) -> List[Dict[str, Any]]:
+        """
+        Parâmetros dos Network.responseReceived que podem ter os dados: o
+        documento do relatório e as chamadas XHR/fetch feitas a partir dele.
+        """
+        # Página que originou cada requisição
+        documentos = {
+            evento['params']['requestId']: evento['params'].get('documentURL', '')
+            for evento in self.events
+            if evento.get('method') == 'Network.requestWillBeSent'
+        }
+
+        respostas = []
+        for evento in self.events:
+            if evento.get('method') != 'Network.responseReceived':
+                continue
+            params = evento['params']
+            if params.get('type') not in RESOURCE_TYPES:
+                continue
+
+            origem = documentos.get(params['requestId'], '') or params['response']['url']
+            if REPORT_PATH in origem or REPORT_PATH in params['response']['url']:
+                respostas.append(params)
+        return respostas
+
+    def body(self, request_id: str) -> Optional[str]:
+        """Corpo decodificado da resposta (None se não foi capturado)."""
+        corpo = self.bodies.get(request_id)
+        if corpo is None:
+            return None
+        if corpo.get('base64Encoded'):
+            return base64.b64decode(corpo['body']).decode('utf-8', errors='replace')
+        return corpo['body']
+
+
+def _texto_celula(valor: Any) -> str:
+    """Texto de uma célula JSON (pode vir com HTML, como no DataTables)."""
+    if valor is None:
+        return ''
+    texto = str(valor)
+    if '<' in texto:
+        try:
+            return lxml.html.fragment_fromstring(texto, create_parent='div').text_content()
+        except etree.ParserError:
+            return texto
+    return texto
+
+
+def _linhas_json(dados: Any) -> Optional[List[List[str]]]:
+    """
+    Procura a lista de assinantes numa resposta JSON.
+
+    Aceita uma lista na raiz ou sob uma das chaves de `JSON_ROW_KEYS`, com
+    linhas em lista (Cliente, Plano, Status, Data) ou em objeto (campos de
+    `JSON_FIELDS`).
+    """
+    if isinstance(dados, dict):
+        for chave in JSON_ROW_KEYS:
+            if isinstance(dados.get(chave), list):
+                return _linhas_json(dados[chave])
+        return None
+
+    if not isinstance(dados, list) or not dados:
+        return None
+
+    linhas = []
+    for linha in dados:
+        if isinstance(linha, list) and len(linha) >= 4:
+            linhas.append([_texto_celula(valor) for valor in linha[:4]])
+        elif isinstance(linha, dict):
+            campos = {chave.lower(): valor for chave, valor in linha.items()}
+            celulas = []
+            for nomes in JSON_FIELDS.values():
+                chave = next((nome for nome in nomes if nome in campos), None)
+                if chave is None:
+                    return None
+                celulas.append(_texto_celula(campos[chave]))
+            linhas.append(celulas)
+        else:
+            return None
+    return linhas
+
+
+def _total_json(dados: Any) -> Optional[int]:
+    """Total de linhas informado na resposta JSON (ver `JSON_TOTAL_KEYS`)."""
+    if not isinstance(dados, dict):
+        return None
+    for chave in JSON_TOTAL_KEYS:
+        if dados.get(chave) is not None:
+            try:
+                return int(dados[chave])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def find_report(
+    recording: NetworkRecording, parser: str = PARSER_LXML
+) -> Optional[RelatorioParseado]:
+    """
+    Localiza na gravação a resposta com as linhas do relatório.
+
+    Respostas XHR/fetch em JSON têm prioridade (a tabela costuma ser
+    preenchida por elas); depois vem o documento do relatório, se trouxer a
+    tabela renderizada no servidor. Entre respostas do mesmo tipo vale a
+    mais recente (a tabela pode ter sido recarregada, ex.: após "Filtrar").
+
+    Respostas JSON com menos linhas que o total informado pelo DataTables
+    (`recordsFiltered`/`recordsTotal`) são só uma página e são ignoradas.
+
+    Returns:
+        Relatório interpretado, ou None se nenhuma resposta tiver os dados
+    """
+    respostas = recording.responses()[::-1]
+    respostas.sort(key=lambda r: r.get('type') == 'Document')
+
+    for resposta in respostas:
+        corpo = recording.body(resposta['requestId'])
+        if not corpo:
+            continue
+
+        url = resposta['response']['url']
+        mime = resposta['response'].get('mimeType', '')
+
+        if 'json' in mime:
+            try:
+                dados = json.loads(corpo)
+            except ValueError:
+                continue
+            linhas = _linhas_json(dados)
+            if not linhas:
+                continue
+
+            total = _total_json(dados)
+            if total is not None and len(linhas) < total:
+                logger.info(
+                    f"Resposta JSON de {url} é uma página ({len(linhas)} de {total} linhas); ignorada"
+                )
+                continue
+
+            logger.info(f"✓ Dados do relatório na resposta JSON de {url}")
+            return RelatorioParseado(
+                [(None, celulas) for celulas in linhas],
+                str(total) if total is not None else None
+            )
+
+        elif 'html' in mime:
+            try:
+                relatorio = parse_relatorio(corpo, parser)
+            except ValueError:
+                continue  # documento sem a tabela (preenchida depois via XHR)
+            if relatorio.assinantes():
+                logger.info(f"✓ Dados do relatório no HTML de {url}")
+                return relatorio
+
+    return None
+
+
+def extract_from_network(
+    driver: webdriver.Chrome,
+    recording_path: Optional[str] = None,
+    parser: Optional[str] = None
+) -> Optional[List[Assinante]]:
+    """
+    Extrai os assinantes das respostas capturadas pelo navegador.
+
+    Args:
+        driver: WebDriver iniciado com o log de performance, já no relatório
+        recording_path: Se informado, salva a gravação para reprodução offline
+        parser: Parser usado quando os dados vêm em HTML
+            (padrão: CASHBARBER_HTML_PARSER ou 'lxml')
+
+    Returns:
+        Lista de `Assinante`, ou None se os dados não
+        foram encontrados na rede (use a extração pelo DOM)
+    """
+    recording = NetworkRecording.from_driver(driver)
+    if recording_path:
+        recording.save(recording_path)
+        logger.info(f"Gravação de rede salva em {recording_path}")
+
+    return _extract_recording(recording, parser or os.getenv('CASHBARBER_HTML_PARSER', PARSER_LXML))
+
+
+def _extract_recording(recording: NetworkRecording, parser: str) -> Optional[List[Assinante]]:
+    """Converte o relatório encontrado na gravação em assinantes."""
+    relatorio = find_report(recording, parser)
+    if relatorio is None:
+        logger.info(
+            f"Nenhuma resposta com os dados do relatório entre "
+            f"{len(recording.responses())} capturadas"
+        )
+        return None
+
+    assinantes = relatorio.assinantes()
+    total = relatorio.total
+    if total is not None and total != len(assinantes):
+        logger.warning(
+            f"⚠️  Total da tabela ({total}) diferente das linhas extraídas ({len(assinantes)})"
+        )
+
+    logger.info(f"✓ {len(assinantes)} assinantes extraídos da rede")
+    return assinantes
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Reproduz uma gravação e mostra os assinantes encontrados."""
+    parser = argparse.ArgumentParser(description="Extrai o relatório de uma gravação de rede")
+    parser.add_argument('gravacao', help='Arquivo JSON salvo com NetworkRecording.save')
+    parser.add_argument(
+        '--expect',
+        type=int,
+        metavar='N',
+        help='Número esperado de assinantes; sai com código 1 se divergir'
+    )
+    args = parser.parse_args(argv)
+
+    assinantes = _extract_recording(NetworkRecording.load(args.gravacao), PARSER_LXML)
+    if assinantes is None:
+        print("Nenhum dado do relatório encontrado na gravação")
+        return 1
+
+    print(f"{len(assinantes)} assinantes encontrados")
+    for assinante in assinantes[:5]:
+        print(f"  {assinante}")
+
+    if args.expect is not None and len(assinantes) != args.expect:
+        print(f"Esperados {args.expect} assinantes")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Armazenamento persistente e criptografado da sessão autenticada do Cashbarber.
+
+Este módulo gerencia:
+1. Gravação dos cookies da sessão por email (criptografados com Fernet)
+2. Leitura dos cookies salvos para pular o login nas próximas execuções
+3. Histórico de execuções (JSON Lines) com o tempo gasto no login
+
+A chave de criptografia é derivada (PBKDF2) de SESSION_STORE_KEY ou, se
+ela não estiver definida, da senha do Cashbarber.
+"""
+
+from typing import Dict, List, Optional
+import base64
+import hashlib
+import json
+import logging
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PBKDF2_ITERATIONS = 200_000
+
+
+class SessionStore:
+    """Cookies de sessão salvos em disco, um registro por email."""
+
+    def __init__(self, path: str, secret: str):
+        """
+        Abre (ou cria) o arquivo de sessões.
+
+        Args:
+            path: Caminho do arquivo JSON
+            secret: Segredo usado para derivar a chave de criptografia
+        """
+        if not secret:
+            raise ValueError("Um segredo é necessário para criptografar as sessões")
+
+        self.path = path
+        self.data = self._read()
+
+        salt = self.data.get('salt')
+        if salt is None:
+            salt = base64.b64encode(os.urandom(16)).decode('ascii')
+            self.data['salt'] = salt
+
+        chave = hashlib.pbkdf2_hmac(
+            'sha256', secret.encode('utf-8'), base64.b64decode(salt), PBKDF2_ITERATIONS
+        )
+        self.fernet = Fernet(base64.urlsafe_b64encode(chave))
+
+    def _read(self) -> Dict:
+        """Lê o arquivo (ou retorna um conteúdo vazio)."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'sessions': {}}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Arquivo de sessões inválido ({e}); ignorando")
+            return {'sessions': {}}
+
+    def _write(self) -> None:
+        """Grava o arquivo atomicamente, legível apenas pelo dono."""
+        diretorio = os.path.dirname(self.path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        tmp = f"{self.path}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _key(email: str) -> str:
+        """Chave do registro (o email não fica em claro no arquivo)."""
+        return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+    def load(self, email: str) -> Optional[List[Dict]]:
+        """
+        Retorna os cookies salvos para o email (ou None).
+        """
+        token = self.data.get('sessions', {}).get(self._key(email))
+        if token is None:
+            return None
+
+        try:
+            return json.loads(self.fernet.decrypt(token.encode('ascii')))
+        except (InvalidToken, ValueError):
+            logger.warning("Sessão salva não pôde ser lida (chave diferente?); ignorando")
+            return None
+
+    def save(self, email: str, cookies: List[Dict]) -> None:
+        """
+        Salva (criptografados) os cookies da sessão do email.
+        """
+        token = self.fernet.encrypt(json.dumps(cookies).encode('utf-8')).decode('ascii')
+        self.data.setdefault('sessions', {})[self._key(email)] = token
+        self._write()
+
+    def delete(self, email: str) -> None:
+        """
+        Remove a sessão salva do email (ex.: sessão expirada).
+        """
+        if self.data.get('sessions', {}).pop(self._key(email), None) is not None:
+            self._write()
+
+
+def append_run_history(path: str, registro: Dict) -> None:
+    """
+    Acrescenta um registro de execução ao histórico (um JSON por linha).
+
+    Args:
+        path: Caminho do arquivo de histórico
+        registro: Dados da execução
+    """
+    diretorio = os.path.dirname(path)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    with open(path, 'a') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
@@ -0,0 +1,64 @@
+-- Atualização em lote usada pelo modo de escrita 'upsert' (--write-mode upsert).
+--
+-- Aplica plano, status e timestamp a vários clientes em um único
+-- UPDATE ... FROM jsonb_to_recordset(...): só linhas existentes são
+-- alteradas (nada é inserido) e as demais colunas não são tocadas.
+-- Retorna os ids efetivamente atualizados.
+--
+-- Tabela e colunas são parâmetros (os mesmos de SUPABASE_TABLE_NAME e
+-- COLUMN_*); os valores são convertidos para o tipo de cada coluna.
+--
+-- Instalação: execute este arquivo no SQL Editor do Supabase. A função
+-- recebe nomes de tabela e colunas, então só a service_role (a chave usada
+-- pelo sincronizador) pode executá-la; anon e authenticated não.
+
+create or replace function public.atualizar_clientes_em_lote(
+    tabela text,
+    coluna_plano text,
+    coluna_status text,
+    coluna_timestamp text,
+    atualizacoes jsonb
+)
+returns setof text
+language plpgsql
+as $$
+declare
+    tabela_oid regclass := tabela::regclass;
+    tipo_id text;
+    tipo_plano text;
+    tipo_status text;
+    tipo_timestamp text;
+begin
+    select format_type(atttypid, atttypmod) into tipo_id
+      from pg_attribute where attrelid = tabela_oid and attname = 'id';
+    select format_type(atttypid, atttypmod) into tipo_plano
+      from pg_attribute where attrelid = tabela_oid and attname = coluna_plano;
+    select format_type(atttypid, atttypmod) into tipo_status
+      from pg_attribute where attrelid = tabela_oid and attname = coluna_status;
+    select format_type(atttypid, atttypmod) into tipo_timestamp
+      from pg_attribute where attrelid = tabela_oid and attname = coluna_timestamp;
+
+    if tipo_id is null or tipo_plano is null or tipo_status is null or tipo_timestamp is null then
+        raise exception 'Coluna inexistente em %', tabela_oid;
+    end if;
+
+    return query execute format(
+        'update %s as c
+            set %I = u.plano::%s, %I = u.status::%s, %I = u.ts::%s
+           from jsonb_to_recordset($1) as u(id text, plano text, status text, ts text)
+          where c.id = u.id::%s
+      returning c.id::text',
+        tabela_oid,
+        coluna_plano, tipo_plano,
+        coluna_status, tipo_status,
+        coluna_timestamp, tipo_timestamp,
+        tipo_id
+    ) using atualizacoes;
+end;
+$$;
+
+-- Funções novas podem ser executadas por PUBLIC por padrão
+revoke execute on function public.atualizar_clientes_em_lote(text, text, text, text, jsonb)
+    from public, anon, authenticated;
+grant execute on function public.atualizar_clientes_em_lote(text, text, text, text, jsonb)
+    to service_role;
@@ -9,11 +9,19 @@ Este módulo gerencia:
 """
 
 import os
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Tuple, Union
 from dataclasses import dataclass
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from supabase import create_client, Client
-from difflib import SequenceMatcher
+from postgrest.types import CountMethod, ReturnMethod
+from datetime import datetime, timedelta, timezone
+
+from name_matcher import ClienteNameIndex, normalize_nome, MATCH_MODE_BRUTE
+from match_cache import MatchCache
+from write_dispatcher import UpdateDispatcher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +29,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Modos de escrita das atualizações
+WRITE_MODE_ROW = 'row'        # Um PATCH por cliente (comportamento original)
+WRITE_MODE_UPSERT = 'upsert'  # UPDATE ... FROM em lote via RPC (supabase_bulk_update.sql)
+WRITE_MODE_GROUPED = 'grouped'  # UPDATE ... WHERE id IN (...) por (plano, status)
+WRITE_MODES = (WRITE_MODE_ROW, WRITE_MODE_UPSERT, WRITE_MODE_GROUPED)
+
+# Limite de caracteres dos ids em um filtro id=in.(...) (mantém a URL curta)
+MAX_IN_FILTER_CHARS = 6000
+
+# Nomes não encontrados guardados nas estatísticas (a contagem não tem limite)
+MAX_NAO_ENCONTRADOS_LISTA = 1000
+
+# Argumentos de SupabaseIntegration configuráveis por conta/arquivo de configuração
+SUPABASE_OPTIONS = (
+    'url', 'key', 'table_name', 'column_nome', 'column_plano', 'column_status',
+    'column_timestamp', 'page_size', 'fetch_workers', 'bulk_update_function'
+)
+
 
 @dataclass
 class ClienteSupabase:
@@ -30,6 +56,7 @@ class ClienteSupabase:
     telefone: Optional[str]
     plano_atual: Optional[str]
     status_assinatura: Optional[str]
+    ultima_sincronizacao: Optional[str] = None
 
 
 class SupabaseIntegration:
@@ -42,7 +69,11 @@ class SupabaseIntegration:
         table_name: str = None,
         column_nome: str = None,
         column_plano: str = None,
-        column_status: str = None
+        column_status: str = None,
+        column_timestamp: str = None,
+        page_size: int = None,
+        fetch_workers: int = None,
+        bulk_update_function: str = None
     ):
         """
         Inicializa conexão com Supabase.
@@ -54,6 +85,11 @@ class SupabaseIntegration:
             column_nome: Nome da coluna com nome do cliente (padrão: 'nome')
             column_plano: Nome da coluna para plano (padrão: 'plano_atual')
             column_status: Nome da coluna para status (padrão: 'status_assinatura')
+            column_timestamp: Coluna da última sincronização (padrão: 'ultima_sincronizacao')
+            page_size: Linhas por página na leitura de clientes (padrão: 1000)
+            fetch_workers: Páginas de clientes buscadas em paralelo (padrão: 4)
+            bulk_update_function: Função SQL do modo de escrita 'upsert'
+                (padrão: 'atualizar_clientes_em_lote', ver supabase_bulk_update.sql)
         """
         self.url = url or os.getenv('SUPABASE_URL')
         self.key = key or os.getenv('SUPABASE_SERVICE_KEY')
@@ -63,6 +99,22 @@ class SupabaseIntegration:
         self.column_nome = column_nome or os.getenv('COLUMN_NOME', 'nome')
         self.column_plano = column_plano or os.getenv('COLUMN_PLANO', 'plano_atual')
         self.column_status = column_status or os.getenv('COLUMN_STATUS', 'status_assinatura')
+        self.column_timestamp = column_timestamp or os.getenv('COLUMN_TIMESTAMP', 'ultima_sincronizacao')
+        
+        # Apenas as colunas usadas na sincronização são lidas
+        self.cliente_columns = list(dict.fromkeys([
+            'id', self.column_nome, 'telefone', self.column_plano, self.column_status,
+            self.column_timestamp
+        ]))
+        
+        # Paginação da leitura de clientes
+        self.page_size = page_size or int(os.getenv('SUPABASE_PAGE_SIZE', '1000'))
+        self.fetch_workers = fetch_workers or int(os.getenv('SUPABASE_FETCH_WORKERS', '4'))
+        
+        # Função SQL das atualizações em lote (modo 'upsert')
+        self.bulk_update_function = bulk_update_function or os.getenv(
+            'SUPABASE_BULK_UPDATE_FUNCTION', 'atualizar_clientes_em_lote'
+        )
         
         if not self.url or not self.key:
             raise ValueError(
@@ -79,32 +131,104 @@ class SupabaseIntegration:
         Returns:
             Lista de clientes
         """
+        clientes = list(self.iter_clientes())
+        logger.info(f"✓ {len(clientes)} clientes carregados da tabela '{self.table_name}'")
+        return clientes
+    
+    def iter_clientes(
+        self,
+        page_size: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> Iterator[ClienteSupabase]:
+        """
+        Busca os clientes do banco em páginas, sob demanda.
+        
+        Seleciona apenas as colunas usadas na sincronização e pagina com
+        `.range()` (ordenado por id), evitando o limite de linhas por
+        requisição do PostgREST. A primeira página traz o total de linhas
+        (header de contagem); com ele, as demais páginas são buscadas em
+        paralelo, mantendo no máximo `workers` páginas em memória.
+        
+        Args:
+            page_size: Linhas por página (padrão: self.page_size)
+            workers: Páginas buscadas em paralelo (padrão: self.fetch_workers)
+        
+        Yields:
+            Clientes, na ordem de id
+        """
+        page_size = page_size or self.page_size
+        workers = workers or self.fetch_workers
+        
         try:
-            response = self.client.table(self.table_name).select('*').execute()
+            response = self._fetch_page(0, page_size, count=True)
+            rows = response.data
+            total = response.count
+            
+            yield from (self._row_to_cliente(row) for row in rows)
             
-            clientes = [
-                ClienteSupabase(
-                    id=row['id'],
-                    nome=row.get(self.column_nome, ''),
-                    telefone=row.get('telefone'),
-                    plano_atual=row.get(self.column_plano),
-                    status_assinatura=row.get(self.column_status)
+            # O PostgREST pode devolver menos linhas que o pedido (max-rows)
+            if total is not None and len(rows) < min(page_size, total):
+                logger.warning(
+                    f"Servidor limitou a página a {len(rows)} linhas "
+                    f"(pedido: {page_size}); ajustando tamanho da página"
                 )
-                for row in response.data
-            ]
+                page_size = len(rows)
+            
+            if not rows or len(rows) < page_size:
+                return
+            
+            if total is None:
+                # Sem contagem: pagina sequencialmente até a última página
+                offset = len(rows)
+                while True:
+                    rows = self._fetch_page(offset, page_size).data
+                    yield from (self._row_to_cliente(row) for row in rows)
+                    if len(rows) < page_size:
+                        return
+                    offset += len(rows)
             
-            logger.info(f"✓ {len(clientes)} clientes carregados da tabela '{self.table_name}'")
-            return clientes
+            offsets = range(page_size, total, page_size)
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                pendentes = deque()
+                for offset in offsets:
+                    pendentes.append(executor.submit(self._fetch_page, offset, page_size))
+                    if len(pendentes) >= workers:
+                        rows = pendentes.popleft().result().data
+                        yield from (self._row_to_cliente(row) for row in rows)
+                while pendentes:
+                    rows = pendentes.popleft().result().data
+                    yield from (self._row_to_cliente(row) for row in rows)
             
         except Exception as e:
             logger.error(f"Erro ao buscar clientes: {e}")
             raise
     
+    def _fetch_page(self, offset: int, page_size: int, count: bool = False):
+        """Busca uma página de clientes (apenas as colunas usadas)."""
+        query = self.client.table(self.table_name).select(
+            *self.cliente_columns,
+            count=CountMethod.exact if count else None
+        )
+        return query.order('id').range(offset, offset + page_size - 1).execute()
+    
+    def _row_to_cliente(self, row: Dict) -> ClienteSupabase:
+        """Converte uma linha da tabela em ClienteSupabase."""
+        return ClienteSupabase(
+            id=row['id'],
+            nome=row.get(self.column_nome, ''),
+            telefone=row.get('telefone'),
+            plano_atual=row.get(self.column_plano),
+            status_assinatura=row.get(self.column_status),
+            ultima_sincronizacao=row.get(self.column_timestamp)
+        )
+    
     def find_cliente_by_name(
         self, 
         nome_busca: str, 
         clientes: List[ClienteSupabase],
-        threshold: float = 0.85
+        threshold: float = 0.85,
+        name_index: Optional[ClienteNameIndex] = None,
+        match_mode: str = MATCH_MODE_BRUTE
     ) -> Optional[ClienteSupabase]:
         """
         Busca cliente por nome usando fuzzy matching.
@@ -113,40 +237,67 @@ class SupabaseIntegration:
             nome_busca: Nome para buscar
             clientes: Lista de clientes disponíveis
             threshold: Limiar de similaridade (0-1)
+            name_index: Índice pré-construído sobre `clientes` (evita
+                renormalizar os nomes e responde matches exatos em O(1))
+            match_mode: 'brute' pontua todos os clientes; 'ngram' pontua
+                os candidatos do índice de trigramas (todos os clientes se
+                houver mais candidatos que o top_k); 'cosine' gera
+                os candidatos pelo cosseno entre vetores de trigramas
         
         Returns:
             Cliente encontrado ou None
         """
-        nome_busca_lower = nome_busca.lower().strip()
+        if name_index is None:
+            name_index = ClienteNameIndex(clientes)
         
-        best_match = None
-        best_ratio = 0.0
+        return name_index.melhor_match(
+            normalize_nome(nome_busca), threshold=threshold, mode=match_mode
+        )
+    
+    def find_clientes_by_names(
+        self,
+        nomes_busca: List[str],
+        clientes: List[ClienteSupabase],
+        threshold: float = 0.85,
+        name_index: Optional[ClienteNameIndex] = None,
+        match_mode: str = MATCH_MODE_BRUTE,
+        workers: int = 1
+    ) -> List[Optional[ClienteSupabase]]:
+        """
+        Versão em lote de `find_cliente_by_name`.
         
-        for cliente in clientes:
-            nome_cliente_lower = cliente.nome.lower().strip()
-            
-            # Match exato
-            if nome_busca_lower == nome_cliente_lower:
-                return cliente
-            
-            # Fuzzy matching
-            ratio = SequenceMatcher(None, nome_busca_lower, nome_cliente_lower).ratio()
-            
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_match = cliente
+        Retorna o mesmo cliente (ou None) que `find_cliente_by_name` para
+        cada nome, mas no modo 'cosine' gera os candidatos de todos os nomes
+        em uma única passada vetorizada.
+        
+        Args:
+            nomes_busca: Nomes para buscar
+            clientes: Lista de clientes disponíveis
+            threshold: Limiar de similaridade (0-1)
+            name_index: Índice pré-construído sobre `clientes`
+            match_mode: Modo do fuzzy matching ('brute', 'ngram' ou 'cosine')
+            workers: Processos usados no matching (1 = sem paralelismo)
         
-        if best_ratio >= threshold:
-            return best_match
+        Returns:
+            Lista alinhada com `nomes_busca` (cliente ou None)
+        """
+        if name_index is None:
+            name_index = ClienteNameIndex(clientes)
         
-        return None
+        return name_index.match_all(
+            [normalize_nome(nome) for nome in nomes_busca],
+            threshold=threshold,
+            mode=match_mode,
+            workers=workers
+        )
     
     def update_cliente(
         self, 
         cliente_id: str, 
         plano: str, 
         status: str,
-        update_timestamp: bool = True
+        update_timestamp: bool = True,
+        timestamp: Optional[str] = None
     ) -> bool:
         """
         Atualiza plano e status de um cliente.
@@ -156,6 +307,7 @@ class SupabaseIntegration:
             plano: Tipo de plano
             status: Status da assinatura
             update_timestamp: Se True, tenta atualizar campo de timestamp (se existir)
+            timestamp: Valor do timestamp (padrão: 'now()')
         
         Returns:
             True se sucesso, False caso contrário
@@ -168,8 +320,7 @@ class SupabaseIntegration:
             
             # Tenta adicionar timestamp se a coluna existir
             if update_timestamp:
-                timestamp_column = os.getenv('COLUMN_TIMESTAMP', 'ultima_sincronizacao')
-                update_data[timestamp_column] = 'now()'
+                update_data[self.column_timestamp] = timestamp or 'now()'
             
             response = self.client.table(self.table_name)\
                 .update(update_data)\
@@ -184,15 +335,48 @@ class SupabaseIntegration:
     
     def sync_assinantes(
         self, 
-        assinantes_cashbarber: List[Dict],
-        dry_run: bool = False
+        assinantes_cashbarber: Iterable[Union[Dict, Any]],
+        dry_run: bool = False,
+        match_mode: str = MATCH_MODE_BRUTE,
+        match_workers: int = 1,
+        match_cache_path: Optional[str] = None,
+        write_mode: str = WRITE_MODE_ROW,
+        write_batch_size: int = 500,
+        skip_unchanged: bool = False,
+        touch_days: Optional[int] = None,
+        write_workers: int = 1,
+        write_rate_limit: Optional[float] = None,
+        chunk_size: int = 5000
     ) -> Dict:
         """
         Sincroniza dados de assinantes do Cashbarber com Supabase.
         
+        Os assinantes são consumidos em blocos de `chunk_size` (matching e
+        escritas por bloco), então um iterável sob demanda (ver
+        `cashbarber_extractor.RelatorioStream`) mantém a memória limitada
+        qualquer que seja o tamanho do relatório.
+        
         Args:
-            assinantes_cashbarber: Lista de assinantes extraídos
+            assinantes_cashbarber: Assinantes extraídos (lista ou iterável):
+                dicionários ou registros com `nome`, `plano` e `status`
+                (ex.: `cashbarber_extractor.AssinantesColunar`)
             dry_run: Se True, apenas simula sem atualizar
+            match_mode: Modo do fuzzy matching ('brute', 'ngram' ou 'cosine')
+            match_workers: Processos usados no matching (1 = sem paralelismo)
+            match_cache_path: Arquivo SQLite do cache de matches (None = sem cache)
+            write_mode: 'row' (um PATCH por cliente), 'upsert' (UPDATE em
+                lote via função SQL, ver supabase_bulk_update.sql) ou
+                'grouped' (um UPDATE por grupo de plano/status)
+            write_batch_size: Linhas por requisição nos modos em lote
+            skip_unchanged: Se True, não regrava clientes cujo plano e status
+                já estão iguais no Supabase
+            touch_days: Com skip_unchanged, regrava mesmo assim os clientes
+                cujo timestamp tem mais de N dias (None = nunca)
+            write_workers: Máximo de escritas individuais simultâneas
+            write_rate_limit: Máximo de escritas individuais por segundo
+                (None = sem limite)
+            chunk_size: Assinantes processados por bloco; as escritas
+                enfileiradas são enviadas quando passam desse tamanho
         
         Returns:
             Estatísticas da sincronização
@@ -201,51 +385,429 @@ class SupabaseIntegration:
         logger.info(f"INICIANDO SINCRONIZAÇÃO {'(DRY RUN)' if dry_run else ''}")
         logger.info(f"{'='*60}\n")
         
-        clientes_supabase = self.get_all_clientes()
+        # O índice consome os clientes página a página
+        name_index = ClienteNameIndex(self.iter_clientes())
+        clientes_supabase = name_index.clientes
+        logger.info(f"✓ {len(clientes_supabase)} clientes carregados da tabela '{self.table_name}'")
+        logger.info(
+            f"✓ Índice de nomes construído: {len(name_index.exatos)} nomes distintos "
+            f"(fuzzy matching: {match_mode})"
+        )
         
         stats = {
-            'total_cashbarber': len(assinantes_cashbarber),
+            'total_cashbarber': 0,
             'total_supabase': len(clientes_supabase),
             'encontrados': 0,
             'atualizados': 0,
+            'alterados': 0,
+            'inalterados': 0,
             'nao_encontrados': 0,
             'erros': 0,
             'nao_encontrados_lista': []
         }
         
-        for assinante in assinantes_cashbarber:
-            nome = assinante['nome']
-            plano = assinante['plano']
-            status = assinante['status']
-            
-            # Busca cliente no Supabase
-            cliente = self.find_cliente_by_name(nome, clientes_supabase)
-            
-            if cliente:
-                stats['encontrados'] += 1
+        # Atualizações em lote: (id, plano, status, timestamp)
+        pendentes: List[Tuple[str, str, str, str]] = []
+        agora = datetime.now(timezone.utc)
+        timestamp = agora.isoformat()
+        
+        # Escritas individuais concorrentes (modo 'row' e fallbacks dos lotes)
+        dispatcher = None
+        if write_workers > 1 or write_rate_limit:
+            dispatcher = UpdateDispatcher(write_workers, write_rate_limit)
+        
+        # Cache de matches aberto (e clientes registrados) uma vez por sincronização
+        cache = None
+        if match_cache_path:
+            cache = MatchCache(match_cache_path, match_mode=match_mode)
+            cache.sincronizar_clientes(name_index)
+        
+        try:
+            for lote in _chunked(assinantes_cashbarber, chunk_size):
+                stats['total_cashbarber'] += len(lote)
                 
-                logger.info(f"✓ Match encontrado: '{nome}' → '{cliente.nome}'")
-                logger.info(f"  Plano: {plano}")
-                logger.info(f"  Status: {status}")
+                # Busca clientes no Supabase
+                lote = [_campos_assinante(assinante) for assinante in lote]
+                nomes = [nome for nome, _, _ in lote]
+                if cache is not None:
+                    matches = self._match_with_cache(
+                        nomes, clientes_supabase, name_index,
+                        match_mode, match_workers, cache, stats
+                    )
+                else:
+                    matches = self.find_clientes_by_names(
+                        nomes,
+                        clientes_supabase,
+                        name_index=name_index,
+                        match_mode=match_mode,
+                        workers=match_workers
+                    )
                 
-                if not dry_run:
-                    if self.update_cliente(cliente.id, plano, status):
-                        stats['atualizados'] += 1
-                        logger.info(f"  ✓ Atualizado com sucesso")
+                for assinante, cliente in zip(lote, matches):
+                    nome, plano, status = assinante
+                    
+                    if cliente:
+                        stats['encontrados'] += 1
+                        
+                        logger.info(f"✓ Match encontrado: '{nome}' → '{cliente.nome}'")
+                        logger.info(f"  Plano: {plano}")
+                        logger.info(f"  Status: {status}")
+                        
+                        if plano != cliente.plano_atual or status != cliente.status_assinatura:
+                            stats['alterados'] += 1
+                        else:
+                            stats['inalterados'] += 1
+                            if skip_unchanged and not self._touch_due(cliente, touch_days, agora):
+                                logger.info(f"  = Sem alterações, escrita ignorada")
+                                continue
+                        
+                        if not dry_run and (write_mode != WRITE_MODE_ROW or dispatcher):
+                            pendentes.append((cliente.id, plano, status, timestamp))
+                            logger.info(f"  → Atualização enfileirada")
+                        elif not dry_run:
+                            if self.update_cliente(cliente.id, plano, status):
+                                stats['atualizados'] += 1
+                                logger.info(f"  ✓ Atualizado com sucesso")
+                            else:
+                                stats['erros'] += 1
+                                logger.error(f"  ✗ Erro ao atualizar")
+                        else:
+                            logger.info(f"  → [DRY RUN] Seria atualizado")
+                            stats['atualizados'] += 1
                     else:
-                        stats['erros'] += 1
-                        logger.error(f"  ✗ Erro ao atualizar")
-                else:
-                    logger.info(f"  → [DRY RUN] Seria atualizado")
-                    stats['atualizados'] += 1
-            else:
-                stats['nao_encontrados'] += 1
-                stats['nao_encontrados_lista'].append(nome)
-                logger.warning(f"✗ Cliente não encontrado: '{nome}'")
+                        stats['nao_encontrados'] += 1
+                        if len(stats['nao_encontrados_lista']) < MAX_NAO_ENCONTRADOS_LISTA:
+                            stats['nao_encontrados_lista'].append(nome)
+                        logger.warning(f"✗ Cliente não encontrado: '{nome}'")
+                
+                if len(pendentes) >= chunk_size:
+                    self._flush_pendentes(pendentes, write_mode, write_batch_size, dispatcher, stats)
+                    pendentes = []
+        finally:
+            if cache is not None:
+                cache.close()
+        
+        if pendentes:
+            self._flush_pendentes(pendentes, write_mode, write_batch_size, dispatcher, stats)
         
         self._log_final_stats(stats, dry_run)
         return stats
     
+    def _flush_pendentes(
+        self,
+        pendentes: List[Tuple[str, str, str, str]],
+        write_mode: str,
+        write_batch_size: int,
+        dispatcher: Optional[UpdateDispatcher],
+        stats: Dict
+    ) -> None:
+        """Envia as atualizações enfileiradas e soma o resultado às estatísticas."""
+        if write_mode == WRITE_MODE_GROUPED:
+            atualizados, erros = self.grouped_update_clientes(
+                pendentes, write_batch_size, dispatcher=dispatcher
+            )
+        elif write_mode == WRITE_MODE_UPSERT:
+            atualizados, erros = self.bulk_update_clientes(
+                pendentes, write_batch_size, dispatcher=dispatcher
+            )
+        else:
+            logger.info(
+                f"Enviando {len(pendentes)} atualizações "
+                f"({dispatcher.max_in_flight} em paralelo)..."
+            )
+            resultados = self.update_clientes(pendentes, dispatcher)
+            atualizados = sum(resultados)
+            erros = len(resultados) - atualizados
+            logger.info(f"  ✓ {atualizados} atualizados, {erros} erros")
+        
+        stats['atualizados'] += atualizados
+        stats['erros'] += erros
+    
+    def _touch_due(
+        self,
+        cliente: ClienteSupabase,
+        touch_days: Optional[int],
+        agora: datetime
+    ) -> bool:
+        """
+        Indica se um cliente sem alterações deve ter o timestamp regravado.
+        
+        Returns:
+            True se `touch_days` está definido e o timestamp do cliente está
+            ausente, inválido ou com mais de `touch_days` dias
+        """
+        if touch_days is None:
+            return False
+        
+        try:
+            ultima = datetime.fromisoformat(cliente.ultima_sincronizacao)
+        except (TypeError, ValueError):
+            return True
+        
+        if ultima.tzinfo is None:
+            ultima = ultima.replace(tzinfo=timezone.utc)
+        
+        return agora - ultima >= timedelta(days=touch_days)
+    
+    def update_clientes(
+        self,
+        updates: List[Tuple[str, str, str, str]],
+        dispatcher: Optional[UpdateDispatcher] = None
+    ) -> List[bool]:
+        """
+        Atualiza clientes um a um com `update_cliente`, em paralelo se houver
+        um dispatcher.
+        
+        Com dispatcher, escritas do mesmo cliente poderiam concorrer e
+        terminar em qualquer ordem; por isso só a última atualização de cada
+        id é enviada, e as entradas anteriores recebem o resultado dela.
+        
+        Args:
+            updates: Tuplas (id, plano, status, timestamp)
+            dispatcher: Dispatcher concorrente (None = sequencial)
+        
+        Returns:
+            Resultado de cada atualização, na ordem de `updates`
+        """
+        def atualizar(update: Tuple[str, str, str, str]) -> bool:
+            cliente_id, plano, status, timestamp = update
+            return self.update_cliente(cliente_id, plano, status, timestamp=timestamp)
+        
+        if dispatcher is None:
+            return [atualizar(update) for update in updates]
+        
+        # Última atualização de cada cliente
+        finais: Dict[str, Tuple[str, str, str, str]] = {}
+        for update in updates:
+            finais[update[0]] = update
+        
+        resultados = dict(zip(finais, dispatcher.map(atualizar, list(finais.values()))))
+        return [resultados[update[0]] for update in updates]
+    
+    def bulk_update_clientes(
+        self,
+        updates: List[Tuple[str, str, str, str]],
+        batch_size: int = 500,
+        dispatcher: Optional[UpdateDispatcher] = None
+    ) -> Tuple[int, int]:
+        """
+        Atualiza plano, status e timestamp de vários clientes em lote.
+        
+        Cada bloco de `batch_size` clientes vira uma chamada à função SQL
+        `bulk_update_function` (ver supabase_bulk_update.sql), que faz um
+        UPDATE ... FROM com os valores do bloco: só clientes existentes são
+        alterados e as demais colunas ficam intactas. Ids que não existem
+        mais na tabela contam como erro.
+        
+        Quando o mesmo cliente aparece mais de uma vez, vale a última
+        atualização (como no modo 'row'). Se a chamada de um bloco falhar
+        (por exemplo, função não instalada), o erro é registrado e o bloco é
+        regravado com `grouped_update_clientes`.
+        
+        Args:
+            updates: Tuplas (id, plano, status, timestamp)
+            batch_size: Clientes por requisição
+            dispatcher: Dispatcher para as regravações individuais
+        
+        Returns:
+            Tupla (atualizados, erros)
+        """
+        # Última atualização de cada cliente e quantas entradas ela representa
+        finais: Dict[str, Tuple[str, str, str, str]] = {}
+        entradas: Dict[str, int] = {}
+        for update in updates:
+            finais[update[0]] = update
+            entradas[update[0]] = entradas.get(update[0], 0) + 1
+        
+        blocos = list(_chunked(finais.values(), batch_size))
+        logger.info(f"Enviando {len(updates)} atualizações em {len(blocos)} lotes...")
+        
+        atualizados = 0
+        erros = 0
+        
+        for numero, bloco in enumerate(blocos, 1):
+            rows = [
+                {'id': str(cliente_id), 'plano': plano, 'status': status, 'ts': timestamp}
+                for cliente_id, plano, status, timestamp in bloco
+            ]
+            
+            try:
+                response = self.client.rpc(self.bulk_update_function, {
+                    'tabela': self.table_name,
+                    'coluna_plano': self.column_plano,
+                    'coluna_status': self.column_status,
+                    'coluna_timestamp': self.column_timestamp,
+                    'atualizacoes': rows
+                }).execute()
+                
+            except Exception as e:
+                logger.error(
+                    f"  ✗ Lote {numero}/{len(blocos)} falhou na função "
+                    f"'{self.bulk_update_function}' ({e}); verifique se "
+                    f"supabase_bulk_update.sql foi instalado. Regravando "
+                    f"{len(bloco)} clientes com UPDATE agrupado"
+                )
+                ids_bloco = {cliente_id for cliente_id, *_ in bloco}
+                grupo_ok, grupo_erros = self.grouped_update_clientes(
+                    [update for update in updates if update[0] in ids_bloco],
+                    batch_size,
+                    dispatcher=dispatcher
+                )
+                atualizados += grupo_ok
+                erros += grupo_erros
+                continue
+            
+            existentes = {str(cliente_id) for cliente_id in response.data or []}
+            ausentes = [cliente_id for cliente_id, *_ in bloco if str(cliente_id) not in existentes]
+            
+            atualizados += sum(entradas[cliente_id] for cliente_id, *_ in bloco) - \
+                sum(entradas[cliente_id] for cliente_id in ausentes)
+            erros += sum(entradas[cliente_id] for cliente_id in ausentes)
+            
+            logger.info(
+                f"  ✓ Lote {numero}/{len(blocos)}: "
+                f"{len(bloco) - len(ausentes)} clientes atualizados"
+            )
+            if ausentes:
+                logger.warning(
+                    f"  ✗ {len(ausentes)} clientes não existem mais na tabela: "
+                    f"{', '.join(str(cliente_id) for cliente_id in ausentes[:10])}"
+                )
+        
+        return atualizados, erros
+    
+    def grouped_update_clientes(
+        self,
+        updates: List[Tuple[str, str, str, str]],
+        batch_size: int = 500,
+        max_in_chars: int = MAX_IN_FILTER_CHARS,
+        dispatcher: Optional[UpdateDispatcher] = None
+    ) -> Tuple[int, int]:
+        """
+        Atualiza vários clientes agrupando-os pelo valor gravado.
+        
+        As atualizações são agrupadas por (plano, status, timestamp) e cada
+        grupo vira um `update(...).in_('id', [...])`, dividido em blocos de
+        até `batch_size` ids e `max_in_chars` caracteres (limite de URL).
+        Se um bloco falhar, seus clientes são regravados um a um com
+        `update_cliente`.
+        
+        Quando o mesmo cliente aparece mais de uma vez, vale a última
+        atualização (como no modo 'row'); as entradas anteriores são
+        contadas com o resultado dessa última escrita.
+        
+        Args:
+            updates: Tuplas (id, plano, status, timestamp)
+            batch_size: Máximo de ids por requisição
+            max_in_chars: Máximo de caracteres dos ids por requisição
+            dispatcher: Dispatcher para as regravações individuais
+        
+        Returns:
+            Tupla (atualizados, erros)
+        """
+        # Última atualização de cada cliente e quantas entradas ela representa
+        finais: Dict[str, Tuple[str, str, str, str]] = {}
+        entradas: Dict[str, int] = {}
+        for update in updates:
+            finais[update[0]] = update
+            entradas[update[0]] = entradas.get(update[0], 0) + 1
+        
+        grupos: Dict[Tuple[str, str, str], List[str]] = {}
+        for cliente_id, plano, status, timestamp in finais.values():
+            grupos.setdefault((plano, status, timestamp), []).append(cliente_id)
+        
+        blocos = [
+            (valores, bloco)
+            for valores, ids in grupos.items()
+            for bloco in _chunk_ids(ids, batch_size, max_in_chars)
+        ]
+        logger.info(
+            f"Enviando {len(updates)} atualizações em {len(blocos)} requisições "
+            f"({len(grupos)} combinações de plano/status)..."
+        )
+        
+        atualizados = 0
+        erros = 0
+        
+        for numero, ((plano, status, timestamp), ids) in enumerate(blocos, 1):
+            peso = sum(entradas[cliente_id] for cliente_id in ids)
+            
+            try:
+                self.client.table(self.table_name)\
+                    .update({
+                        self.column_plano: plano,
+                        self.column_status: status,
+                        self.column_timestamp: timestamp
+                    }, returning=ReturnMethod.minimal)\
+                    .in_('id', ids)\
+                    .execute()
+                
+                atualizados += peso
+                logger.info(
+                    f"  ✓ Grupo {numero}/{len(blocos)} ({plano} / {status}): "
+                    f"{len(ids)} clientes atualizados"
+                )
+                
+            except Exception as e:
+                logger.warning(
+                    f"  ✗ Grupo {numero}/{len(blocos)} falhou ({e}); "
+                    f"atualizando {len(ids)} clientes um a um"
+                )
+                resultados = self.update_clientes(
+                    [(cliente_id, plano, status, timestamp) for cliente_id in ids],
+                    dispatcher
+                )
+                for cliente_id, sucesso in zip(ids, resultados):
+                    if sucesso:
+                        atualizados += entradas[cliente_id]
+                    else:
+                        erros += entradas[cliente_id]
+        
+        return atualizados, erros
+    
+    def _match_with_cache(
+        self,
+        nomes: List[str],
+        clientes: List[ClienteSupabase],
+        name_index: ClienteNameIndex,
+        match_mode: str,
+        match_workers: int,
+        cache: MatchCache,
+        stats: Dict
+    ) -> List[Optional[ClienteSupabase]]:
+        """
+        Resolve os matches consultando antes o cache persistente.
+        
+        Matches exatos continuam saindo direto do índice; os demais nomes
+        são procurados no cache e só os ausentes passam pelo fuzzy matching
+        (e são gravados no cache em seguida). Acrescenta `cache_hits` e
+        `cache_misses` às estatísticas.
+        """
+        normalizados = [normalize_nome(nome) for nome in nomes]
+        fuzzy = {nome for nome in normalizados if name_index.get_exato(nome) is None}
+        
+        resolvidos = cache.lookup(fuzzy, name_index)
+        pendentes = sorted(fuzzy - resolvidos.keys())
+        
+        stats['cache_hits'] = stats.get('cache_hits', 0) + len(resolvidos)
+        stats['cache_misses'] = stats.get('cache_misses', 0) + len(pendentes)
+        
+        novos = self.find_clientes_by_names(
+            pendentes,
+            clientes,
+            name_index=name_index,
+            match_mode=match_mode,
+            workers=match_workers
+        )
+        novos = dict(zip(pendentes, novos))
+        cache.store(novos, name_index)
+        resolvidos.update(novos)
+        
+        return [
+            name_index.get_exato(nome) if nome not in fuzzy else resolvidos[nome]
+            for nome in normalizados
+        ]
+    
     def _log_final_stats(self, stats: Dict, dry_run: bool) -> None:
         """Imprime estatísticas finais da sincronização."""
         logger.info(f"\n{'='*60}")
@@ -255,30 +817,91 @@ class SupabaseIntegration:
         logger.info(f"Total no Supabase:   {stats['total_supabase']}")
         logger.info(f"Encontrados:         {stats['encontrados']}")
         logger.info(f"Atualizados:         {stats['atualizados']}")
+        logger.info(f"  Com alterações:    {stats['alterados']}")
+        logger.info(f"  Sem alterações:    {stats['inalterados']}")
         logger.info(f"Não encontrados:     {stats['nao_encontrados']}")
         logger.info(f"Erros:               {stats['erros']}")
         
+        if 'cache_hits' in stats:
+            consultas = stats['cache_hits'] + stats['cache_misses']
+            taxa = stats['cache_hits'] / consultas * 100 if consultas else 0.0
+            logger.info(
+                f"Cache de matches:    {stats['cache_hits']} hits / "
+                f"{stats['cache_misses']} misses ({taxa:.1f}% hits)"
+            )
+        
         if stats['nao_encontrados_lista']:
             logger.info(f"\nClientes não encontrados:")
             for nome in stats['nao_encontrados_lista'][:10]:  # Mostra apenas 10
                 logger.info(f"  - {nome}")
             
-            if len(stats['nao_encontrados_lista']) > 10:
-                logger.info(f"  ... e mais {len(stats['nao_encontrados_lista']) - 10}")
+            if stats['nao_encontrados'] > 10:
+                logger.info(f"  ... e mais {stats['nao_encontrados'] - 10}")
         
         logger.info(f"{'='*60}\n")
 
 
-def sync_from_data(assinantes_data: List[Dict], dry_run: bool = False) -> Dict:
+def _campos_assinante(assinante: Union[Dict, Any]) -> Tuple[str, str, str]:
+    """Nome, plano e status de um assinante (dicionário ou registro)."""
+    if isinstance(assinante, dict):
+        return assinante['nome'], assinante['plano'], assinante['status']
+    return assinante.nome, assinante.plano, assinante.status
+
+
+def _chunked(itens: Iterable, tamanho: int) -> Iterator[List]:
+    """Agrupa um iterável em listas de até `tamanho` itens, sob demanda."""
+    iterador = iter(itens)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _chunk_ids(ids: List[str], batch_size: int, max_chars: int) -> List[List[str]]:
+    """
+    Divide ids em blocos de até `batch_size` itens e `max_chars` caracteres
+    (somando os separadores), para caber na URL do filtro id=in.(...).
+    """
+    blocos: List[List[str]] = []
+    atual: List[str] = []
+    tamanho = 0
+    
+    for cliente_id in ids:
+        custo = len(str(cliente_id)) + 1
+        if atual and (len(atual) >= batch_size or tamanho + custo > max_chars):
+            blocos.append(atual)
+            atual = []
+            tamanho = 0
+        atual.append(cliente_id)
+        tamanho += custo
+    
+    if atual:
+        blocos.append(atual)
+    
+    return blocos
+
+
+def sync_from_data(
+    assinantes_data: Iterable[Union[Dict, Any]],
+    dry_run: bool = False,
+    supabase_options: Optional[Dict] = None,
+    **sync_options
+) -> Dict:
     """
     Função helper para sincronizar dados extraídos com Supabase.
     
     Args:
-        assinantes_data: Lista de dicionários com dados dos assinantes
+        assinantes_data: Assinantes (dicionários ou registros, ver `sync_assinantes`)
         dry_run: Se True, apenas simula sem atualizar
+        supabase_options: Argumentos de `SupabaseIntegration` (tabela, colunas,
+            credenciais); os ausentes vêm das variáveis de ambiente
+        **sync_options: Opções repassadas para `sync_assinantes`
+            (ex.: match_mode, match_workers, match_cache_path, write_mode,
+            skip_unchanged)
     
     Returns:
         Estatísticas da sincronização
     """
-    integration = SupabaseIntegration()
-    return integration.sync_assinantes(assinantes_data, dry_run=dry_run)
+    integration = SupabaseIntegration(**(supabase_options or {}))
+    return integration.sync_assinantes(assinantes_data, dry_run=dry_run, **sync_options)
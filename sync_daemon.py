@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Daemon que mantém um Chrome logado entre sincronizações.
+
+Este módulo gerencia:
+1. Um navegador "quente" (`WarmBrowser`) reaproveitado entre execuções:
+   o login só é refeito quando a sessão expira
+2. Reciclagem do Chrome após N execuções ou acima de um limite de RSS
+3. Servidor HTTP local que recebe as execuções (uma por vez) e responde
+   com o registro de cada uma
+
+Endpoints:
+- POST /sync    → executa uma sincronização; o corpo JSON (opcional)
+                  sobrescreve opções de execução da configuração base
+                  (ex.: {"dry_run": true}; ver `JOB_OPTIONS`)
+- GET  /status  → execuções, logins e reciclagens do navegador atual
+
+Se DAEMON_TOKEN estiver definido, as requisições precisam do cabeçalho
+`Authorization: Bearer <token>`. Sem token, o daemon só escuta em
+endereços de loopback.
+
+Uso:
+    python sync_daemon.py --port 8881 [--config config.json]
+    python sync_daemon.py --submit [--dry-run]    # ex.: no cron
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import threading
+import time
+
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from cashbarber_full_navigation import (
+    login_cashbarber,
+    login_driver,
+    probe_session,
+    session_from_driver,
+)
+from cashbarber_extractor import PARSERS
+from chrome_profile import chrome_rss_mb
+from main import SyncConfig, browser_profile, run_sync
+from name_matcher import MATCH_MODES
+from supabase_integration import WRITE_MODES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8881
+DEFAULT_MAX_JOBS = 50
+DEFAULT_MAX_RSS_MB = 600.0
+
+# Opções que o corpo de POST /sync pode sobrescrever, com os tipos ou
+# valores aceitos. Credenciais, Supabase e caminhos de arquivo ficam só
+# na configuração base.
+JOB_OPTIONS: Dict[str, Tuple] = {
+    'dry_run': (bool,),
+    'skip_unchanged': (bool,),
+    'stream_report': (bool,),
+    'match_workers': (int,),
+    'write_batch_size': (int,),
+    'write_workers': (int,),
+    'touch_days': (int, type(None)),
+    'write_rate_limit': (int, float, type(None)),
+    'match_mode': MATCH_MODES,
+    'write_mode': WRITE_MODES,
+    'html_parser': PARSERS,
+}
+
+# Limites (mínimo, máximo; None = sem limite) das opções numéricas de
+# JOB_OPTIONS, para um POST não abrir processos ou conexões sem controle
+JOB_LIMITS: Dict[str, Tuple] = {
+    'match_workers': (1, os.cpu_count() or 1),
+    'write_workers': (1, 16),
+    'write_batch_size': (1, 5000),
+    'touch_days': (0, None),
+    'write_rate_limit': (0, None),
+}
+
+
+def validar_opcoes(opcoes: Dict[str, Any]) -> None:
+    """
+    Confere as opções de uma execução contra `JOB_OPTIONS` e `JOB_LIMITS`.
+
+    Raises:
+        ValueError: Se alguma opção não puder ser sobrescrita ou tiver um
+            valor inválido
+    """
+    proibidas = sorted(set(opcoes) - set(JOB_OPTIONS))
+    if proibidas:
+        raise ValueError(f"Opções não permitidas: {', '.join(proibidas)}")
+
+    for nome, valor in opcoes.items():
+        aceitos = JOB_OPTIONS[nome]
+        if isinstance(aceitos[0], type):
+            valido = type(valor) in aceitos  # type(): True não vale como int
+        else:
+            valido = valor in aceitos
+        if not valido:
+            raise ValueError(f"Valor inválido para {nome}: {valor!r}")
+
+        minimo, maximo = JOB_LIMITS.get(nome, (None, None))
+        if isinstance(valor, float) and not math.isfinite(valor):
+            raise ValueError(f"Valor inválido para {nome}: {valor!r}")
+        if valor is not None and (
+            (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo)
+        ):
+            limites = f"{minimo} a {maximo}" if maximo is not None else f"mínimo {minimo}"
+            raise ValueError(f"Valor fora dos limites para {nome}: {valor!r} ({limites})")
+
+
+def _loopback(host: str) -> bool:
+    """Indica se o endereço de escuta só aceita conexões locais."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class WarmBrowser:
+    """Chrome autenticado mantido entre execuções de `run_sync`."""
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB):
+        """
+        Args:
+            max_jobs: Execuções antes de reiniciar o Chrome
+            max_rss_mb: RSS (MB) acima do qual o Chrome é reiniciado
+                após uma execução (None = sem limite)
+        """
+        self.max_jobs = max(1, max_jobs)
+        self.max_rss_mb = max_rss_mb
+        self.driver: Optional[webdriver.Chrome] = None
+        self.chave: Optional[Tuple] = None
+        self.jobs = 0
+        self.logins = 0
+        self.reciclagens = 0
+
+    @staticmethod
+    def _chave(config: SyncConfig) -> Tuple:
+        """Opções que exigem um navegador novo quando mudam."""
+        return (
+            config.cashbarber_email,
+            config.headless,
+            config.browser_profile,
+            config.network_capture,
+        )
+
+    def acquire(self, config: SyncConfig) -> Tuple[None, webdriver.Chrome, str]:
+        """
+        Entrega o navegador autenticado (no formato de `main.login`).
+
+        Returns:
+            Tupla (None, driver, modo); modo é 'navegador_quente' (sessão
+            ainda válida), 'relogin' (sessão renovada no mesmo Chrome) ou
+            'completo' (Chrome novo)
+        """
+        if self.driver is not None and self.chave != self._chave(config):
+            self.close("configuração do navegador mudou")
+
+        if self.driver is not None:
+            try:
+                valida = probe_session(session_from_driver(self.driver))
+            except WebDriverException as e:
+                self.close(f"navegador não responde ({e.msg})")
+            else:
+                if valida:
+                    logger.info(f"♻️  Navegador quente reaproveitado (execução {self.jobs + 1})")
+                    return None, self.driver, 'navegador_quente'
+
+                logger.info("Sessão expirada; novo login no navegador aberto")
+                login_driver(self.driver, config.cashbarber_email, config.cashbarber_password)
+                self.logins += 1
+                return None, self.driver, 'relogin'
+
+        self.driver = login_cashbarber(
+            email=config.cashbarber_email,
+            password=config.cashbarber_password,
+            headless=config.headless,
+            profile=browser_profile(config)
+        )
+        self.chave = self._chave(config)
+        self.jobs = 0
+        self.logins += 1
+        return None, self.driver, 'completo'
+
+    def handoff(self) -> None:
+        """
+        Chamado quando a sessão passou para HTTP (`--http-report`): o Chrome
+        continua aberto para as próximas execuções.
+        """
+
+    def release(self, sucesso: bool = True) -> None:
+        """
+        Devolve o navegador ao fim de uma execução e o recicla se atingiu
+        o limite de execuções ou de memória.
+        """
+        if self.driver is None:
+            return
+
+        self.jobs += 1
+        if self.jobs >= self.max_jobs:
+            self.close(f"{self.jobs} execuções")
+            return
+
+        try:
+            rss = chrome_rss_mb(self.driver)
+            if not sucesso:
+                self.driver.current_url  # confirma que o navegador ainda responde
+        except WebDriverException as e:
+            self.close(f"navegador não responde ({e.msg})")
+            return
+
+        if rss is not None and self.max_rss_mb is not None and rss > self.max_rss_mb:
+            self.close(f"RSS {rss:.0f} MB acima de {self.max_rss_mb:.0f} MB")
+
+    def close(self, motivo: str = "encerramento") -> None:
+        """Fecha o Chrome (o próximo `acquire` abre outro)."""
+        if self.driver is None:
+            return
+
+        logger.info(f"🔒 Reiniciando navegador: {motivo}")
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+        self.driver = None
+        self.chave = None
+        self.reciclagens += 1
+
+    def status(self) -> Dict[str, Any]:
+        """Estado atual do navegador."""
+        rss = None
+        if self.driver is not None:
+            try:
+                rss = chrome_rss_mb(self.driver)
+            except WebDriverException:
+                pass
+        return {
+            'navegador_aberto': self.driver is not None,
+            'execucoes': self.jobs,
+            'logins': self.logins,
+            'reciclagens': self.reciclagens,
+            'rss_mb': round(rss, 1) if rss is not None else None,
+        }
+
+
+class SyncDaemon:
+    """Executa as sincronizações recebidas, uma por vez, no navegador quente."""
+
+    def __init__(self, base_config: Dict[str, Any], browser: WarmBrowser, token: Optional[str] = None):
+        """
+        Args:
+            base_config: Configuração (formato de `SyncConfig`) usada em todas
+                as execuções
+            browser: Navegador mantido entre execuções
+            token: Token exigido nas requisições (None = sem autenticação)
+        """
+        self.base_config = base_config
+        self.browser = browser
+        self.token = token
+        self.lock = threading.Lock()
+
+    def run_job(self, opcoes: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Executa uma sincronização com a configuração base + `opcoes`.
+
+        Returns:
+            Tupla (código de saída, registro da execução)
+
+        Raises:
+            ValueError: Se `opcoes` tiver opções fora de `JOB_OPTIONS`
+        """
+        validar_opcoes(opcoes)
+        config = SyncConfig({**self.base_config, **opcoes})
+        historico: Dict[str, Any] = {}
+
+        # Um único Chrome: as execuções esperam a anterior terminar
+        with self.lock:
+            codigo = run_sync(config, browser=self.browser, historico=historico)
+        return codigo, historico
+
+    def status(self) -> Dict[str, Any]:
+        return {'ocupado': self.lock.locked(), **self.browser.status()}
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """Handler HTTP do daemon."""
+
+    daemon: SyncDaemon = None
+
+    def log_message(self, format, *args):  # noqa: A002 - assinatura do BaseHTTPRequestHandler
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, dados: Dict[str, Any]) -> None:
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _autorizado(self) -> bool:
+        if not self.daemon.token:
+            return True
+        recebido = self.headers.get('Authorization', '').encode('utf-8')
+        if hmac.compare_digest(recebido, f'Bearer {self.daemon.token}'.encode('utf-8')):
+            return True
+        self._send_json(401, {'erro': 'token inválido'})
+        return False
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        if self.path.split('?', 1)[0] == '/status':
+            self._send_json(200, self.daemon.status())
+        else:
+            self._send_json(404, {'erro': 'não encontrado'})
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        if self.path.split('?', 1)[0] != '/sync':
+            self._send_json(404, {'erro': 'não encontrado'})
+            return
+
+        tamanho = int(self.headers.get('Content-Length', 0))
+        try:
+            opcoes = json.loads(self.rfile.read(tamanho) or b'{}')
+            if not isinstance(opcoes, dict):
+                raise ValueError("o corpo deve ser um objeto JSON")
+            codigo, historico = self.daemon.run_job(opcoes)
+        except ValueError as e:
+            self._send_json(400, {'erro': str(e)})
+            return
+
+        self._send_json(200 if codigo == 0 else 500, historico)
+
+
+def serve(daemon: SyncDaemon, host: str, port: int) -> None:
+    """Atende as requisições até SIGTERM/Ctrl+C e fecha o navegador."""
+    handler = type('Handler', (DaemonHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+
+    logger.info(f"Daemon de sincronização em http://{host}:{port} (POST /sync, GET /status)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.browser.close()
+
+
+def submit(url: str, opcoes: Dict[str, Any], token: Optional[str] = None, timeout: int = 3600) -> int:
+    """
+    Envia uma execução ao daemon e mostra o registro retornado.
+
+    Returns:
+        Código de saída (0 = sucesso, 1 = erro)
+    """
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    inicio = time.perf_counter()
+    try:
+        response = requests.post(f"{url.rstrip('/')}/sync", json=opcoes, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        logger.error(f"Daemon indisponível em {url}: {e}")
+        return 1
+
+    try:
+        dados = response.json()
+    except ValueError:
+        dados = {'erro': response.text}
+    logger.info(f"Resposta do daemon em {time.perf_counter() - inicio:.2f}s: {dados}")
+    return 0 if response.status_code == 200 else 1
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Sobe o daemon (ou envia uma execução a ele com --submit)."""
+    parser = argparse.ArgumentParser(description="Daemon de sincronização com Chrome mantido entre execuções")
+    parser.add_argument('--config', type=str, help='Arquivo JSON com configurações (padrão: variáveis de ambiente)')
+    parser.add_argument(
+        '--host',
+        default=os.getenv('DAEMON_HOST', '127.0.0.1'),
+        help='Endereço de escuta (padrão: DAEMON_HOST ou 127.0.0.1; use 0.0.0.0 no Docker)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(os.getenv('DAEMON_PORT', DEFAULT_PORT)),
+        help=f'Porta (padrão: DAEMON_PORT ou {DEFAULT_PORT})'
+    )
+    parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=int(os.getenv('DAEMON_MAX_JOBS', DEFAULT_MAX_JOBS)),
+        metavar='N',
+        help=f'Reinicia o Chrome após N execuções (padrão: DAEMON_MAX_JOBS ou {DEFAULT_MAX_JOBS})'
+    )
+    parser.add_argument(
+        '--max-rss-mb',
+        type=float,
+        default=float(os.getenv('DAEMON_MAX_RSS_MB', DEFAULT_MAX_RSS_MB)),
+        metavar='MB',
+        help=f'Reinicia o Chrome acima deste RSS (padrão: DAEMON_MAX_RSS_MB ou {DEFAULT_MAX_RSS_MB:.0f})'
+    )
+    parser.add_argument(
+        '--submit',
+        action='store_true',
+        help='Envia uma execução ao daemon em execução e encerra'
+    )
+    parser.add_argument(
+        '--url',
+        default=None,
+        help='URL do daemon usada com --submit (padrão: http://127.0.0.1:<porta>)'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Com --submit, executa em modo simulação')
+
+    args = parser.parse_args(argv)
+    token = os.getenv('DAEMON_TOKEN')
+
+    if args.submit:
+        opcoes = {'dry_run': True} if args.dry_run else {}
+        return submit(args.url or f"http://127.0.0.1:{args.port}", opcoes, token)
+
+    base_config: Dict[str, Any] = {}
+    if args.config:
+        with open(args.config, 'r') as f:
+            base_config = json.load(f)
+
+    try:
+        SyncConfig(base_config)  # valida credenciais antes de subir
+    except ValueError as e:
+        logger.error(f"Erro ao carregar configurações: {e}")
+        return 1
+
+    if not token and not _loopback(args.host):
+        logger.error(
+            f"DAEMON_TOKEN é obrigatório para escutar em {args.host} "
+            f"(sem token, use um endereço de loopback como 127.0.0.1)"
+        )
+        return 1
+
+    # `docker stop` envia SIGTERM: encerra (e fecha o Chrome) como no Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    browser = WarmBrowser(args.max_jobs, args.max_rss_mb)
+    serve(SyncDaemon(base_config, browser, token), args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Despacho concorrente de escritas no Supabase.
+
+Este módulo gerencia:
+1. Execução de várias escritas em paralelo (máximo de requisições em voo)
+2. Limite de taxa por token bucket, para não estourar o rate limit do Supabase
+
+As threads compartilham o cliente Supabase (e o pool de conexões HTTP dele).
+"""
+
+from typing import Callable, Iterable, List, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class TokenBucket:
+    """Limitador de taxa: `rate` requisições por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens repostos por segundo
+            burst: Capacidade do balde (padrão: max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Bloqueia até haver um token disponível e o consome."""
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (agora - self.updated_at) * self.rate
+                )
+                self.updated_at = agora
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                espera = (1 - self.tokens) / self.rate
+
+            time.sleep(espera)
+
+
+class UpdateDispatcher:
+    """Executa escritas em paralelo com limite de concorrência e de taxa."""
+
+    def __init__(self, max_in_flight: int = 8, rate_limit: Optional[float] = None):
+        """
+        Args:
+            max_in_flight: Máximo de requisições simultâneas
+            rate_limit: Máximo de requisições por segundo (None = sem limite)
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Aplica `func` a cada item em paralelo.
+
+        Args:
+            func: Função de escrita (ex.: atualiza um cliente e retorna bool)
+            items: Argumentos de cada chamada
+
+        Returns:
+            Resultados na mesma ordem de `items`
+        """
+        def executar(item: T) -> R:
+            if self.bucket:
+                self.bucket.acquire()
+            return func(item)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            return list(executor.map(executar, items))